@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .repo import GaitRepo
+from .schema import Turn
+from .remote import RemoteSpec, TransferStats, clone_into, create_repo, fetch, push
+from .server import serve_in_thread
+
+# ---------------------------------------------------------------------
+# Sync benchmark: push / clone / fetch against `gait serve` on localhost
+#
+#   python -m gait.bench --turns 5000 --jobs 8 [--legacy] [--json]
+#
+# Builds a throwaway repo of synthetic turns, then times each phase with
+# wall-clock time and the transfer counters remote.py already keeps.
+# --legacy hides the batch endpoints so the per-object path is measured.
+#
+# Startup check: time of the imports `gait status` does
+#
+#   python -m gait.bench --startup [--budget-ms 100]
+#
+# Runs `gait status` in a fresh interpreter under -X importtime (best of
+# --runs) and exits 1 if it goes over budget or loads a module that only
+# network / LLM / token-counting commands need.
+# ---------------------------------------------------------------------
+
+BENCH_OWNER = "bench"
+BENCH_REPO = "sync"
+
+
+def _synthetic_turns(n: int, *, start: int = 0, size: int = 400) -> List[Turn]:
+    body = "x" * size
+    return [
+        Turn.v0(user_text=f"question {i}: {body}", assistant_text=f"answer {i}: {body}")
+        for i in range(start, start + n)
+    ]
+
+
+def _phase(name: str, fn: Any) -> Dict[str, Any]:
+    stats = TransferStats()
+    t0 = time.perf_counter()
+    fn(stats)
+    wall = time.perf_counter() - t0
+    return {
+        "phase": name,
+        "objects": stats.objects,
+        "bytes": stats.bytes,
+        "wall_seconds": wall,
+        "objects_per_sec": stats.objects / wall if wall > 0 else 0.0,
+        "mb_per_sec": stats.bytes / (1024 * 1024) / wall if wall > 0 else 0.0,
+    }
+
+
+def run_sync_bench(
+    *,
+    turns: int = 2000,
+    extra: int = 200,
+    jobs: Optional[int] = None,
+    batch: bool = True,
+    workdir: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """
+    Run push, clone, incremental push and incremental fetch once each and
+    return their timings. Everything lives under a temporary directory.
+    """
+    tmp = Path(workdir) if workdir is not None else Path(tempfile.mkdtemp(prefix="gait-bench-"))
+    srv = serve_in_thread(tmp / "server", port=0, batch=batch)
+    try:
+        spec = RemoteSpec(base_url=srv.url, owner=BENCH_OWNER, repo=BENCH_REPO)
+        create_repo(spec, token="")
+
+        src = GaitRepo(root=tmp / "src")
+        src.root.mkdir(parents=True, exist_ok=True)
+        src.init()
+        t0 = time.perf_counter()
+        src.record_turns(_synthetic_turns(turns))
+        build = time.perf_counter() - t0
+
+        dest = tmp / "clone"
+        phases = [
+            _phase("push", lambda st: push(src, spec, token="", branch="main", jobs=jobs, stats=st)),
+            _phase("clone", lambda st: clone_into(dest, spec, token="", branch="main", jobs=jobs, stats=st)),
+        ]
+        src.record_turns(_synthetic_turns(extra, start=turns))
+        phases.append(_phase("push (incremental)", lambda st: push(src, spec, token="", branch="main", jobs=jobs, stats=st)))
+        phases.append(_phase("fetch (incremental)", lambda st: fetch(GaitRepo(root=dest), spec, token="", jobs=jobs, stats=st)))
+    finally:
+        srv.shutdown()
+        srv.server_close()
+        if workdir is None:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    return {
+        "turns": turns,
+        "extra": extra,
+        "jobs": jobs,
+        "batch": batch,
+        "build_seconds": build,
+        "phases": phases,
+    }
+
+
+# ----------------------------
+# Startup (import time) check
+# ----------------------------
+
+DEFAULT_STARTUP_BUDGET_MS = 100.0
+STARTUP_COMMAND = ["status"]
+
+# must stay out of `gait status`; see the import note at the top of cli.py
+STARTUP_FORBIDDEN = (
+    "tiktoken",
+    "gait.remote",
+    "gait.llm",
+    "gait.verify",
+    "gait.server",
+    "gait.bundle",
+    "gait.httppool",
+    "http.client",
+    "concurrent.futures",
+)
+
+
+def _parse_importtime(stderr: str) -> Tuple[float, List[str]]:
+    """
+    (ms spent importing from the first gait module on, modules imported)
+    from `python -X importtime` output.
+    """
+    total_us = 0
+    started = False
+    modules: List[str] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # column header
+        mod = name.strip()
+        modules.append(mod)
+        top_level = not name[1:].startswith(" ")
+        if top_level and (started or mod == "gait" or mod.startswith("gait.")):
+            started = True
+            total_us += int(cumulative)
+    return total_us / 1000.0, modules
+
+
+def run_startup_bench(*, runs: int = 5, budget_ms: float = DEFAULT_STARTUP_BUDGET_MS) -> Dict[str, Any]:
+    """
+    Import cost of `gait status` in a throwaway repo, best of `runs`.
+    """
+    code = (
+        "import sys; from gait.cli import main; "
+        f"sys.argv = ['gait', *{STARTUP_COMMAND!r}]; sys.exit(main())"
+    )
+    env = dict(os.environ)
+    src_dir = str(Path(__file__).resolve().parent.parent)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (src_dir, env.get("PYTHONPATH", "")) if p)
+
+    tmp = Path(tempfile.mkdtemp(prefix="gait-startup-"))
+    try:
+        GaitRepo(root=tmp).init()
+        times: List[float] = []
+        modules: List[str] = []
+        for _ in range(max(1, runs)):
+            p = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", code],
+                cwd=tmp, env=env, capture_output=True, text=True,
+            )
+            if p.returncode != 0:
+                raise RuntimeError(f"gait {' '.join(STARTUP_COMMAND)} failed: {p.stderr.strip()[-500:]}")
+            ms, modules = _parse_importtime(p.stderr)
+            times.append(ms)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    forbidden = sorted(
+        m for m in set(modules)
+        if any(m == f or m.startswith(f + ".") for f in STARTUP_FORBIDDEN)
+    )
+    best = min(times)
+    return {
+        "command": "gait " + " ".join(STARTUP_COMMAND),
+        "runs": len(times),
+        "import_ms": best,
+        "import_ms_all": times,
+        "budget_ms": budget_ms,
+        "modules": len(modules),
+        "forbidden_modules": forbidden,
+        "ok": best <= budget_ms and not forbidden,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(
+        prog="python -m gait.bench",
+        description="Benchmark push/fetch/clone against a local gait serve, or check CLI startup time",
+    )
+    p.add_argument("--turns", type=int, default=2000, help="Turns in the initial repo (default: 2000)")
+    p.add_argument("--extra", type=int, default=200, help="Turns added before the incremental phases (default: 200)")
+    p.add_argument("--jobs", "-j", type=int, default=None,
+                   help="Concurrent object requests (default: $GAIT_TRANSFER_JOBS or 8)")
+    p.add_argument("--legacy", action="store_true", help="Disable the batch endpoints (per-object transfer)")
+    p.add_argument("--json", action="store_true", help="Print a machine-readable result")
+    p.add_argument("--startup", action="store_true",
+                   help="Check `gait status` import time instead; exit 1 if over budget")
+    p.add_argument("--budget-ms", type=float, default=DEFAULT_STARTUP_BUDGET_MS,
+                   help=f"Import time budget for --startup (default: {DEFAULT_STARTUP_BUDGET_MS:.0f})")
+    p.add_argument("--runs", type=int, default=5, help="Interpreter runs for --startup, best one counts (default: 5)")
+    args = p.parse_args(argv)
+
+    if args.startup:
+        st = run_startup_bench(runs=args.runs, budget_ms=args.budget_ms)
+        if args.json:
+            print(json.dumps(st, indent=2))
+        else:
+            verdict = "ok" if st["ok"] else "FAIL"
+            print(
+                f"{st['command']}: imports {st['import_ms']:.1f} ms (best of {st['runs']}), "
+                f"budget {st['budget_ms']:.0f} ms, {st['modules']} modules: {verdict}"
+            )
+            for m in st["forbidden_modules"]:
+                print(f"  loaded but not needed: {m}")
+        return 0 if st["ok"] else 1
+
+    r = run_sync_bench(turns=args.turns, extra=args.extra, jobs=args.jobs, batch=not args.legacy)
+    if args.json:
+        print(json.dumps(r, indent=2))
+        return 0
+
+    mode = "per-object" if args.legacy else "batch"
+    print(f"repo: {r['turns']} turns (+{r['extra']}), built in {r['build_seconds']:.2f}s; transfer: {mode}")
+    for ph in r["phases"]:
+        print(
+            f"{ph['phase']:<20} {ph['objects']:>7} objects {ph['bytes'] / 1024:>10.1f} KiB "
+            f"{ph['wall_seconds']:>7.2f}s {ph['objects_per_sec']:>9.0f} obj/s {ph['mb_per_sec']:>7.2f} MB/s"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
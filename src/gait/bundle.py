@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Set, Tuple
+
+from .repo import GaitRepo, check_ref_name
+from .objects import decode_payload, encode_packed, has_object, read_object_bytes, resolve_prefix
+from .pack import PackWriter
+from .remote import _enqueue_deps
+from . import wire
+
+# ---------------------------------------------------------------------
+# Bundle file: offline transfer between repos that cannot reach each other
+#
+#   line 1   b"# gait bundle v1\n"
+#   line 2   JSON header + b"\n":
+#              heads          {branch: commit id}
+#              memory         {branch: memory manifest id}
+#              prerequisites  commits the reader must already have
+#                             (incremental bundle, see `bases`)
+#              shallow        the writer's shallow boundary; its parents
+#                             are not in the bundle
+#              encoding       "deflate"
+#   rest     wire.py object stream, compressed as `encoding` says
+#
+# Objects are written and read one at a time, so memory use does not grow
+# with the bundle beyond the set of oids already seen.
+# ---------------------------------------------------------------------
+
+BUNDLE_SIGNATURE = b"# gait bundle v1\n"
+BUNDLE_ENCODING = "deflate"
+
+_CHUNK = 256 * 1024  # stream bytes per compressor call
+
+
+def _commit_excluded(repo: GaitRepo, cid: str, bases: List[str]) -> bool:
+    if cid in bases:
+        return True
+    graph = repo.commit_graph
+    return any(graph.is_ancestor(cid, b) for b in bases)
+
+
+def _read_canon(repo: GaitRepo, oid: str) -> bytes:
+    try:
+        return read_object_bytes(repo.objects_dir, oid)
+    except FileNotFoundError:
+        # partial clone: fetch the body from the promisor before bundling it
+        if not repo.prefetch([oid]):
+            raise
+        return read_object_bytes(repo.objects_dir, oid)
+
+
+def _iter_bundle_objects(repo: GaitRepo, roots: List[str], *, bases: List[str]) -> Iterator[Tuple[str, bytes]]:
+    """
+    (oid, canonical bytes) for everything reachable from `roots`, leaving
+    out commits that are `bases` or their ancestors (and what only they reach).
+    """
+    shallow = repo.read_shallow()
+    seen: Set[str] = set()
+    stack = list(reversed(roots))
+    while stack:
+        oid = stack.pop()
+        if not oid or oid in seen:
+            continue
+        seen.add(oid)
+        canon = _read_canon(repo, oid)
+        try:
+            obj = json.loads(canon)
+        except ValueError:
+            obj = None
+        if isinstance(obj, dict) and obj.get("schema") == "gait.commit.v0":
+            if bases and _commit_excluded(repo, oid, bases):
+                continue
+            if oid in shallow:
+                obj = dict(obj, parents=[])
+        yield oid, canon
+        if isinstance(obj, dict):
+            deps: List[str] = []
+            _enqueue_deps(obj, deps)
+            stack.extend(reversed(deps))
+
+
+def create_bundle(
+    repo: GaitRepo,
+    path: Path,
+    branches: Iterable[str],
+    *,
+    bases: Iterable[str] = (),
+) -> Dict[str, Any]:
+    """
+    Write the given branches (commits and memory) to a bundle file. With
+    `bases`, history those commits already reach is left out and the reader
+    must have them (incremental bundle).
+    """
+    heads: Dict[str, str] = {}
+    mems: Dict[str, str] = {}
+    for br in dict.fromkeys(branches):
+        head = repo.read_ref(br)
+        if not head:
+            raise ValueError(f"Branch has no commits: {br}")
+        heads[br] = head
+        if repo.memory_ref_path(br).exists():
+            mem = repo.read_memory_ref(br)
+            if mem:
+                mems[br] = mem
+    if not heads:
+        raise ValueError("No branches to bundle")
+
+    base_ids = [resolve_prefix(repo.objects_dir, b) for b in dict.fromkeys(bases)]
+    for b in base_ids:
+        if repo.commit_graph.add(b) is None:
+            raise ValueError(f"Base is not a local commit: {b}")
+
+    header = {
+        "heads": heads,
+        "memory": mems,
+        "prerequisites": base_ids,
+        "shallow": sorted(repo.read_shallow()),
+        "encoding": BUNDLE_ENCODING,
+    }
+
+    counts = {"objects": 0, "bytes": 0}
+
+    def counted(items: Iterator[Tuple[str, bytes]]) -> Iterator[Tuple[str, bytes]]:
+        for oid, canon in items:
+            counts["objects"] += 1
+            counts["bytes"] += len(canon)
+            yield oid, canon
+
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    try:
+        with tmp.open("wb") as f:
+            f.write(BUNDLE_SIGNATURE)
+            f.write(json.dumps(header, sort_keys=True).encode("utf-8") + b"\n")
+            z = zlib.compressobj(6)
+            buf: List[bytes] = []
+            size = 0
+            items = _iter_bundle_objects(repo, list(heads.values()) + list(mems.values()), bases=base_ids)
+            for piece in wire.encode_stream(counted(items)):
+                buf.append(piece)
+                size += len(piece)
+                if size >= _CHUNK:
+                    f.write(z.compress(b"".join(buf)))
+                    buf, size = [], 0
+            f.write(z.compress(b"".join(buf)))
+            f.write(z.flush())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    return {
+        "path": str(path),
+        "heads": heads,
+        "memory": mems,
+        "prerequisites": base_ids,
+        "objects": counts["objects"],
+        "bytes": counts["bytes"],
+        "file_bytes": path.stat().st_size,
+    }
+
+
+def _read_header(f: BinaryIO) -> Dict[str, Any]:
+    if f.readline() != BUNDLE_SIGNATURE:
+        raise ValueError("Not a gait bundle")
+    try:
+        header = json.loads(f.readline())
+    except ValueError:
+        header = None
+    if not isinstance(header, dict):
+        raise ValueError("Bad gait bundle header")
+    return header
+
+
+def read_bundle_header(path: Path) -> Dict[str, Any]:
+    with Path(path).open("rb") as f:
+        return _read_header(f)
+
+
+def unbundle(repo: GaitRepo, path: Path, *, name: str = "bundle") -> Dict[str, Any]:
+    """
+    Import a bundle: every object is re-hashed, new ones go into one pack,
+    and the bundled branches become refs remotes/<name>/<branch>.
+    """
+    check_ref_name(name)
+    stored = 0
+    nbytes = 0
+    with Path(path).open("rb") as f:
+        header = _read_header(f)
+        heads: Dict[str, str] = dict(header.get("heads") or {})
+        mems: Dict[str, str] = dict(header.get("memory") or {})
+        # branch names become paths under refs/; check them before storing anything
+        try:
+            for br in list(heads) + list(mems):
+                check_ref_name(br)
+        except ValueError as e:
+            raise RuntimeError(f"Corrupt bundle {path}: {e}") from e
+        missing = [c for c in (header.get("prerequisites") or []) if not has_object(repo.objects_dir, c)]
+        if missing:
+            raise RuntimeError(f"Bundle needs commit(s) this repo does not have: {', '.join(missing)}")
+
+        opts = repo.storage_options()
+        w = PackWriter(repo.objects_dir)
+        try:
+            for oid, payload in wire.iter_stream(f, encoding=header.get("encoding")):
+                if oid in w or has_object(repo.objects_dir, oid):
+                    continue
+                canon = decode_payload(payload)
+                if hashlib.sha256(canon).hexdigest() != oid:
+                    raise RuntimeError(f"Bundle has a bad object: {oid}")
+                w.add(oid, encode_packed(canon, **opts))
+                stored += 1
+                nbytes += len(canon)
+        except (zlib.error, ValueError) as e:
+            w.abort()
+            raise RuntimeError(f"Corrupt bundle {path}: {e}") from e
+        except BaseException:
+            w.abort()
+            raise
+        w.commit()
+
+    for oid in list(heads.values()) + list(mems.values()):
+        if oid and not has_object(repo.objects_dir, oid):
+            raise RuntimeError(f"Bundle is incomplete, missing: {oid}")
+
+    def incomplete(c: str) -> bool:
+        return any(p and not has_object(repo.objects_dir, p) for p in (repo.get_commit(c).get("parents") or []))
+
+    # the writer's boundary commits we just received keep their parents missing;
+    # our own boundaries whose parents the bundle supplied are complete again
+    shallow = repo.read_shallow()
+    boundary = {c for c in (header.get("shallow") or []) if has_object(repo.objects_dir, c) and incomplete(c)}
+    completed = {c for c in shallow if not incomplete(c)}
+    if boundary - shallow or completed:
+        repo.write_shallow((shallow | boundary) - completed)
+    if completed:
+        # the graph recorded those parents as missing
+        repo.commit_graph.invalidate()
+
+    for br, oid in heads.items():
+        repo.write_ref(f"remotes/{name}/{br}", oid)
+    for br, oid in mems.items():
+        repo.write_memory_ref(oid, f"remotes/{name}/{br}")
+
+    return {"heads": heads, "memory": mems, "objects": stored, "bytes": nbytes}
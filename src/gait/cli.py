@@ -1,32 +1,28 @@
 from __future__ import annotations
 
 import os
+import sys
 import argparse
 import json
-import socket
-from typing import Optional
+import time
+from typing import TYPE_CHECKING, Optional
 
 from pathlib import Path
 
 from .repo import GaitRepo
 from .schema import Turn
 from .objects import short_oid
-from .log import walk_commits
-from .tokens import count_turn_tokens
-from .remote import (
-    RemoteSpec,
-    remote_add, remote_get, remote_list,
-    push as remote_push, fetch as remote_fetch, pull as remote_pull,
-    clone_into,
-    create_repo as remote_create_repo,
-)
-from .verify import verify_repo
-from .llm import (
-    ollama_list_models, ollama_chat,
-    openai_compat_list_models, openai_compat_chat,
-    gemini_list_models, gemini_chat,
-    anthropic_list_models, anthropic_chat,
-)
+from .tokens import DEFAULT_ENCODING
+from .context import context_tokens_from_env
+from .respcache import response_cache_enabled_from_env
+from . import daemon
+
+# Network, LLM, server and verify modules are imported inside the commands
+# that use them: `gait status` / `gait log` run from shell prompts and must
+# not pay for http.client, concurrent.futures or tiktoken. `python -m
+# gait.bench --startup` checks this.
+if TYPE_CHECKING:
+    from .remote import RemoteSpec, TransferStats
 
 def _resolve_commitish(repo: GaitRepo, commitish: str | None) -> str:
     """
@@ -42,6 +38,18 @@ def _resolve_commitish(repo: GaitRepo, commitish: str | None) -> str:
         return cid
     return commitish.strip()
 
+def _turn_commit(repo: GaitRepo, oid: str) -> str:
+    """
+    If `oid` names a turn rather than a commit, the commit that introduced it.
+    """
+    obj = repo.get_object(oid)
+    if obj.get("schema") != "gait.turn.v0":
+        return oid
+    commits = repo.commits_for_turn(oid)
+    if not commits:
+        raise ValueError(f"Turn {oid} is not in this repo's turn log.")
+    return commits[0]
+
 def _list_branches(repo: GaitRepo) -> list[str]:
     # repo.refs_dir exists in your repo.py
     if not repo.refs_dir.exists():
@@ -57,12 +65,23 @@ def _get_gaithub_token() -> Optional[str]:
     return tok or None
 
 def cmd_remote_add(args: argparse.Namespace) -> int:
+    from .remote import remote_add
+
     repo = GaitRepo.discover()
     remote_add(repo, args.name, args.url)
     print(f"remote {args.name} -> {args.url}")
     return 0
 
+def _print_transfer(verb: str, stats: TransferStats) -> None:
+    if stats.objects:
+        print(
+            f"{verb}: {stats.objects} object(s), {stats.bytes / 1024:.1f} KiB in {stats.seconds:.2f}s "
+            f"({stats.objects_per_sec:.0f} objects/sec, {stats.mb_per_sec:.2f} MB/sec, jobs={stats.jobs})"
+        )
+
 def cmd_push(args: argparse.Namespace) -> int:
+    from .remote import RemoteSpec, TransferStats, create_repo as remote_create_repo, push as remote_push, remote_get
+
     repo = GaitRepo.discover()
     token = _get_gaithub_token()
     if not token:
@@ -71,42 +90,64 @@ def cmd_push(args: argparse.Namespace) -> int:
     base_url = remote_get(repo, args.remote)
     spec = RemoteSpec(base_url=base_url, owner=args.owner, repo=args.repo, name=args.remote)
 
+    stats = TransferStats()
     try:
-        remote_push(repo, spec, token=token, branch=args.branch)
+        remote_push(repo, spec, token=token, branch=args.branch, jobs=args.jobs, stats=stats)
     except RuntimeError as e:
         msg = str(e)
         # if gaithub says repo isn't initialized, create it then retry once
         if "Repo not initialized for this owner" in msg:
             remote_create_repo(spec, token=token)
-            remote_push(repo, spec, token=token, branch=args.branch)
+            remote_push(repo, spec, token=token, branch=args.branch, jobs=args.jobs, stats=stats)
         else:
             raise
 
     print(f"pushed {args.branch or repo.current_branch()} to {args.remote} ({args.owner}/{args.repo})")
+    _print_transfer("uploaded", stats)
     return 0
 
 def cmd_fetch(args: argparse.Namespace) -> int:
+    from .remote import RemoteSpec, TransferStats, fetch as remote_fetch, remote_get
+
     repo = GaitRepo.discover()
     token = _get_gaithub_token()
     base_url = remote_get(repo, args.remote)
 
     spec = RemoteSpec(base_url=base_url, owner=args.owner, repo=args.repo, name=args.remote)
-    heads, mems = remote_fetch(repo, spec, token=token)
+    stats = TransferStats()
+    heads, mems = remote_fetch(
+        repo, spec,
+        token=token,
+        jobs=args.jobs,
+        stats=stats,
+        depth=args.depth,
+        since=args.since,
+        unshallow=args.unshallow,
+    )
     print(f"fetched: heads={len(heads)} memory={len(mems)}")
+    if repo.is_shallow():
+        print(f"shallow: {len(repo.read_shallow())} boundary commit(s)")
+    _print_transfer("downloaded", stats)
     return 0
 
 def cmd_pull(args: argparse.Namespace) -> int:
+    from .remote import RemoteSpec, TransferStats, pull as remote_pull, remote_get
+
     repo = GaitRepo.discover()
     token = _get_gaithub_token()
     base_url = remote_get(repo, args.remote)
 
     spec = RemoteSpec(base_url=base_url, owner=args.owner, repo=args.repo, name=args.remote)
+    stats = TransferStats()
     merge_id = remote_pull(
         repo, spec,
         token=token,
         branch=args.branch or repo.current_branch(),
         with_memory=args.with_memory,
+        jobs=args.jobs,
+        stats=stats,
     )
+    _print_transfer("downloaded", stats)
     print(f"pulled {args.remote}/{args.branch or repo.current_branch()} -> {repo.current_branch()}")
     print(f"HEAD:   {merge_id}")
     if args.with_memory:
@@ -114,16 +155,31 @@ def cmd_pull(args: argparse.Namespace) -> int:
     return 0
 
 def cmd_clone(args: argparse.Namespace) -> int:
+    from .remote import RemoteSpec, TransferStats, clone_into
+
     token = _get_gaithub_token()
     dest = Path(args.path).resolve()
 
     spec = RemoteSpec(base_url=args.url, owner=args.owner, repo=args.repo, name=args.remote)
-    clone_into(dest, spec, token=token, branch=args.branch)
+    stats = TransferStats()
+    clone_into(
+        dest, spec,
+        token=token,
+        branch=args.branch,
+        jobs=args.jobs,
+        stats=stats,
+        depth=args.depth,
+        since=args.since,
+        partial=args.partial,
+    )
 
     print(f"cloned {args.owner}/{args.repo} into {dest}")
+    _print_transfer("downloaded", stats)
     return 0
 
 def cmd_remote_list(args: argparse.Namespace) -> int:
+    from .remote import remote_list
+
     repo = GaitRepo.discover()
     rems = remote_list(repo)
     if not rems:
@@ -137,6 +193,8 @@ def cmd_remote_list(args: argparse.Namespace) -> int:
     return 0
 
 def cmd_repo_create(args: argparse.Namespace) -> int:
+    from .remote import RemoteSpec, create_repo as remote_create_repo, remote_get
+
     repo = GaitRepo.discover()
     token = _get_gaithub_token()
     if not token:
@@ -150,16 +208,123 @@ def cmd_repo_create(args: argparse.Namespace) -> int:
     return 0
 
 def cmd_verify(args: argparse.Namespace) -> int:
+    from .verify import verify_repo
+
     repo = GaitRepo.discover()
-    r = verify_repo(repo)
+
+    progress = None
+    if not args.json and sys.stderr.isatty():
+        def progress(done: int, total: int) -> None:
+            end = "\n" if done >= total else ""
+            print(f"\rverifying objects: {done}/{total}", end=end, file=sys.stderr, flush=True)
+
+    r = verify_repo(repo, jobs=args.jobs, incremental=args.incremental, progress=progress)
+    if args.json:
+        print(json.dumps(r, indent=2))
+        return 0 if r["ok"] else 2
+
     if r["ok"]:
         print("OK: repo verified")
+        print(
+            f"objects: {r['checked_objects']} checked, {r['skipped_objects']} skipped "
+            f"({r['objects_per_sec']:.0f} objects/sec, {r['mb_per_sec']:.1f} MB/sec)"
+        )
         return 0
     print("FAILED: verify found problems")
     for p in r["problems"]:
         print(f"- {p}")
     return 2
 
+def cmd_import(args: argparse.Namespace) -> int:
+    from itertools import chain
+    from .importer import iter_file_turns
+
+    repo = GaitRepo.discover()
+    turns = chain.from_iterable(iter_file_turns(path, fmt=args.format) for path in args.files)
+    r = repo.record_turns(turns, message=args.message, branch=args.branch)
+    if not r["turns"]:
+        print("nothing to import")
+        return 0
+    print(f"imported: {r['turns']} turn(s) into {r['branch']} ({r['turns_per_sec']:.0f} turns/sec)")
+    print(f"HEAD:   {r['new_head']}")
+    print(f"pack:   {r['pack']}")
+    return 0
+
+def cmd_repack(args: argparse.Namespace) -> int:
+    repo = GaitRepo.discover()
+    r = repo.repack(prune_loose=not args.keep_loose)
+    if not r["pack"]:
+        print("nothing to pack")
+        return 0
+    print(f"packed: {r['objects']} object(s) -> {r['pack']}")
+    print(f"loose pruned: {r['loose_pruned']}  packs replaced: {r['packs_replaced']}")
+    return 0
+
+def cmd_bundle_create(args: argparse.Namespace) -> int:
+    from .bundle import create_bundle
+
+    repo = GaitRepo.discover()
+    branches = args.branches or [repo.current_branch()]
+    r = create_bundle(repo, Path(args.file), branches, bases=args.base)
+    print(f"bundle: {r['objects']} object(s), {r['file_bytes'] / 1024:.1f} KiB -> {r['path']}")
+    for br, oid in r["heads"].items():
+        print(f"  {br}\t{short_oid(oid)}")
+    if r["prerequisites"]:
+        print(f"requires: {', '.join(short_oid(c) for c in r['prerequisites'])}")
+    return 0
+
+def cmd_bundle_unbundle(args: argparse.Namespace) -> int:
+    from .bundle import unbundle
+
+    repo = GaitRepo.discover()
+    r = unbundle(repo, Path(args.file), name=args.name)
+    print(f"unbundled: {r['objects']} new object(s), {r['bytes'] / 1024:.1f} KiB")
+    for br, oid in r["heads"].items():
+        print(f"  remotes/{args.name}/{br}\t{short_oid(oid)}")
+    return 0
+
+def cmd_daemon(args: argparse.Namespace) -> int:
+    repo = GaitRepo.discover()
+    if args.stop or args.status:
+        client = daemon.connect(repo.gait_dir)
+        if client is None:
+            print("no gait daemon running for this repo")
+            return 1
+        with client:
+            r = client.call("shutdown" if args.stop else "ping")
+        print(f"{'stopped' if args.stop else 'running'}: pid {r['pid']}")
+        return 0
+
+    d = daemon.GaitDaemon(repo)
+    d.bind()
+    print(f"gait daemon for {repo.root} on {d.path} (pid {os.getpid()})", flush=True)
+    try:
+        d.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        d.close()
+    return 0
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    from .server import DEFAULT_HOST, DEFAULT_PORT, make_server
+
+    root = Path(args.root).resolve()
+    token = args.token if args.token is not None else os.environ.get("GAITHUB_TOKEN", "").strip()
+    host = args.host or DEFAULT_HOST
+    port = DEFAULT_PORT if args.port is None else args.port
+    srv = make_server(root, host=host, port=port, token=token, batch=not args.no_batch)
+    print(f"serving {root} at {srv.url} (repos under /repos/<owner>/<repo>)")
+    if srv.read_only:
+        print("read-only: no token set and not bound to localhost (set --token or GAITHUB_TOKEN to accept pushes)")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.server_close()
+    return 0
+
 # ----------------------------
 # Commands
 # ----------------------------
@@ -167,18 +332,17 @@ def cmd_verify(args: argparse.Namespace) -> int:
 def cmd_init(args: argparse.Namespace) -> int:
     root = Path(args.path).resolve()
     repo = GaitRepo(root=root)
-    repo.init()
+    repo.init(compression="zlib" if args.compress else None)
     print(f"Initialized GAIT repo in {repo.gait_dir}")
     return 0
 
 
 def cmd_status(args: argparse.Namespace) -> int:
     repo = GaitRepo.discover()
-    branch = repo.current_branch()
-    head = repo.head_commit_id()
-    print(f"root:   {repo.root}")
-    print(f"branch: {branch}")
-    print(f"HEAD:   {head or '(empty)'}")
+    st = daemon.run(repo, "status")
+    print(f"root:   {st['root']}")
+    print(f"branch: {st['branch']}")
+    print(f"HEAD:   {st['head'] or '(empty)'}")
     return 0
 
 
@@ -306,24 +470,27 @@ def cmd_record_turn(args: argparse.Namespace) -> int:
     tools = json.loads(args.tools) if args.tools else {}
     model = json.loads(args.model) if args.model else {}
 
-    turn = Turn.v0(
-        user_text=args.user,
-        assistant_text=args.assistant,
+    r = daemon.run(
+        repo, "record_turn",
+        user=args.user,
+        assistant=args.assistant,
         context=context,
         tools=tools,
         model=model,
         visibility=args.visibility,
+        message=args.message or "",
     )
-    turn_id, commit_id = repo.record_turn(turn, message=args.message or "")
-    print(f"turn:   {turn_id}")
-    print(f"commit: {commit_id}")
-    print(f"branch: {repo.current_branch()} -> {commit_id}")
+    print(f"turn:   {r['turn_id']}")
+    print(f"commit: {r['commit_id']}")
+    print(f"branch: {r['branch']} -> {r['commit_id']}")
     return 0
 
 
 def cmd_log(args: argparse.Namespace) -> int:
     repo = GaitRepo.discover()
-    for c in walk_commits(repo, limit=args.limit):
+    r = daemon.run(repo, "log", limit=args.limit)
+    shallow = set(r["shallow"])
+    for c in r["commits"]:
         cid = c["_id"]
         msg = c.get("message") or ""
         kind = c.get("kind") or ""
@@ -333,6 +500,8 @@ def cmd_log(args: argparse.Namespace) -> int:
         parents = c.get("parents") or []
         p = ",".join(short_oid(x) for x in parents) if parents else "-"
         merge_flag = " (merge)" if len(parents) > 1 else ""
+        if cid in shallow:
+            merge_flag += " (shallow)"
 
         print(f"{short_oid(cid)}{merge_flag}  {created}  {kind}  p=[{p}]  turns={len(turn_ids)}  {msg}")
     return 0
@@ -342,7 +511,22 @@ def cmd_show(args: argparse.Namespace) -> int:
     repo = GaitRepo.discover()
     commit_id = _resolve_commitish(repo, args.commit)
 
-    commit = repo.get_commit(commit_id)
+    r = daemon.run(repo, "show", oid=commit_id)
+    if "turn" in r:
+        # a turn id: show it with the commit(s) that introduced it
+        obj = r["turn"]
+        print(f"turn:   {r['turn_id']}")
+        for cid in r["commits"] or ["(not in this repo's turn log)"]:
+            print(f"commit: {cid}")
+        print("-" * 60)
+        print("User:")
+        print((obj.get("user") or {}).get("text", ""))
+        print("\nAssistant:")
+        print((obj.get("assistant") or {}).get("text", ""))
+        print("-" * 60)
+        return 0
+
+    commit = r["commit"]
     print(f"commit: {commit_id}")
     print(f"branch: {commit.get('branch')}")
     print(f"kind:   {commit.get('kind')}")
@@ -353,8 +537,7 @@ def cmd_show(args: argparse.Namespace) -> int:
         print("(no turns attached to this commit)")
         return 0
 
-    for i, tid in enumerate(turn_ids, 1):
-        turn = repo.get_turn(tid)
+    for i, turn in enumerate(r["turns"], 1):
         user = (turn.get("user") or {}).get("text", "")
         assistant = (turn.get("assistant") or {}).get("text", "")
 
@@ -405,7 +588,7 @@ def cmd_pin(args: argparse.Namespace) -> int:
     else:
         if not args.commit:
             raise ValueError("Provide a commit id/prefix or use --last.")
-        commit_id = args.commit
+        commit_id = _turn_commit(repo, args.commit)
 
     mem_id = repo.pin_commit(commit_id, note=args.note or "")
     print(f"pinned commit {commit_id} into memory")
@@ -448,9 +631,22 @@ def cmd_budget(args: argparse.Namespace) -> int:
     return 0
 
 
+def cmd_tokens_backfill(args: argparse.Namespace) -> int:
+    repo = GaitRepo.discover()
+    t0 = time.perf_counter()
+    r = repo.backfill_token_index(encoding=args.encoding, threads=args.threads)
+    print(
+        f"tokens: {r['turns']} turn(s), {r['counted']} counted, "
+        f"{r['already_indexed']} already indexed ({time.perf_counter() - t0:.2f}s)"
+    )
+    if r["unavailable"]:
+        print(f"tokens: {r['unavailable']} turn(s) not available locally (partial or shallow clone)")
+    return 0
+
+
 def cmd_context(args: argparse.Namespace) -> int:
     repo = GaitRepo.discover()
-    bundle = repo.build_context_bundle(full=args.full)
+    bundle = daemon.run(repo, "context", full=args.full)
 
     if args.json:
         print(json.dumps(bundle, ensure_ascii=False, indent=2))
@@ -481,6 +677,24 @@ def cmd_context(args: argparse.Namespace) -> int:
 # ----------------------------
 
 def cmd_chat(args: argparse.Namespace) -> int:
+    import socket
+
+    from .context import assemble_context, context_budget
+    from .tokens import count_turn_tokens
+    from .writer import TurnWriter
+    from .remote import (
+        RemoteSpec,
+        remote_get,
+        push as remote_push, fetch as remote_fetch, pull as remote_pull,
+        create_repo as remote_create_repo,
+    )
+    from .llm import (
+        ollama_list_models, ollama_chat, ollama_chat_stream,
+        openai_compat_list_models, openai_compat_chat, openai_compat_chat_stream,
+        gemini_list_models, gemini_chat, gemini_chat_stream,
+        anthropic_list_models, anthropic_chat, anthropic_chat_stream,
+    )
+
     repo = GaitRepo.discover()
 
     def port_open(host: str, port: int, timeout: float = 0.3) -> bool:
@@ -662,34 +876,28 @@ def cmd_chat(args: argparse.Namespace) -> int:
         where = "google-genai"
     else:
         where = base_url
+    cache = repo.response_cache if args.cache else None
     print(f"[gait] repo={repo.root} branch={repo.current_branch()} provider={provider} model={model} endpoint={where}")
     print("[gait] commands: /models /model NAME /provider NAME [MODEL] /branches ...")
     print()
 
     # ----------------------------
     # Build chat messages (memory + optional resume)
+    #
+    # `messages` is the conversation only; pins and --system are added by
+    # assemble_context for each request, within the model's token budget.
     # ----------------------------
+    pinned: list[dict] = []
+
     def build_messages_for_current_branch() -> list[dict]:
+        nonlocal pinned
         msgs: list[dict] = []
 
-        if not args.no_memory:
-            bundle = repo.build_context_bundle(full=False)
-            if bundle.get("items"):
-                lines = ["You are a helpful assistant. Use the following pinned context from GAIT memory if relevant:"]
-                for it in bundle["items"]:
-                    u = (it.get("user_text") or "").strip()
-                    a = (it.get("assistant_text") or "").strip()
-                    note = (it.get("note") or "").strip()
-                    header = f"- PIN {it['index']}" + (f" ({note})" if note else "")
-                    lines.append(header)
-                    if u:
-                        lines.append(f"  User: {u}")
-                    if a:
-                        lines.append(f"  Assistant: {a}")
-                msgs.append({"role": "system", "content": "\n".join(lines)})
-
-        if args.system:
-            msgs.append({"role": "system", "content": args.system})
+        pinned = [] if args.no_memory else repo.build_context_bundle(full=False).get("items") or []
+        counts = repo.turn_token_counts(it["turn_id"] for it in pinned)
+        for it in pinned:
+            if it["turn_id"] in counts:
+                it["token_counts"] = counts[it["turn_id"]]
 
         # Resume: only if enabled AND there is a HEAD commit
         do_resume = (not args.no_resume) and (args.resume_turns > 0)
@@ -805,17 +1013,35 @@ def cmd_chat(args: argparse.Namespace) -> int:
     # ----------------------------
     # Interactive loop
     # ----------------------------
+    # Turns are saved by a background writer so the next prompt doesn't wait
+    # on disk; slash commands read the repo, so they flush it first.
+    writer = TurnWriter(repo)
+
+    def close_writer() -> None:
+        try:
+            writer.close()
+        except RuntimeError as e:
+            print(f"[gait] {e}")
+
     while True:
         try:
             user_text = input("you> ").strip()
         except (EOFError, KeyboardInterrupt):
+            close_writer()
             print("\n[gait] bye.")
             return 0
 
         if not user_text:
             continue
 
+        if user_text.startswith("/"):
+            try:
+                writer.flush()
+            except RuntimeError as e:
+                print(f"[gait] {e}")
+
         if user_text in ("/exit", "/quit"):
+            close_writer()
             print("[gait] bye.")
             return 0
 
@@ -1201,65 +1427,146 @@ def cmd_chat(args: argparse.Namespace) -> int:
         # --- normal chat turn ---
         messages.append({"role": "user", "content": user_text})
 
+        ctx = assemble_context(
+            history=messages,
+            pins=pinned,
+            system=args.system,
+            budget=context_budget(model, reply_tokens=args.num_predict, override=args.context_tokens),
+        )
+        print(f"[gait] {ctx.summary()}")
+        if ctx.over_budget:
+            print("[gait] warning: system prompt and message alone exceed the context budget")
+        elif ctx.trimmed:
+            print(f"[gait] warning: pins/history trimmed to fit {ctx.budget} tokens (--context-tokens to change, 0 = no limit)")
+
+        stream = None
+        cache_hits = cache.hits if cache is not None else 0
+        t0 = time.perf_counter()
         try:
             if provider == "ollama":
-                assistant_text = ollama_chat(
-                    host,
-                    model,
-                    messages,
-                    temperature=args.temperature,
-                    num_predict=args.num_predict,
-                )
+                if args.no_stream:
+                    assistant_text = ollama_chat(
+                        host,
+                        model,
+                        ctx.messages,
+                        temperature=args.temperature,
+                        num_predict=args.num_predict,
+                        cache=cache,
+                    )
+                else:
+                    stream = ollama_chat_stream(
+                        host,
+                        model,
+                        ctx.messages,
+                        temperature=args.temperature,
+                        num_predict=args.num_predict,
+                        cache=cache,
+                    )
 
             elif provider == "gemini":
-                assistant_text = gemini_chat(
-                    model,
-                    messages,
-                    api_key=api_key,              # GEMINI_API_KEY / GOOGLE_API_KEY should also work in llm.py
-                    temperature=args.temperature,
-                    max_tokens=args.num_predict,
-                )
+                if args.no_stream:
+                    assistant_text = gemini_chat(
+                        model,
+                        ctx.messages,
+                        api_key=api_key,              # GEMINI_API_KEY / GOOGLE_API_KEY should also work in llm.py
+                        temperature=args.temperature,
+                        max_tokens=args.num_predict,
+                        cache=cache,
+                    )
+                else:
+                    stream = gemini_chat_stream(
+                        model,
+                        ctx.messages,
+                        api_key=api_key,
+                        temperature=args.temperature,
+                        max_tokens=args.num_predict,
+                        cache=cache,
+                    )
 
             elif provider in ("claude", "anthropic"):
-                assistant_text = anthropic_chat(
-                    model,
-                    messages,
-                    api_key=api_key,
-                    temperature=args.temperature,
-                    max_tokens=args.num_predict,
-                )
+                if args.no_stream:
+                    assistant_text = anthropic_chat(
+                        model,
+                        ctx.messages,
+                        api_key=api_key,
+                        temperature=args.temperature,
+                        max_tokens=args.num_predict,
+                        cache=cache,
+                    )
+                else:
+                    stream = anthropic_chat_stream(
+                        model,
+                        ctx.messages,
+                        api_key=api_key,
+                        temperature=args.temperature,
+                        max_tokens=args.num_predict,
+                        cache=cache,
+                    )
 
             else:
-                assistant_text = openai_compat_chat(
-                    base_url,
-                    model,
-                    messages,
-                    api_key=api_key,
-                    temperature=args.temperature,
-                    max_tokens=args.num_predict,
-                )
+                if args.no_stream:
+                    assistant_text = openai_compat_chat(
+                        base_url,
+                        model,
+                        ctx.messages,
+                        api_key=api_key,
+                        temperature=args.temperature,
+                        max_tokens=args.num_predict,
+                        cache=cache,
+                    )
+                else:
+                    stream = openai_compat_chat_stream(
+                        base_url,
+                        model,
+                        ctx.messages,
+                        api_key=api_key,
+                        temperature=args.temperature,
+                        max_tokens=args.num_predict,
+                        cache=cache,
+                    )
+
+            if stream is not None:
+                # print as chunks arrive
+                print("ai> ", end="", flush=True)
+                for chunk in stream:
+                    print(chunk, end="", flush=True)
+                print("\n")
+                assistant_text = stream.text.strip()
+                if not assistant_text:
+                    raise RuntimeError("empty response")
 
         except Exception as e:
+            if stream is not None and stream.ttft is not None:
+                print()
             print(f"[gait] llm error: {e}")
             messages.pop()
             continue
 
-        print(f"ai> {assistant_text}\n")
+        if stream is None:
+            print(f"ai> {assistant_text}\n")
         messages.append({"role": "assistant", "content": assistant_text})
 
         tokens = count_turn_tokens(user_text=user_text, assistant_text=assistant_text)
 
+        model_meta: dict = {"provider": provider, "model": model, "prompt_tokens": ctx.tokens}
+        if stream is not None:
+            model_meta.update(stream.metrics(output_tokens=tokens["output_total"]))
+        else:
+            model_meta["latency_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            if cache is not None:
+                model_meta["cache"] = "hit" if cache.hits > cache_hits else "miss"
+
         turn = Turn.v0(
             user_text=user_text,
             assistant_text=assistant_text,
             context={"provider": provider, "endpoint": where},
             tools={},
-            model={"provider": provider, "model": model},
+            model=model_meta,
             tokens=tokens,
             visibility="private",
         )
 
-        _, commit_id = repo.record_turn(turn, message=args.message or "chat")
+        _, commit_id = writer.record_turn(turn, message=args.message or "chat")
         if args.echo_commit:
             print(f"[gait] committed: {short_oid(commit_id)}")
 
@@ -1277,6 +1584,8 @@ def build_parser() -> argparse.ArgumentParser:
 
     s = sub.add_parser("init", help="Initialize a GAIT repo in PATH (default: .)")
     s.add_argument("path", nargs="?", default=".")
+    s.add_argument("--compress", action="store_true",
+                   help="Store objects zlib-compressed (sets core.compression in .gait/config.json)")
     s.set_defaults(func=cmd_init)
 
     s = sub.add_parser("status", help="Show current repo status")
@@ -1311,17 +1620,25 @@ def build_parser() -> argparse.ArgumentParser:
     s.add_argument("--model", default="", help="JSON string")
     s.set_defaults(func=cmd_record_turn)
 
+    s = sub.add_parser("import", help="Bulk-import JSONL transcripts (one commit per turn, written as a pack)")
+    s.add_argument("files", nargs="+", help="JSONL transcript file(s); '-' reads stdin")
+    s.add_argument("--format", default="auto", choices=["auto", "gait", "openai"],
+                   help="gait: {user, assistant} lines; openai: {messages: [...]} or {role, content} lines")
+    s.add_argument("--message", default="import", help="Commit message for imported turns")
+    s.add_argument("--branch", default=None, help="Branch to import onto (default: current)")
+    s.set_defaults(func=cmd_import)
+
     s = sub.add_parser("log", help="Show commit log")
     s.add_argument("--limit", type=int, default=20)
     s.set_defaults(func=cmd_log)
 
-    s = sub.add_parser("show", help="Show prompts and responses for a commit (default: HEAD)")
+    s = sub.add_parser("show", help="Show prompts and responses for a commit or turn (default: HEAD)")
     s.add_argument("commit", nargs="?", default=None)
     s.set_defaults(func=cmd_show)
 
     s = sub.add_parser("pin", help="Pin a commit's turns into branch HEAD+ memory")
     s.add_argument("commit", nargs="?", default=None,
-                   help="Commit id/prefix (required unless --last)")
+                   help="Commit or turn id/prefix (required unless --last)")
     s.add_argument("--last", action="store_true",
                    help="Pin last commit with turns (skips merges)")
     s.add_argument("--note", default="", help="Optional note for why this was pinned")
@@ -1337,6 +1654,13 @@ def build_parser() -> argparse.ArgumentParser:
     s = sub.add_parser("budget", help="Show token budget summary for pinned HEAD+ memory")
     s.set_defaults(func=cmd_budget)
 
+    t = sub.add_parser("tokens", help="Token-count index (.gait/tokens.db)")
+    tsub = t.add_subparsers(dest="tokens_cmd", required=True)
+    r = tsub.add_parser("backfill", help="Count tokens for every turn not yet indexed")
+    r.add_argument("--encoding", default=DEFAULT_ENCODING, help=f"tiktoken encoding (default: {DEFAULT_ENCODING})")
+    r.add_argument("--threads", type=int, default=0, help="Encoding threads (default: $GAIT_TOKEN_THREADS or CPUs, max 8)")
+    r.set_defaults(func=cmd_tokens_backfill)
+
     s = sub.add_parser("merge", help="Merge SOURCE branch into the current branch (creates merge commit)")
     s.add_argument("source")
     s.add_argument("--message", default="")
@@ -1414,6 +1738,14 @@ def build_parser() -> argparse.ArgumentParser:
         default=None,
         help="Max tokens per reply (maps to max_tokens for openai_compat)"
     )
+
+    chat.add_argument(
+        "--context-tokens",
+        type=int,
+        default=context_tokens_from_env(),
+        help="Prompt context window in tokens; pins and history are trimmed to fit "
+             "(default: per model, unlimited for unknown models, or $GAIT_CONTEXT_TOKENS; 0 = no limit)"
+    )
     
     # ----------------------------
     # System prompt + memory + resume
@@ -1475,6 +1807,19 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Print short commit id after each recorded turn"
     )
+
+    chat.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="Wait for the whole reply instead of printing it as it arrives"
+    )
+
+    chat.add_argument(
+        "--cache",
+        action="store_true",
+        default=response_cache_enabled_from_env(),
+        help="Reuse stored replies for identical requests (.gait/llm-cache.db; default: $GAIT_LLM_CACHE)"
+    )
     
     # ----------------------------
     # Provider selection
@@ -1540,12 +1885,22 @@ def build_parser() -> argparse.ArgumentParser:
     s.add_argument("--owner", required=True)
     s.add_argument("--repo", required=True)
     s.add_argument("--branch", default=None)
+    s.add_argument("--jobs", "-j", type=int, default=None,
+                   help="Concurrent object requests (default: $GAIT_TRANSFER_JOBS or 8)")
     s.set_defaults(func=cmd_push)
 
     s = sub.add_parser("fetch", help="Fetch refs + objects from remote")
     s.add_argument("remote", nargs="?", default="origin")
     s.add_argument("--owner", required=True)
     s.add_argument("--repo", required=True)
+    s.add_argument("--jobs", "-j", type=int, default=None,
+                   help="Concurrent object requests (default: $GAIT_TRANSFER_JOBS or 8)")
+    s.add_argument("--depth", type=int, default=None,
+                   help="Only fetch the last N commits of each branch (shallow)")
+    s.add_argument("--since", default=None,
+                   help="Only fetch commits created on/after DATE (YYYY-MM-DD; shallow)")
+    s.add_argument("--unshallow", action="store_true",
+                   help="Fetch the full history behind a shallow clone")
     s.set_defaults(func=cmd_fetch)
 
     s = sub.add_parser("pull", help="Fetch + merge remote tracking branch into current branch")
@@ -1554,6 +1909,8 @@ def build_parser() -> argparse.ArgumentParser:
     s.add_argument("--repo", required=True)
     s.add_argument("--branch", default=None)
     s.add_argument("--with-memory", action="store_true")
+    s.add_argument("--jobs", "-j", type=int, default=None,
+                   help="Concurrent object requests (default: $GAIT_TRANSFER_JOBS or 8)")
     s.set_defaults(func=cmd_pull)
 
     s = sub.add_parser("clone", help="Clone a repo from gaithubd")
@@ -1563,6 +1920,14 @@ def build_parser() -> argparse.ArgumentParser:
     s.add_argument("--path", required=True)
     s.add_argument("--remote", default="origin")
     s.add_argument("--branch", default="main")
+    s.add_argument("--jobs", "-j", type=int, default=None,
+                   help="Concurrent object requests (default: $GAIT_TRANSFER_JOBS or 8)")
+    s.add_argument("--depth", type=int, default=None,
+                   help="Only fetch the last N commits of each branch (shallow)")
+    s.add_argument("--since", default=None,
+                   help="Only fetch commits created on/after DATE (YYYY-MM-DD; shallow)")
+    s.add_argument("--partial", action="store_true",
+                   help="Skip turn bodies; download them from the remote on first use")
     s.set_defaults(func=cmd_clone)
 
     repo_cmd = sub.add_parser("repo", help="Manage remote repos")
@@ -1574,9 +1939,50 @@ def build_parser() -> argparse.ArgumentParser:
     r.add_argument("--repo", required=True)
     r.set_defaults(func=cmd_repo_create)
 
+    b = sub.add_parser("bundle", help="Move history between repos as a single file (offline transfer)")
+    bsub = b.add_subparsers(dest="bundle_cmd", required=True)
+
+    r = bsub.add_parser("create", help="Write BRANCHes (default: current) and their memory to FILE")
+    r.add_argument("file")
+    r.add_argument("branches", nargs="*")
+    r.add_argument("--base", action="append", default=[],
+                   help="Leave out history reachable from COMMIT; the reader must have it (repeatable)")
+    r.set_defaults(func=cmd_bundle_create)
+
+    r = bsub.add_parser("unbundle", help="Import FILE; its branches become remotes/NAME/<branch>")
+    r.add_argument("file")
+    r.add_argument("--name", default="bundle", help="Ref namespace for the bundled branches (default: bundle)")
+    r.set_defaults(func=cmd_bundle_unbundle)
+
+    s = sub.add_parser("daemon", help="Keep this repo loaded and answer CLI requests over .gait/daemon.sock")
+    g = s.add_mutually_exclusive_group()
+    g.add_argument("--stop", action="store_true", help="Stop the running daemon")
+    g.add_argument("--status", action="store_true", help="Report whether a daemon is running")
+    s.set_defaults(func=cmd_daemon)
+
+    s = sub.add_parser("serve", help="Serve repos under ROOT over the gaithubd HTTP API (local use, benchmarks)")
+    s.add_argument("--root", default=".", help="Directory holding <owner>/<repo> (default: .)")
+    s.add_argument("--host", default=None, help="Address to bind (default: 127.0.0.1)")
+    s.add_argument("--port", type=int, default=None, help="Port to bind (default: 8787)")
+    s.add_argument("--token", default=None,
+                   help="Bearer token required for writes (default: $GAITHUB_TOKEN; empty allows all)")
+    s.add_argument("--no-batch", action="store_true",
+                   help="Disable the /objects/pack and /objects/fetch-pack endpoints")
+    s.set_defaults(func=cmd_serve)
+
     s = sub.add_parser("verify", help="Verify refs + objects integrity")
+    s.add_argument("--jobs", "-j", type=int, default=1,
+                   help="Hash objects in N worker processes (default: 1)")
+    s.add_argument("--incremental", action="store_true",
+                   help="Only check objects added since the last clean verify")
+    s.add_argument("--json", action="store_true", help="Print a machine-readable summary")
     s.set_defaults(func=cmd_verify)
 
+    s = sub.add_parser("repack", help="Pack loose objects (and existing packs) into a single packfile")
+    s.add_argument("--keep-loose", action="store_true",
+                   help="Keep loose object files after packing them")
+    s.set_defaults(func=cmd_repack)
+
     return p
 
 def main() -> int:
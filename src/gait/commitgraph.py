@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import json
+import struct
+import time
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .objects import has_object, read_object_bytes
+
+# ---------------------------------------------------------------------
+# Commit-graph cache: .gait/objects/info/commit-graph
+#
+#   header  b"GCGR" | u32 version
+#   records appended in topological order (parents before children):
+#           32-byte raw oid | u32 parent1 | u32 parent2 | u32 generation | u64 timestamp
+#
+# Parents are record positions in the same file, so a record never has to
+# be rewritten; adding a commit is a single append. generation is
+# 1 + max(generation of parents) (1 for root commits), which lets ancestry
+# queries stop descending as soon as they drop below the target.
+#
+# A parent that is not stored yet is recorded as MISSING_PARENT (shallow
+# boundaries, or objects that arrive tip-first during a push or fetch).
+# Queries that touch such a record, or one descending from it, first check
+# whether a missing parent has arrived since; if so the file is cut back to
+# just before the first stale record and rebuilt on demand. Children always
+# follow their parents, so everything cut is the record itself, its
+# descendants, or a record that is simply re-added.
+# ---------------------------------------------------------------------
+
+GRAPH_MAGIC = b"GCGR"
+GRAPH_VERSION = 1
+
+_HEADER = struct.Struct(">4sI")
+_REC = struct.Struct(">32sIIIQ")
+
+NO_PARENT = 0xFFFFFFFF
+MISSING_PARENT = 0xFFFFFFFE   # parent object not present locally
+EXTRA_PARENTS = 0xFFFFFFFD    # (parent2 only) >2 parents: read the commit JSON
+
+
+def graph_path(objects_dir: Path) -> Path:
+    return objects_dir / "info" / "commit-graph"
+
+
+@lru_cache(maxsize=4096)
+def _parse_ts(created_at: str) -> int:
+    try:
+        return int(time.mktime(time.strptime(created_at, "%Y-%m-%dT%H:%M:%S")))
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
+
+class CommitGraph:
+    def __init__(self, objects_dir: Path) -> None:
+        self.objects_dir = objects_dir
+        self.path = graph_path(objects_dir)
+        self._size = -1
+        self._pos: Dict[str, int] = {}
+        self._oids: List[str] = []
+        self._p1 = array("I")
+        self._p2 = array("I")
+        self._gen = array("I")
+        self._ts = array("Q")
+        self._holes: Dict[int, Optional[List[str]]] = {}  # position -> parents missing when written
+        self._incomplete: Set[int] = set()  # holes and their descendants
+
+    # ----------------------------
+    # Load / append
+    # ----------------------------
+
+    def _refresh(self) -> None:
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size == self._size:
+            return
+        if size < self._size or self._size < 0:
+            self._reset()
+        if size > _HEADER.size:
+            with self.path.open("rb") as f:
+                magic, version = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != GRAPH_MAGIC or version != GRAPH_VERSION:
+                    raise ValueError(f"Unsupported commit-graph: {self.path}")
+                start = _HEADER.size + len(self._oids) * _REC.size
+                f.seek(start)
+                data = f.read(size - start)
+            usable = len(data) - (len(data) % _REC.size)
+            for raw, p1, p2, gen, ts in _REC.iter_unpack(data[:usable]):
+                oid = raw.hex()
+                i = len(self._oids)
+                self._pos.setdefault(oid, i)
+                self._oids.append(oid)
+                self._p1.append(p1)
+                self._p2.append(p2)
+                self._gen.append(gen)
+                self._ts.append(ts)
+                self._mark_incomplete(i)
+            size = start + usable
+        self._size = size
+
+    def _reset(self) -> None:
+        self._pos = {}
+        self._oids = []
+        self._p1 = array("I")
+        self._p2 = array("I")
+        self._gen = array("I")
+        self._ts = array("Q")
+        self._holes = {}
+        self._incomplete = set()
+
+    def _mark_incomplete(self, i: int) -> None:
+        ps = self._parent_positions(i)
+        if any(p == MISSING_PARENT for p in ps):
+            self._holes[i] = None  # parent oids are read from the commit when first checked
+            self._incomplete.add(i)
+        elif any(p in self._incomplete for p in ps):
+            self._incomplete.add(i)
+
+    def _heal(self, *positions: Optional[int]) -> bool:
+        """
+        If any of `positions` descends from a missing parent that is now
+        stored, cut the graph back to before the first such record and
+        return True (positions are then stale; callers re-run their query).
+        """
+        if not any(i in self._incomplete for i in positions if i is not None):
+            return False
+        cut: Optional[int] = None
+        for i in sorted(self._holes):
+            missing = self._holes[i]
+            if missing is None:
+                # parents precede children, so one recorded later (or not at all) was missing
+                c = self._load_commit(self._oids[i]) or {}
+                missing = self._holes[i] = [p for p in (c.get("parents") or []) if p and self._pos.get(p, i + 1) > i]
+            if any(has_object(self.objects_dir, p) for p in missing):
+                cut = i
+                break
+        if cut is None:
+            return False
+        with self.path.open("r+b") as f:
+            f.truncate(_HEADER.size + cut * _REC.size)
+        self._reset()
+        self._size = -1
+        self._refresh()
+        return True
+
+    def invalidate(self) -> None:
+        """
+        Drop the on-disk graph (e.g. after history that was missing becomes available).
+        """
+        self.path.unlink(missing_ok=True)
+        self._reset()
+        self._size = -1
+
+    def _append(self, oid: str, parents: List[str], created_at: str) -> int:
+        self._append_many([(oid, parents, created_at)])
+        return self._pos[oid]
+
+    def _append_many(self, records: List[Tuple[str, List[str], str]]) -> None:
+        """
+        Append records whose parents are already in the graph or earlier in `records`.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("ab") as f:
+            end = f.tell()
+            if end == 0:
+                f.write(_HEADER.pack(GRAPH_MAGIC, GRAPH_VERSION))
+                end = _HEADER.size
+            if end != _HEADER.size + len(self._oids) * _REC.size:
+                # another writer appended since we loaded; positions must match the file
+                self._refresh()
+
+            base = len(self._oids)
+            local_pos: Dict[str, int] = {}
+            local_gen: List[int] = []
+            chunks: List[bytes] = []
+            for oid, parents, created_at in records:
+                idx: List[int] = []
+                gens: List[int] = []
+                for p in parents:
+                    pos = self._pos.get(p)
+                    if pos is not None:
+                        idx.append(pos)
+                        gens.append(self._gen[pos])
+                    elif p in local_pos:
+                        idx.append(local_pos[p])
+                        gens.append(local_gen[local_pos[p] - base])
+                    else:
+                        idx.append(MISSING_PARENT)
+
+                p1 = idx[0] if idx else NO_PARENT
+                p2 = idx[1] if len(idx) > 1 else NO_PARENT
+                if len(idx) > 2:
+                    p2 = EXTRA_PARENTS
+
+                gen = 1 + max(gens, default=0)
+                local_pos.setdefault(oid, base + len(local_gen))
+                local_gen.append(gen)
+                chunks.append(_REC.pack(bytes.fromhex(oid), p1, p2, gen, _parse_ts(created_at)))
+
+            f.write(b"".join(chunks))
+
+        # pick up our records (and anything other writers appended)
+        self._refresh()
+
+    def extend(self, commits: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        Batch-add commits given oldest->newest as (oid, commit dict) with one append.
+        Returns the number of new records.
+        """
+        self._refresh()
+        batch: List[Tuple[str, List[str], str]] = []
+        queued: Set[str] = set()
+        for oid, c in commits:
+            if oid in self._pos or oid in queued:
+                continue
+            parents = [p for p in (c.get("parents") or []) if p]
+            for p in parents:
+                if p not in self._pos and p not in queued:
+                    self.add(p)
+            batch.append((oid, parents, c.get("created_at") or ""))
+            queued.add(oid)
+        if batch:
+            self._append_many(batch)
+        return len(batch)
+
+    def _load_commit(self, oid: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(read_object_bytes(self.objects_dir, oid))
+        except FileNotFoundError:
+            return None
+
+    def add(self, oid: str, commit: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        """
+        Ensure `oid` (and any of its ancestors not yet in the graph) has a record.
+        Pass the commit dict when the caller already has it. Returns the record
+        position, or None if the commit object is not available locally.
+        """
+        self._refresh()
+        if oid in self._pos:
+            return self._pos[oid]
+
+        # iterative post-order so parents are appended before children
+        pending: Dict[str, Dict[str, Any]] = {}
+        missing: Set[str] = set()
+        if commit is not None:
+            pending[oid] = commit
+        stack = [oid]
+        while stack:
+            cid = stack[-1]
+            if cid in self._pos:
+                stack.pop()
+                continue
+            c = pending.get(cid)
+            if c is None:
+                c = self._load_commit(cid)
+                if c is None:
+                    missing.add(cid)
+                    stack.pop()
+                    continue
+                pending[cid] = c
+            parents = [p for p in (c.get("parents") or []) if p]
+            todo = [p for p in parents if p not in self._pos and p not in pending and p not in missing]
+            if todo:
+                stack.extend(todo)
+                continue
+            stack.pop()
+            self._append(cid, parents, c.get("created_at") or "")
+        return self._pos.get(oid)
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+
+    def __contains__(self, oid: str) -> bool:
+        self._refresh()
+        return oid in self._pos
+
+    def _parent_positions(self, i: int) -> List[int]:
+        p1, p2 = self._p1[i], self._p2[i]
+        if p2 == EXTRA_PARENTS:
+            c = self._load_commit(self._oids[i]) or {}
+            return [self._pos.get(p, MISSING_PARENT) for p in (c.get("parents") or []) if p]
+        return [p for p in (p1, p2) if p != NO_PARENT]
+
+    def parents(self, oid: str) -> List[str]:
+        """
+        Parent oids that are present locally (missing parents are omitted).
+        """
+        i = self.add(oid)
+        while self._heal(i):
+            i = self.add(oid)
+        if i is None:
+            raise FileNotFoundError(f"Object not found: {oid}")
+        return [self._oids[p] for p in self._parent_positions(i) if p < MISSING_PARENT]
+
+    def generation(self, oid: str) -> int:
+        i = self.add(oid)
+        while self._heal(i):
+            i = self.add(oid)
+        if i is None:
+            raise FileNotFoundError(f"Object not found: {oid}")
+        return self._gen[i]
+
+    def timestamp(self, oid: str) -> int:
+        i = self.add(oid)
+        while self._heal(i):
+            i = self.add(oid)
+        if i is None:
+            raise FileNotFoundError(f"Object not found: {oid}")
+        return self._ts[i]
+
+    def is_ancestor(self, maybe_ancestor: str, commit_id: str) -> bool:
+        anc = self.add(maybe_ancestor)
+        cur = self.add(commit_id)
+        while self._heal(anc, cur):
+            anc = self.add(maybe_ancestor)
+            cur = self.add(commit_id)
+        if anc is None or cur is None:
+            raise FileNotFoundError(f"Object not found: {maybe_ancestor if anc is None else commit_id}")
+
+        anc_gen = self._gen[anc]
+        anc_oid = self._oids[anc]
+        stack = [cur]
+        seen: Set[int] = set()
+        while stack:
+            i = stack.pop()
+            if i in seen:
+                continue
+            seen.add(i)
+            if self._oids[i] == anc_oid:
+                return True
+            if self._gen[i] <= anc_gen:
+                continue
+            for p in self._parent_positions(i):
+                if p < MISSING_PARENT and p not in seen:
+                    stack.append(p)
+        return False
+
+    def first_parent_ids(self, start: str, limit: int) -> List[str]:
+        """
+        start, its first parent, its first parent's first parent, ... (newest->oldest).
+        """
+        out: List[str] = []
+        i = self.add(start)
+        while self._heal(i):
+            i = self.add(start)
+        seen: Set[int] = set()
+        while i is not None and i not in seen and len(out) < limit:
+            seen.add(i)
+            out.append(self._oids[i])
+            ps = self._parent_positions(i)
+            i = ps[0] if ps and ps[0] < MISSING_PARENT else None
+        return out
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from .tokens import DEFAULT_ENCODING, count_tokens, truncate_tokens
+
+# ---------------------------------------------------------------------
+# Token-budgeted prompt assembly for gait chat
+#
+# The budget is filled by priority:
+#   1. the system prompt and the new user message (always sent)
+#   2. pinned memory, in pin order; the first pin that does not fit is
+#      truncated, the rest are replaced by a one-line "omitted" note
+#   3. conversation history, newest first, kept whole and contiguous
+#
+# Counts are approximate (tiktoken cl100k_base plus a per-message
+# overhead); that is close enough to keep prompts inside the window.
+# Pins are costed from the token index when their counts are attached,
+# so assembling a prompt does not re-encode pinned turns.
+# ---------------------------------------------------------------------
+
+MESSAGE_OVERHEAD = 4  # role + separators, per message
+DEFAULT_REPLY_RESERVE = 1024
+MIN_TRUNCATED_PIN = 32  # don't bother sending a smaller slice of a pin
+PIN_LABEL_TOKENS = 8  # "  User: " / "  Assistant: " prefixes and newlines
+
+PINS_PREAMBLE = "You are a helpful assistant. Use the following pinned context from GAIT memory if relevant:"
+TRUNCATED_MARK = " …[truncated]"
+
+# Context windows by model-name prefix (first match wins). Unknown models
+# are not limited, as before budgeting existed; --context-tokens (or
+# GAIT_CONTEXT_TOKENS) sets a window for them or overrides a known one.
+MODEL_CONTEXT_TOKENS = (
+    ("gpt-5", 400000),
+    ("gpt-4o", 128000),
+    ("gpt-4.1", 1000000),
+    ("gpt-4-turbo", 128000),
+    ("gpt-4", 8192),
+    ("gpt-3.5", 16385),
+    ("o1", 128000),
+    ("o3", 200000),
+    ("o4", 200000),
+    ("claude", 200000),
+    ("gemini-1.5", 1000000),
+    ("gemini-2", 1000000),
+    ("gemini-3", 1000000),
+    ("gemini", 32768),
+    ("llama3.1", 131072),
+    ("llama3.2", 131072),
+    ("llama3", 8192),
+    ("mistral", 32768),
+    ("qwen2.5", 32768),
+)
+
+
+def context_window_for(model: str) -> Optional[int]:
+    """
+    The model's context window in tokens, or None when the model is not known.
+    """
+    name = (model or "").strip().lower()
+    name = name.rsplit("/", 1)[-1]  # "models/gemini-1.5-pro", "meta/llama3"
+    for prefix, window in MODEL_CONTEXT_TOKENS:
+        if name.startswith(prefix):
+            return window
+    return None
+
+
+def context_tokens_from_env() -> Optional[int]:
+    """
+    GAIT_CONTEXT_TOKENS overrides the model's context window (0: no limit).
+    """
+    env = os.environ.get("GAIT_CONTEXT_TOKENS", "").strip()
+    return int(env) if env else None
+
+
+def context_budget(model: str, *, reply_tokens: Optional[int] = None, override: Optional[int] = None) -> int:
+    """
+    Prompt token budget: the model's window minus room for the reply.
+    `override` replaces the window; 0 (and an unknown model) means no limit.
+    """
+    if override == 0:
+        return 0
+    window = override if override is not None else context_window_for(model)
+    if window is None:
+        return 0
+    reserve = reply_tokens if reply_tokens is not None else min(DEFAULT_REPLY_RESERVE, window // 4)
+    return max(1, window - reserve)
+
+
+@lru_cache(maxsize=4096)
+def _count(text: str, encoding: str) -> int:
+    return count_tokens(text, encoding=encoding)
+
+
+def message_tokens(msg: Dict[str, Any], *, encoding: str = DEFAULT_ENCODING) -> int:
+    return _count(str(msg.get("content") or ""), encoding) + MESSAGE_OVERHEAD
+
+
+def _pin_header(it: Dict[str, Any]) -> str:
+    note = (it.get("note") or "").strip()
+    return f"- PIN {it['index']}" + (f" ({note})" if note else "")
+
+
+def pin_tokens(it: Dict[str, Any], *, encoding: str = DEFAULT_ENCODING) -> int:
+    """
+    Tokens render_pin(it) costs. Items carrying "token_counts" (from the
+    token index, see GaitRepo.turn_token_counts) are not re-encoded.
+    """
+    tc = it.get("token_counts")
+    if isinstance(tc, dict) and isinstance(tc.get("input_total"), int) and isinstance(tc.get("output_total"), int):
+        return _count(_pin_header(it), encoding) + tc["input_total"] + tc["output_total"] + PIN_LABEL_TOKENS
+    return _count(render_pin(it), encoding)
+
+
+def render_pin(it: Dict[str, Any]) -> str:
+    """
+    One pinned item from build_context_bundle as prompt lines.
+    """
+    u = (it.get("user_text") or "").strip()
+    a = (it.get("assistant_text") or "").strip()
+    lines = [_pin_header(it)]
+    if u:
+        lines.append(f"  User: {u}")
+    if a:
+        lines.append(f"  Assistant: {a}")
+    return "\n".join(lines)
+
+
+@dataclass
+class AssembledContext:
+    messages: List[Dict[str, str]]
+    tokens: int
+    budget: int
+    pins_kept: int = 0
+    pins_total: int = 0
+    turns_kept: int = 0
+    turns_total: int = 0
+    truncated: int = 0
+
+    @property
+    def over_budget(self) -> bool:
+        return bool(self.budget) and self.tokens > self.budget
+
+    @property
+    def trimmed(self) -> bool:
+        """
+        True if pins or history were left out or cut to fit the budget.
+        """
+        return self.pins_kept < self.pins_total or self.turns_kept < self.turns_total or bool(self.truncated)
+
+    def summary(self) -> str:
+        out = f"prompt {self.tokens}"
+        if self.budget:
+            out += f"/{self.budget}"
+        out += f" tokens (pins {self.pins_kept}/{self.pins_total}, messages {self.turns_kept}/{self.turns_total}"
+        if self.truncated:
+            out += f", {self.truncated} truncated"
+        return out + ")"
+
+
+def _pins_message(
+    pins: List[Dict[str, Any]],
+    room: Optional[int],
+    encoding: str,
+) -> tuple[Optional[Dict[str, str]], int, int, int]:
+    """
+    (system message or None, pins kept, pins truncated, tokens) within
+    `room` tokens (None: no limit).
+    """
+    if not pins:
+        return None, 0, 0, 0
+    parts = [PINS_PREAMBLE]
+    used = _count(PINS_PREAMBLE, encoding) + MESSAGE_OVERHEAD
+    if room is not None and used > room:
+        return None, 0, 0, 0
+
+    kept = truncated = 0
+    for it in pins:
+        text = render_pin(it)
+        cost = pin_tokens(it, encoding=encoding) + 1  # newline
+        if room is None or used + cost <= room:
+            parts.append(text)
+            used += cost
+            kept += 1
+            continue
+        left = room - used - _count(TRUNCATED_MARK, encoding) - 1
+        if left >= MIN_TRUNCATED_PIN:
+            piece = truncate_tokens(text, left, encoding=encoding) + TRUNCATED_MARK
+            parts.append(piece)
+            used += _count(piece, encoding) + 1
+            kept += 1
+            truncated += 1
+        break
+
+    omitted = len(pins) - kept
+    if omitted and room is not None:
+        note = f"({omitted} more pinned item(s) omitted to fit the context window)"
+        if used + _count(note, encoding) + 1 <= room:
+            parts.append(note)
+
+    if kept == 0:
+        return None, 0, 0, 0
+    return {"role": "system", "content": "\n".join(parts)}, kept, truncated, used
+
+
+def assemble_context(
+    *,
+    history: List[Dict[str, str]],
+    pins: Optional[List[Dict[str, Any]]] = None,
+    system: str = "",
+    budget: int = 0,
+    encoding: str = DEFAULT_ENCODING,
+) -> AssembledContext:
+    """
+    Build the message list for one request. `history` is the conversation
+    so far, oldest first, ending with the new user message; `pins` are
+    build_context_bundle items. budget=0 sends everything.
+    """
+    if not history:
+        raise ValueError("history must end with the new user message")
+    pins = pins or []
+    current, earlier = history[-1], history[:-1]
+
+    sys_msg = {"role": "system", "content": system} if system else None
+    used = message_tokens(current, encoding=encoding)
+    if sys_msg is not None:
+        used += message_tokens(sys_msg, encoding=encoding)
+
+    pin_msg, pins_kept, truncated, pin_cost = _pins_message(pins, (budget - used) if budget else None, encoding)
+    used += pin_cost
+
+    start = len(earlier)
+    while start > 0:
+        cost = message_tokens(earlier[start - 1], encoding=encoding)
+        if budget and used + cost > budget:
+            break
+        used += cost
+        start -= 1
+    # never open on an assistant reply whose question was cut
+    while start < len(earlier) and earlier[start].get("role") == "assistant":
+        used -= message_tokens(earlier[start], encoding=encoding)
+        start += 1
+    kept = earlier[start:]
+
+    messages: List[Dict[str, str]] = []
+    if pin_msg is not None:
+        messages.append(pin_msg)
+    if sys_msg is not None:
+        messages.append(sys_msg)
+    messages.extend(kept)
+    messages.append(current)
+
+    return AssembledContext(
+        messages=messages,
+        tokens=used,
+        budget=budget,
+        pins_kept=pins_kept,
+        pins_total=len(pins),
+        turns_kept=len(kept),
+        turns_total=len(earlier),
+        truncated=truncated,
+    )
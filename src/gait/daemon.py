@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Dict, Optional
+
+from .repo import GaitRepo
+from .schema import Turn
+from .objects import resolve_prefix
+from .log import walk_commits
+
+if TYPE_CHECKING:
+    import socket
+
+# ---------------------------------------------------------------------
+# gait daemon: one long-lived GaitRepo (object cache, commit graph, turn
+# and token indexes stay warm) serving requests on .gait/daemon.sock
+#
+#   request   {"id": n, "op": "...", "args": {...}} + "\n"
+#   response  {"id": n, "ok": true, "result": ...} + "\n"
+#             {"id": n, "ok": false, "error": "...", "type": "ValueError"} + "\n"
+#
+# A connection may send any number of requests; they are answered in
+# order. Requests run one at a time, so a record_turn never races another
+# one from the same daemon.
+#
+# The CLI sends status / log / show / context / record-turn to a running
+# daemon and otherwise runs the same op functions in-process (run() below).
+# GAIT_NO_DAEMON=1 always runs in-process. `socket` is imported only once
+# a socket file exists, so commands pay nothing when no daemon is running.
+# ---------------------------------------------------------------------
+
+SOCKET_NAME = "daemon.sock"
+CLIENT_TIMEOUT = 30.0
+
+# error types a client re-raises as themselves; anything else is a RuntimeError
+_ERRORS: Dict[str, type] = {
+    "ValueError": ValueError,
+    "FileNotFoundError": FileNotFoundError,
+    "KeyError": KeyError,
+    "RuntimeError": RuntimeError,
+}
+
+
+def socket_path(gait_dir: Path) -> Path:
+    return gait_dir / SOCKET_NAME
+
+
+def daemon_disabled_from_env() -> bool:
+    """
+    GAIT_NO_DAEMON=1: never talk to a daemon.
+    """
+    return os.environ.get("GAIT_NO_DAEMON", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+# ----------------------------
+# Ops (run by the daemon, or in-process when none is running)
+# ----------------------------
+
+def op_ping(repo: GaitRepo, args: Dict[str, Any]) -> Dict[str, Any]:
+    from . import __version__
+
+    return {"pid": os.getpid(), "root": str(repo.root), "version": __version__}
+
+
+def op_status(repo: GaitRepo, args: Dict[str, Any]) -> Dict[str, Any]:
+    return {"root": str(repo.root), "branch": repo.current_branch(), "head": repo.head_commit_id()}
+
+
+def op_record_turn(repo: GaitRepo, args: Dict[str, Any]) -> Dict[str, Any]:
+    if not isinstance(args.get("user"), str) or not isinstance(args.get("assistant"), str):
+        raise ValueError("record_turn needs string 'user' and 'assistant'")
+    turn = Turn.v0(
+        user_text=args["user"],
+        assistant_text=args["assistant"],
+        context=args.get("context") or {},
+        tools=args.get("tools") or {},
+        model=args.get("model") or {},
+        tokens=args.get("tokens") or None,
+        visibility=args.get("visibility") or "private",
+    )
+    turn_id, commit_id = repo.record_turn(turn, message=args.get("message") or "")
+    return {"turn_id": turn_id, "commit_id": commit_id, "branch": repo.current_branch()}
+
+
+def op_log(repo: GaitRepo, args: Dict[str, Any]) -> Dict[str, Any]:
+    shallow = repo.read_shallow()
+    commits = list(walk_commits(repo, limit=int(args.get("limit") or 20)))
+    return {"commits": commits, "shallow": [c["_id"] for c in commits if c["_id"] in shallow]}
+
+
+def op_show(repo: GaitRepo, args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    A commit with its turns, or a turn with the commits that recorded it.
+    """
+    oid = str(args.get("oid") or "")
+    obj = repo.get_object(oid)
+    if obj.get("schema") == "gait.turn.v0":
+        turn_id = resolve_prefix(repo.objects_dir, oid)
+        return {"turn_id": turn_id, "commits": repo.commits_for_turn(turn_id), "turn": obj}
+    turn_ids = obj.get("turn_ids") or []
+    repo.prefetch(turn_ids)
+    return {"commit_id": oid, "commit": obj, "turns": [repo.get_turn(t) for t in turn_ids]}
+
+
+def op_context(repo: GaitRepo, args: Dict[str, Any]) -> Dict[str, Any]:
+    return repo.build_context_bundle(full=bool(args.get("full")))
+
+
+OPS: Dict[str, Callable[[GaitRepo, Dict[str, Any]], Any]] = {
+    "ping": op_ping,
+    "status": op_status,
+    "record_turn": op_record_turn,
+    "log": op_log,
+    "show": op_show,
+    "context": op_context,
+}
+
+
+# ----------------------------
+# Client
+# ----------------------------
+
+class DaemonClient:
+    def __init__(self, path: Path, *, timeout: float = CLIENT_TIMEOUT) -> None:
+        import socket
+
+        self.path = path
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        try:
+            self._sock.connect(str(path))
+        except OSError:
+            self._sock.close()
+            raise
+        self._f: BinaryIO = self._sock.makefile("rwb")
+        self._next_id = 0
+
+    def close(self) -> None:
+        try:
+            self._f.close()
+        finally:
+            self._sock.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def call(self, op: str, **args: Any) -> Any:
+        self._next_id += 1
+        req = {"id": self._next_id, "op": op, "args": args}
+        try:
+            self._f.write(json.dumps(req, ensure_ascii=False).encode("utf-8") + b"\n")
+            self._f.flush()
+            line = self._f.readline()
+        except OSError as e:
+            raise RuntimeError(f"gait daemon connection failed: {e}") from e
+        if not line:
+            raise RuntimeError("gait daemon closed the connection")
+        resp = json.loads(line)
+        if not resp.get("ok"):
+            exc = _ERRORS.get(resp.get("type") or "", RuntimeError)
+            raise exc(resp.get("error") or "gait daemon request failed")
+        return resp.get("result")
+
+
+def connect(gait_dir: Path) -> Optional[DaemonClient]:
+    """
+    A client for the daemon serving this repo, or None if none is running.
+    """
+    if daemon_disabled_from_env():
+        return None
+    path = socket_path(gait_dir)
+    if not path.exists():
+        return None
+    import socket
+
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        return DaemonClient(path)
+    except OSError:
+        return None  # stale socket left by a daemon that died
+
+
+def run(repo: GaitRepo, op: str, **args: Any) -> Any:
+    """
+    Run `op` in the repo's daemon if one is running, else in this process.
+    """
+    client = connect(repo.gait_dir)
+    if client is None:
+        return OPS[op](repo, args)
+    with client:
+        return client.call(op, **args)
+
+
+# ----------------------------
+# Server
+# ----------------------------
+
+def _serve_connection(daemon: "GaitDaemon", conn: socket.socket) -> None:
+    with conn, conn.makefile("rwb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            rid: Any = None
+            try:
+                req = json.loads(line)
+                if not isinstance(req, dict):
+                    raise ValueError("request must be a JSON object")
+                rid = req.get("id")
+                resp = {"id": rid, "ok": True, "result": daemon.handle(str(req.get("op") or ""), req.get("args") or {})}
+            except Exception as e:
+                resp = {"id": rid, "ok": False, "error": str(e), "type": type(e).__name__}
+            f.write(json.dumps(resp, ensure_ascii=False).encode("utf-8") + b"\n")
+            f.flush()
+
+
+class GaitDaemon:
+    def __init__(self, repo: GaitRepo) -> None:
+        import socket
+
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("gait daemon needs Unix domain sockets, which this platform lacks")
+        self.repo = repo
+        self.path = socket_path(repo.gait_dir)
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sock: Optional[socket.socket] = None
+
+    def handle(self, op: str, args: Dict[str, Any]) -> Any:
+        if op == "shutdown":
+            self._stop.set()
+            return {"pid": os.getpid()}
+        fn = OPS.get(op)
+        if fn is None:
+            raise ValueError(f"Unknown op: {op!r}")
+        if not isinstance(args, dict):
+            raise ValueError("args must be a JSON object")
+        with self._lock:
+            self.requests += 1
+            return fn(self.repo, args)
+
+    def bind(self) -> None:
+        if self.path.exists():
+            try:
+                DaemonClient(self.path, timeout=1.0).close()
+            except OSError:
+                self.path.unlink()  # stale
+            else:
+                raise RuntimeError(f"A gait daemon is already running for {self.repo.root}")
+        import socket
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # created 0600 rather than chmod-ed after bind(), which would leave a
+        # window where another local user could connect
+        old_umask = os.umask(0o177)
+        try:
+            sock.bind(str(self.path))
+        except OSError as e:
+            sock.close()
+            raise RuntimeError(f"Cannot bind {self.path}: {e}") from e
+        finally:
+            os.umask(old_umask)
+        sock.listen(64)
+        sock.settimeout(0.2)  # so serve_forever notices shutdown
+        self._sock = sock
+
+    def serve_forever(self) -> None:
+        import socket
+
+        if self._sock is None:
+            self.bind()
+        assert self._sock is not None
+        try:
+            while not self._stop.is_set():
+                try:
+                    conn, _ = self._sock.accept()
+                except socket.timeout:
+                    continue
+                conn.settimeout(None)
+                threading.Thread(target=_serve_connection, args=(self, conn), daemon=True).start()
+        finally:
+            self.close()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+            self.path.unlink(missing_ok=True)
+
+
+def serve_in_thread(repo: GaitRepo) -> GaitDaemon:
+    """
+    Start a daemon for `repo` on a background thread (tests, benchmarks).
+    """
+    d = GaitDaemon(repo)
+    d.bind()
+    threading.Thread(target=d.serve_forever, daemon=True).start()
+    return d
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import http.client
+import os
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+# ---------------------------------------------------------------------
+# Pooled HTTP/1.1 client (http.client) shared by remote.py and llm.py
+#
+# Connections are kept per (scheme, host, port) and reused while idle for
+# less than `idle_timeout` seconds. `max_per_host` bounds how many idle
+# connections are kept, not how many can be open at once: a busy caller
+# never blocks on the pool, extra connections are just closed on release.
+#
+# Hosts that the environment routes through a proxy (HTTP(S)_PROXY /
+# NO_PROXY) go through urllib instead, without pooling.
+# ---------------------------------------------------------------------
+
+DEFAULT_MAX_PER_HOST = 8
+DEFAULT_IDLE_TIMEOUT = 30.0
+
+MAX_REDIRECTS = 5
+
+_READ_SIZE = 64 * 1024
+
+_Key = Tuple[str, str, int]
+_REDIRECTS = (301, 302, 303, 307, 308)
+
+# a reused connection the server already closed fails with one of these
+# before any response arrives; the request is retried on a new connection
+_STALE_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError, ConnectionAbortedError)
+
+
+class Response:
+    """
+    Minimal response object: status, reason, headers, read(), readline(), close().
+    Closing a fully read response returns its connection to the pool.
+    """
+
+    def __init__(self, status: int, reason: str, headers: Any, fp: Any, release: Any = None) -> None:
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._fp = fp
+        self._release = release
+        self._buf = b""  # read past the last line returned
+
+    def read(self, n: int = -1) -> bytes:
+        buf, self._buf = self._buf, b""
+        if n is None or n < 0:
+            return buf + self._fp.read()
+        if len(buf) >= n:
+            self._buf = buf[n:]
+            return buf[:n]
+        return buf + self._fp.read(n - len(buf))
+
+    def readline(self) -> bytes:
+        # HTTPResponse.readline() goes through peek(), which reports a chunked
+        # body cut off mid-stream as a clean EOF; read1() raises IncompleteRead
+        read1 = getattr(self._fp, "read1", None)
+        if read1 is None:
+            return self._fp.readline()
+        while b"\n" not in self._buf:
+            data = read1(_READ_SIZE)
+            if not data:
+                if getattr(self._fp, "length", None):
+                    raise http.client.IncompleteRead(self._buf, self._fp.length)
+                break
+            self._buf += data
+        end = self._buf.find(b"\n") + 1 or len(self._buf)
+        line, self._buf = self._buf[:end], self._buf[end:]
+        return line
+
+    def close(self) -> None:
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+        else:
+            self._fp.close()
+
+    def __enter__(self) -> "Response":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class ConnectionPool:
+    def __init__(self, *, max_per_host: int = DEFAULT_MAX_PER_HOST, idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> None:
+        self.max_per_host = max(0, int(max_per_host))
+        self.idle_timeout = float(idle_timeout)
+        self._idle: Dict[_Key, List[Tuple[http.client.HTTPConnection, float]]] = {}
+        self._lock = threading.Lock()
+        self._ssl: Optional[ssl.SSLContext] = None
+        self.created = 0
+        self.reused = 0
+
+    # ----------------------------
+    # Connections
+    # ----------------------------
+
+    def _new_conn(self, key: _Key, timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        self.created += 1
+        if scheme == "https":
+            if self._ssl is None:
+                self._ssl = ssl.create_default_context()
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _checkout(self, key: _Key) -> Optional[http.client.HTTPConnection]:
+        now = time.monotonic()
+        with self._lock:
+            conns = self._idle.get(key) or []
+            while conns:
+                conn, since = conns.pop()
+                if now - since < self.idle_timeout:
+                    self.reused += 1
+                    return conn
+                conn.close()
+        return None
+
+    def _checkin(self, key: _Key, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            conns = self._idle.setdefault(key, [])
+            if len(conns) < self.max_per_host:
+                conns.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn, _ in conns:
+                conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            idle = sum(len(c) for c in self._idle.values())
+        return {"created": self.created, "reused": self.reused, "idle": idle}
+
+    # ----------------------------
+    # Requests
+    # ----------------------------
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: float = 60.0,
+    ) -> Response:
+        u = urllib.parse.urlsplit(url)
+        scheme = (u.scheme or "http").lower()
+        if scheme not in ("http", "https") or _proxied(scheme, u.hostname or ""):
+            return _urllib_request(method, url, body=body, headers=headers, timeout=timeout)
+
+        key: _Key = (scheme, u.hostname or "", u.port or (443 if scheme == "https" else 80))
+        path = u.path or "/"
+        if u.query:
+            path += "?" + u.query
+        h = dict(headers or {})
+        h.setdefault("Connection", "keep-alive")
+
+        conn = self._checkout(key)
+        reused = conn is not None
+        while True:
+            if conn is None:
+                conn = self._new_conn(key, timeout)
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            try:
+                conn.request(method, path, body=body, headers=h)
+                resp = conn.getresponse()
+                break
+            except _STALE_ERRORS:
+                conn.close()
+                if not reused:
+                    raise
+                conn, reused = None, False
+            except BaseException:
+                conn.close()
+                raise
+
+        def release(conn: http.client.HTTPConnection = conn, resp: http.client.HTTPResponse = resp) -> None:
+            # only a fully read, keep-alive response leaves the connection reusable
+            if resp.will_close or not resp.isclosed():
+                resp.close()
+                conn.close()
+            else:
+                self._checkin(key, conn)
+
+        return Response(resp.status, resp.reason, resp.headers, resp, release)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: float = 60.0,
+    ) -> Response:
+        """
+        Send a request and return the response for any status code. Raises
+        OSError / http.client.HTTPException if the server cannot be reached.
+        Redirects are followed the way urllib does (POST becomes GET on 301-303).
+        """
+        for _ in range(MAX_REDIRECTS):
+            resp = self._send(method, url, body=body, headers=headers, timeout=timeout)
+            location = resp.headers.get("Location") if resp.status in _REDIRECTS else None
+            if not location:
+                return resp
+            if method not in ("GET", "HEAD"):
+                if resp.status not in (301, 302, 303):
+                    return resp
+                method, body = "GET", None
+                headers = {k: v for k, v in (headers or {}).items() if k.lower() not in ("content-type", "content-length")}
+            resp.read()
+            resp.close()
+            url = urllib.parse.urljoin(url, location)
+        raise http.client.HTTPException(f"Too many redirects: {url}")
+
+
+def _proxied(scheme: str, host: str) -> bool:
+    proxies = urllib.request.getproxies()
+    return bool(proxies.get(scheme)) and not urllib.request.proxy_bypass(host)
+
+
+def _urllib_request(
+    method: str,
+    url: str,
+    *,
+    body: Optional[bytes],
+    headers: Optional[Mapping[str, str]],
+    timeout: float,
+) -> Response:
+    req = urllib.request.Request(url, data=body, headers=dict(headers or {}), method=method)
+    try:
+        r = urllib.request.urlopen(req, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        return Response(e.code, str(e.reason), e.headers, e)
+    except urllib.error.URLError as e:
+        raise OSError(str(e.reason)) from e
+    return Response(r.status, r.reason, r.headers, r)
+
+
+_DEFAULT: Optional[ConnectionPool] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def pool_from_env() -> ConnectionPool:
+    """
+    GAIT_HTTP_POOL_SIZE (idle connections per host, 0 disables reuse) and
+    GAIT_HTTP_IDLE_TIMEOUT (seconds) override the defaults.
+    """
+    size = os.environ.get("GAIT_HTTP_POOL_SIZE", "").strip()
+    idle = os.environ.get("GAIT_HTTP_IDLE_TIMEOUT", "").strip()
+    return ConnectionPool(
+        max_per_host=int(size) if size else DEFAULT_MAX_PER_HOST,
+        idle_timeout=float(idle) if idle else DEFAULT_IDLE_TIMEOUT,
+    )
+
+
+def default_pool() -> ConnectionPool:
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = pool_from_env()
+        return _DEFAULT
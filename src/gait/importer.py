@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .schema import Turn
+
+# ---------------------------------------------------------------------
+# Transcript import (JSONL), one JSON document per line:
+#
+#   gait:    {"user": "...", "assistant": "...", "model": {...}, "created_at": "..."}
+#   openai:  {"messages": [{"role": "user", "content": "..."}, ...]}   (one conversation per line)
+#            {"role": "user", "content": "..."}                        (one message per line)
+#
+# "auto" picks per line. user/assistant messages are paired into turns;
+# system messages are kept in the context of the turns of their own
+# conversation. With one message per line, a new conversation starts when
+# conversation_id (or session_id / thread_id) changes, or when a system
+# message follows a reply. created_at may be an ISO
+# 8601 string or epoch seconds (or milliseconds); it is stored in the
+# local "%Y-%m-%dT%H:%M:%S" form gait writes itself (memory.now_iso).
+# ---------------------------------------------------------------------
+
+FORMATS = ("auto", "gait", "openai")
+
+
+def _text(content: Any) -> str:
+    if content is None:
+        return ""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, dict):
+        return _text(content.get("text", content.get("content")))
+    if isinstance(content, list):
+        parts: List[str] = []
+        for p in content:
+            t = _text(p)
+            if t:
+                parts.append(t)
+        return "".join(parts)
+    return str(content)
+
+
+_CREATED_AT_FORMAT = "%Y-%m-%dT%H:%M:%S"
+_EPOCH_MS = 10**11  # larger epoch values are milliseconds (year 5138 in seconds)
+
+
+def _created_at(value: Any, origin: Dict[str, Any]) -> Optional[str]:
+    """
+    An imported created_at in now_iso() form; None when absent.
+    """
+    if value is None or value == "":
+        return None
+    try:
+        if isinstance(value, str) and value.strip().lstrip("-").replace(".", "", 1).isdigit():
+            value = float(value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            secs = value / 1000 if abs(value) >= _EPOCH_MS else value
+            return datetime.fromtimestamp(secs).strftime(_CREATED_AT_FORMAT)
+        if isinstance(value, str):
+            text = value.strip()
+            if text.endswith(("Z", "z")):
+                text = text[:-1] + "+00:00"
+            dt = datetime.fromisoformat(text)
+            if dt.tzinfo is not None:
+                dt = dt.astimezone().replace(tzinfo=None)
+            return dt.strftime(_CREATED_AT_FORMAT)
+    except (ValueError, OverflowError, OSError):
+        pass
+    where = f"{origin.get('source') or '<input>'}:{origin.get('line')}"
+    raise ValueError(f"{where}: unrecognized created_at {value!r} (expected ISO 8601 or epoch seconds)")
+
+
+_CONVERSATION_KEYS = ("conversation_id", "session_id", "thread_id")
+
+
+def _conversation_key(msg: Dict[str, Any]) -> Optional[str]:
+    for k in _CONVERSATION_KEYS:
+        if msg.get(k) not in (None, ""):
+            return str(msg[k])
+    return None
+
+
+class _Pairer:
+    """
+    Turns a stream of role/content messages into user+assistant turns.
+    With split=True (one message per line) it also finds where one
+    conversation ends and the next begins.
+    """
+
+    def __init__(self, source: str, *, split: bool = False) -> None:
+        self.source = source
+        self.split = split
+        self.system: List[str] = []
+        self.user: List[str] = []
+        self.model: Dict[str, Any] = {}
+        self.created_at: Optional[str] = None
+        self.origin: Dict[str, Any] = {}
+        self.conversation: Optional[str] = None
+        self.replied = False  # the current conversation has produced a turn
+
+    def _turn(self, assistant_text: str) -> Turn:
+        context: Dict[str, Any] = {"import": dict(self.origin)}
+        if self.system:
+            context["system"] = "\n\n".join(self.system)
+        t = Turn.v0(
+            user_text="\n\n".join(self.user),
+            assistant_text=assistant_text,
+            context=context,
+            model=dict(self.model),
+            created_at=self.created_at,
+        )
+        self.user = []
+        self.replied = True
+        return t
+
+    def feed(self, msg: Dict[str, Any], origin: Dict[str, Any]) -> Iterator[Turn]:
+        role = (msg.get("role") or "").strip()
+        text = _text(msg.get("content"))
+        key = _conversation_key(msg) if self.split else None
+        if (key is not None and key != self.conversation) or (self.split and role == "system" and self.replied):
+            # a new conversation: its system prompt replaces the last one's
+            t = self.flush()
+            if t is not None:
+                yield t
+            self.system = []
+            self.replied = False
+            if key is not None:
+                self.conversation = key
+        if role == "system":
+            if text:
+                self.system.append(text)
+            return
+        if role == "user":
+            if not self.user:
+                self.origin = origin
+                self.created_at = _created_at(msg.get("created_at"), origin)
+            self.user.append(text)
+            return
+        if role == "assistant":
+            if not self.user:
+                self.origin = origin
+                self.created_at = _created_at(msg.get("created_at"), origin)
+            yield self._turn(text)
+        # tool / function / unknown roles are not part of a turn in v0
+
+    def flush(self) -> Optional[Turn]:
+        return self._turn("") if self.user else None
+
+
+def _gait_turn(obj: Dict[str, Any], origin: Dict[str, Any]) -> Turn:
+    context = dict(obj.get("context") or {})
+    context.setdefault("import", origin)
+    return Turn.v0(
+        user_text=_text(obj.get("user")),
+        assistant_text=_text(obj.get("assistant")),
+        context=context,
+        tools=obj.get("tools") or {},
+        model=obj.get("model") or {},
+        tokens=obj.get("tokens") or None,
+        visibility=obj.get("visibility") or "private",
+        created_at=_created_at(obj.get("created_at"), origin),
+    )
+
+
+def iter_turns(lines: Iterable[str], *, fmt: str = "auto", source: str = "") -> Iterator[Turn]:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown transcript format: {fmt!r} (expected one of {', '.join(FORMATS)})")
+
+    stream = _Pairer(source, split=True)
+    conversation = 0
+    for lineno, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{source or '<input>'}:{lineno}: invalid JSON: {e}") from e
+        if not isinstance(obj, dict):
+            raise ValueError(f"{source or '<input>'}:{lineno}: expected a JSON object")
+
+        origin = {"source": source, "line": lineno}
+
+        if fmt in ("auto", "gait") and ("user" in obj or "assistant" in obj):
+            yield _gait_turn(obj, origin)
+            continue
+        if fmt == "gait":
+            raise ValueError(f"{source or '<input>'}:{lineno}: expected user/assistant fields")
+
+        if isinstance(obj.get("messages"), list):
+            conversation += 1
+            conv = _Pairer(source)
+            if obj.get("model"):
+                conv.model = {"model": obj.get("model")}
+            for i, m in enumerate(obj["messages"]):
+                if isinstance(m, dict):
+                    yield from conv.feed(m, {**origin, "conversation": conversation, "message": i})
+            t = conv.flush()
+            if t is not None:
+                yield t
+            continue
+
+        if "role" in obj:
+            key = _conversation_key(obj)
+            if key is not None:
+                origin["conversation"] = key
+            yield from stream.feed(obj, origin)
+            continue
+
+        raise ValueError(f"{source or '<input>'}:{lineno}: unrecognized transcript line")
+
+    t = stream.flush()
+    if t is not None:
+        yield t
+
+
+def iter_file_turns(path: str, *, fmt: str = "auto") -> Iterator[Turn]:
+    """
+    Stream turns from a JSONL file ("-" reads stdin).
+    """
+    if path == "-":
+        yield from iter_turns(sys.stdin, fmt=fmt, source="<stdin>")
+        return
+    p = Path(path)
+    with p.open("r", encoding="utf-8") as f:
+        yield from iter_turns(f, fmt=fmt, source=p.name)
@@ -2,13 +2,16 @@ from __future__ import annotations
 
 import os
 import json
-import urllib.request
-import urllib.error
-from typing import Any, Dict, Optional
+import time
+import http.client
+from typing import Any, Dict, Iterator, Optional
+
+from .httppool import default_pool
+from .respcache import ResponseCache, response_key
 
 
 # ----------------------------
-# Small HTTP helpers (urllib)
+# Small HTTP helpers (pooled keep-alive connections, see httppool.py)
 # ----------------------------
 
 def _http_json(
@@ -20,21 +23,196 @@ def _http_json(
     timeout: float = 60.0,
 ) -> dict:
     data = None if payload is None else json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url,
-        data=data,
-        headers={"Content-Type": "application/json", **(headers or {})},
-        method=method,
-    )
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
+        with default_pool().request(
+            method,
+            url,
+            body=data,
+            headers={"Content-Type": "application/json", **(headers or {})},
+            timeout=timeout,
+        ) as resp:
             raw = resp.read().decode("utf-8", errors="replace")
-            return json.loads(raw) if raw.strip() else {}
-    except urllib.error.HTTPError as e:
-        body = e.read().decode("utf-8", errors="replace")
-        raise RuntimeError(f"HTTP {e.code} {e.reason}: {body}") from e
-    except urllib.error.URLError as e:
+    except (OSError, http.client.HTTPException) as e:
         raise RuntimeError(f"Cannot reach {url}: {e}") from e
+    if resp.status >= 300:
+        raise RuntimeError(f"HTTP {resp.status} {resp.reason}: {raw}")
+    return json.loads(raw) if raw.strip() else {}
+
+
+def _http_lines(
+    url: str,
+    *,
+    method: str = "POST",
+    payload: Optional[dict] = None,
+    headers: Optional[dict] = None,
+    timeout: float = 600.0,
+) -> Iterator[str]:
+    """
+    Response body line by line as it arrives (NDJSON or server-sent events).
+    """
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    try:
+        resp = default_pool().request(
+            method,
+            url,
+            body=data,
+            headers={"Content-Type": "application/json", **(headers or {})},
+            timeout=timeout,
+        )
+    except (OSError, http.client.HTTPException) as e:
+        raise RuntimeError(f"Cannot reach {url}: {e}") from e
+    with resp:
+        try:
+            if resp.status >= 300:
+                raw = resp.read().decode("utf-8", errors="replace")
+                raise RuntimeError(f"HTTP {resp.status} {resp.reason}: {raw}")
+            while True:
+                line = resp.readline()
+                if not line:
+                    return
+                yield line.decode("utf-8", errors="replace").rstrip("\r\n")
+        except (OSError, http.client.HTTPException) as e:
+            raise RuntimeError(f"Connection lost reading {url}: {e}") from e
+
+
+def _sse_data(lines: Iterator[str]) -> Iterator[str]:
+    """
+    The data of each server-sent event (multi-line data joined with newlines).
+    """
+    buf: list[str] = []
+    for line in lines:
+        if not line:
+            if buf:
+                yield "\n".join(buf)
+                buf = []
+            continue
+        if line.startswith(":"):
+            continue
+        name, _, value = line.partition(":")
+        if name == "data":
+            buf.append(value[1:] if value.startswith(" ") else value)
+    if buf:
+        yield "\n".join(buf)
+
+
+class ChatStream:
+    """
+    Returned by the *_chat_stream functions: iterate it to receive the reply
+    text as it arrives. Afterwards `text` holds the whole reply and
+    metrics() the timings for the turn's model metadata.
+
+    Provider generators yield text chunks, plus {"output_tokens": n} when
+    the provider reports usage. `cached` is None when no response cache
+    was consulted, else whether the reply came from it.
+    """
+
+    def __init__(self, events: Iterator[Any], *, cached: Optional[bool] = None) -> None:
+        self._events = events
+        self.cached = cached
+        self.text = ""
+        self.output_tokens: Optional[int] = None
+        self.ttft: Optional[float] = None
+        self.latency: Optional[float] = None
+
+    def __iter__(self) -> Iterator[str]:
+        parts: list[str] = []
+        t0 = time.perf_counter()
+        try:
+            for ev in self._events:
+                if isinstance(ev, dict):
+                    if ev.get("output_tokens") is not None:
+                        self.output_tokens = int(ev["output_tokens"])
+                    continue
+                if not ev:
+                    continue
+                if self.ttft is None:
+                    self.ttft = time.perf_counter() - t0
+                parts.append(ev)
+                yield ev
+        finally:
+            self.latency = time.perf_counter() - t0
+            self.text = "".join(parts)
+
+    def metrics(self, output_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """
+        ttft_ms, latency_ms and tokens_per_sec (output tokens over the time
+        after the first one). `output_tokens` is used when the provider
+        reported no count.
+        """
+        out: Dict[str, Any] = {"stream": True}
+        if self.cached is not None:
+            out["cache"] = "hit" if self.cached else "miss"
+        if self.ttft is not None:
+            out["ttft_ms"] = round(self.ttft * 1000, 1)
+        if self.latency is not None:
+            out["latency_ms"] = round(self.latency * 1000, 1)
+        n = self.output_tokens if self.output_tokens is not None else output_tokens
+        if n and self.latency is not None:
+            out["output_tokens"] = n
+            gen = self.latency - (self.ttft or 0.0)
+            # a cached reply was not generated now; its rate means nothing
+            if gen > 0 and not self.cached:
+                out["tokens_per_sec"] = round(n / gen, 2)
+        return out
+
+
+# ----------------------------
+# Response cache (respcache.py): consulted before any HTTP request
+# ----------------------------
+
+def _cache_lookup(
+    cache: Optional[ResponseCache],
+    provider: str,
+    endpoint: str,
+    model: str,
+    messages: list[dict],
+    temperature: float | None,
+    max_tokens: int | None,
+) -> tuple[str, Optional[str]]:
+    """
+    (key, cached reply or None); key is "" when there is no cache.
+    """
+    if cache is None:
+        return "", None
+    key = response_key(
+        provider, model, messages,
+        temperature=temperature, max_tokens=max_tokens, endpoint=endpoint,
+    )
+    return key, cache.get(key)
+
+
+def _cache_store(cache: Optional[ResponseCache], key: str, text: str, provider: str, model: str) -> str:
+    if cache is not None and key:
+        cache.put(key, text, provider=provider, model=model)
+    return text
+
+
+def _cached_stream(
+    cache: Optional[ResponseCache],
+    key: str,
+    hit: Optional[str],
+    events: Any,
+    provider: str,
+    model: str,
+) -> ChatStream:
+    """
+    ChatStream over `events()`, or over the cached reply on a hit. A reply
+    streamed to the end is stored; an interrupted one is not.
+    """
+    if cache is None:
+        return ChatStream(events())
+    if hit is not None:
+        return ChatStream(iter([hit]), cached=True)
+
+    def filling() -> Iterator[Any]:
+        parts: list[str] = []
+        for ev in events():
+            if isinstance(ev, str):
+                parts.append(ev)
+            yield ev
+        _cache_store(cache, key, "".join(parts), provider, model)
+
+    return ChatStream(filling(), cached=False)
 
 
 # ============================
@@ -58,23 +236,18 @@ def ollama_list_models(host: str) -> list[str]:
     return models
 
 
-def ollama_chat(
-    host: str,
+def _ollama_payload(
     model: str,
     messages: list[dict],
     *,
-    temperature: float | None = None,
-    num_predict: int | None = None,
-    debug: bool = False,
-) -> str:
-    """
-    If num_predict is None, we DO NOT send options.num_predict.
-    That means: no explicit output cap (use Ollama/model defaults).
-    """
+    temperature: float | None,
+    num_predict: int | None,
+    stream: bool,
+) -> dict:
     payload: dict = {
         "model": model,
         "messages": messages,
-        "stream": False,
+        "stream": stream,
     }
 
     options: dict[str, Any] = {}
@@ -85,6 +258,28 @@ def ollama_chat(
 
     if options:
         payload["options"] = options
+    return payload
+
+
+def ollama_chat(
+    host: str,
+    model: str,
+    messages: list[dict],
+    *,
+    temperature: float | None = None,
+    num_predict: int | None = None,
+    debug: bool = False,
+    cache: Optional[ResponseCache] = None,
+) -> str:
+    """
+    If num_predict is None, we DO NOT send options.num_predict.
+    That means: no explicit output cap (use Ollama/model defaults).
+    """
+    key, hit = _cache_lookup(cache, "ollama", host, model, messages, temperature, num_predict)
+    if hit is not None:
+        return hit
+
+    payload = _ollama_payload(model, messages, temperature=temperature, num_predict=num_predict, stream=False)
 
     r = _http_json(_ollama_url(host, "/api/chat"), method="POST", payload=payload, timeout=600.0)
 
@@ -93,7 +288,37 @@ def ollama_chat(
         if done_reason:
             print(f"[gait] ollama done_reason={done_reason}")
 
-    return ((r.get("message") or {}).get("content")) or ""
+    out = ((r.get("message") or {}).get("content")) or ""
+    return _cache_store(cache, key, out, "ollama", model)
+
+
+def ollama_chat_stream(
+    host: str,
+    model: str,
+    messages: list[dict],
+    *,
+    temperature: float | None = None,
+    num_predict: int | None = None,
+    cache: Optional[ResponseCache] = None,
+) -> ChatStream:
+    """
+    Streaming ollama_chat: /api/chat answers one JSON object per line.
+    """
+    key, hit = _cache_lookup(cache, "ollama", host, model, messages, temperature, num_predict)
+    payload = _ollama_payload(model, messages, temperature=temperature, num_predict=num_predict, stream=True)
+
+    def events() -> Iterator[Any]:
+        for line in _http_lines(_ollama_url(host, "/api/chat"), payload=payload):
+            if not line.strip():
+                continue
+            r = json.loads(line)
+            if r.get("error"):
+                raise RuntimeError(f"Ollama error: {r['error']}")
+            yield ((r.get("message") or {}).get("content")) or ""
+            if r.get("done") and r.get("eval_count") is not None:
+                yield {"output_tokens": r["eval_count"]}
+
+    return _cached_stream(cache, key, hit, events, "ollama", model)
 
 
 # ============================
@@ -125,20 +350,16 @@ def openai_compat_list_models(base_url: str, api_key: str = "") -> list[str]:
     return out
 
 
-def openai_compat_chat(
+def _openai_request(
     base_url: str,
     model: str,
     messages: list[dict],
     *,
-    api_key: str = "",
-    temperature: float | None = None,
-    max_tokens: int | None = None,
-    debug: bool = False,
-) -> str:
-    """
-    If max_tokens is None, we DO NOT send it.
-    That means: no explicit output cap (server/model default).
-    """
+    api_key: str,
+    temperature: float | None,
+    max_tokens: int | None,
+    stream: bool,
+) -> tuple[str, dict, dict]:
     b = _openai_base(base_url)
     headers: dict[str, str] = {}
     if api_key:
@@ -147,14 +368,40 @@ def openai_compat_chat(
     payload: Dict[str, Any] = {
         "model": model,
         "messages": messages,
-        "stream": False,
+        "stream": stream,
     }
     if temperature is not None:
         payload["temperature"] = float(temperature)
     if max_tokens is not None:
         payload["max_tokens"] = int(max_tokens)
+    return f"{b}/chat/completions", payload, headers
+
+
+def openai_compat_chat(
+    base_url: str,
+    model: str,
+    messages: list[dict],
+    *,
+    api_key: str = "",
+    temperature: float | None = None,
+    max_tokens: int | None = None,
+    debug: bool = False,
+    cache: Optional[ResponseCache] = None,
+) -> str:
+    """
+    If max_tokens is None, we DO NOT send it.
+    That means: no explicit output cap (server/model default).
+    """
+    key, hit = _cache_lookup(cache, "openai_compat", _openai_base(base_url), model, messages, temperature, max_tokens)
+    if hit is not None:
+        return hit
 
-    r = _http_json(f"{b}/chat/completions", method="POST", payload=payload, headers=headers, timeout=600.0)
+    url, payload, headers = _openai_request(
+        base_url, model, messages,
+        api_key=api_key, temperature=temperature, max_tokens=max_tokens, stream=False,
+    )
+
+    r = _http_json(url, method="POST", payload=payload, headers=headers, timeout=600.0)
 
     if debug:
         choices = r.get("choices") or []
@@ -168,14 +415,57 @@ def openai_compat_chat(
         msg = (choices[0] or {}).get("message") or {}
         content = msg.get("content")
         if isinstance(content, str):
-            return content
+            return _cache_store(cache, key, content, "openai_compat", model)
 
     return ""
 
+
+def openai_compat_chat_stream(
+    base_url: str,
+    model: str,
+    messages: list[dict],
+    *,
+    api_key: str = "",
+    temperature: float | None = None,
+    max_tokens: int | None = None,
+    cache: Optional[ResponseCache] = None,
+) -> ChatStream:
+    """
+    Streaming openai_compat_chat: server-sent events of choices[0].delta,
+    terminated by "data: [DONE]".
+    """
+    key, hit = _cache_lookup(cache, "openai_compat", _openai_base(base_url), model, messages, temperature, max_tokens)
+    url, payload, headers = _openai_request(
+        base_url, model, messages,
+        api_key=api_key, temperature=temperature, max_tokens=max_tokens, stream=True,
+    )
+
+    def events() -> Iterator[Any]:
+        for data in _sse_data(_http_lines(url, payload=payload, headers=headers)):
+            if data.strip() == "[DONE]":
+                # read on to the end of the body so the connection is reusable
+                continue
+            r = json.loads(data)
+            if r.get("error"):
+                raise RuntimeError(f"openai_compat error: {r['error']}")
+            usage = r.get("usage") or {}
+            if usage.get("completion_tokens") is not None:
+                yield {"output_tokens": usage["completion_tokens"]}
+            choices = r.get("choices") or []
+            if choices and isinstance(choices, list):
+                content = ((choices[0] or {}).get("delta") or {}).get("content")
+                if isinstance(content, str):
+                    yield content
+
+    return _cached_stream(cache, key, hit, events, "openai_compat", model)
+
 # ============================
 # Gemini provider (Google Generative Language API, REST)
 # ============================
 
+_GEMINI_BASE = "https://generativelanguage.googleapis.com"
+
+
 def _gemini_api_key() -> str:
     key = (os.environ.get("GEMINI_API_KEY", "") or os.environ.get("GOOGLE_API_KEY", "")).strip()
     if not key:
@@ -198,25 +488,19 @@ def gemini_list_models(api_key: str = "") -> list[str]:
     return out
 
 
-def gemini_chat(
+def _gemini_request(
     model: str,
     messages: list[dict],
     *,
-    api_key: str = "",
-    temperature: float | None = None,
-    max_tokens: int | None = None,
-    debug: bool = False,
-) -> str:
-    api_key = (api_key or "").strip() or _gemini_api_key()
-
+    temperature: float | None,
+    max_tokens: int | None,
+) -> tuple[str, dict]:
     model_id = (model or "").strip()
     if not model_id:
         raise RuntimeError("gemini_chat: model is required.")
     if not model_id.startswith("models/"):
         model_id = f"models/{model_id}"
 
-    url = f"https://generativelanguage.googleapis.com/v1beta/{model_id}:generateContent?key={api_key}"
-
     # GAIT -> Gemini mapping:
     # - system messages become system_instruction.parts[]
     # - user/assistant become contents[] with roles user/model
@@ -251,6 +535,40 @@ def gemini_chat(
         gen_cfg["maxOutputTokens"] = int(max_tokens)
     if gen_cfg:
         payload["generationConfig"] = gen_cfg
+    return model_id, payload
+
+
+def _gemini_text(r: dict) -> str:
+    candidates = r.get("candidates") or []
+    if not candidates:
+        return ""
+    content = (candidates[0] or {}).get("content") or {}
+    texts: list[str] = []
+    for p in content.get("parts") or []:
+        t = (p or {}).get("text")
+        if isinstance(t, str) and t:
+            texts.append(t)
+    return "".join(texts)
+
+
+def gemini_chat(
+    model: str,
+    messages: list[dict],
+    *,
+    api_key: str = "",
+    temperature: float | None = None,
+    max_tokens: int | None = None,
+    debug: bool = False,
+    cache: Optional[ResponseCache] = None,
+) -> str:
+    key, hit = _cache_lookup(cache, "gemini", _GEMINI_BASE, model, messages, temperature, max_tokens)
+    if hit is not None:
+        return hit
+
+    api_key = (api_key or "").strip() or _gemini_api_key()
+    model_id, payload = _gemini_request(model, messages, temperature=temperature, max_tokens=max_tokens)
+
+    url = f"{_GEMINI_BASE}/v1beta/{model_id}:generateContent?key={api_key}"
 
     r = _http_json(url, method="POST", payload=payload, timeout=600.0)
 
@@ -260,23 +578,51 @@ def gemini_chat(
         if isinstance(fc, dict) and fc.get("finishReason"):
             print(f"[gait] gemini finishReason={fc.get('finishReason')}")
 
-    candidates = r.get("candidates") or []
-    if not candidates:
+    if not (r.get("candidates") or []):
         raise RuntimeError(f"Gemini returned no candidates: {r}")
 
-    content = (candidates[0] or {}).get("content") or {}
-    parts = content.get("parts") or []
-    texts: list[str] = []
-    for p in parts:
-        t = (p or {}).get("text")
-        if isinstance(t, str) and t:
-            texts.append(t)
-
-    out = "".join(texts).strip()
+    out = _gemini_text(r).strip()
     if not out:
         # some errors come back with "promptFeedback" etc
         raise RuntimeError(f"Gemini returned empty text parts: {r}")
-    return out
+    return _cache_store(cache, key, out, "gemini", model)
+
+
+def gemini_chat_stream(
+    model: str,
+    messages: list[dict],
+    *,
+    api_key: str = "",
+    temperature: float | None = None,
+    max_tokens: int | None = None,
+    base_url: str = _GEMINI_BASE,
+    cache: Optional[ResponseCache] = None,
+) -> ChatStream:
+    """
+    Streaming gemini_chat: streamGenerateContent with alt=sse, one partial
+    response per event.
+    """
+    key, hit = _cache_lookup(cache, "gemini", base_url.rstrip("/"), model, messages, temperature, max_tokens)
+    if hit is not None:
+        return _cached_stream(cache, key, hit, None, "gemini", model)
+
+    api_key = (api_key or "").strip() or _gemini_api_key()
+    model_id, payload = _gemini_request(model, messages, temperature=temperature, max_tokens=max_tokens)
+
+    url = f"{base_url.rstrip('/')}/v1beta/{model_id}:streamGenerateContent?alt=sse&key={api_key}"
+
+    def events() -> Iterator[Any]:
+        for data in _sse_data(_http_lines(url, payload=payload)):
+            r = json.loads(data)
+            if r.get("error"):
+                raise RuntimeError(f"Gemini error: {r['error']}")
+            yield _gemini_text(r)
+            # cumulative, so the last one wins
+            usage = r.get("usageMetadata") or {}
+            if usage.get("candidatesTokenCount") is not None:
+                yield {"output_tokens": usage["candidatesTokenCount"]}
+
+    return _cached_stream(cache, key, hit, events, "gemini", model)
 
 # ============================
 # Claude / Anthropic provider (Messages API)
@@ -306,21 +652,15 @@ def anthropic_list_models(api_key: str = "", *, base_url: str = "https://api.ant
     return out
 
 
-def anthropic_chat(
+def _anthropic_request(
     model: str,
     messages: list[dict],
     *,
-    api_key: str = "",
-    max_tokens: int | None = None,
-    temperature: float | None = None,
-    base_url: str = "https://api.anthropic.com",
-    debug: bool = False,
-) -> str:
-    """
-    Maps GAIT messages -> Anthropic Messages API.
-    - GAIT system messages => joined into a single `system` string.
-    - user/assistant => `messages` with roles user/assistant
-    """
+    api_key: str,
+    max_tokens: int | None,
+    temperature: float | None,
+    stream: bool,
+) -> tuple[dict, dict]:
     api_key = (api_key or "").strip() or _anthropic_api_key()
 
     model_id = (model or "").strip()
@@ -356,6 +696,8 @@ def anthropic_chat(
         # Anthropic requires max_tokens; choose a safe default if user didn't set one.
         "max_tokens": int(max_tokens) if max_tokens is not None else 1024,
     }
+    if stream:
+        payload["stream"] = True
 
     if sys_chunks:
         payload["system"] = "\n\n".join(sys_chunks)
@@ -363,12 +705,38 @@ def anthropic_chat(
     if temperature is not None:
         payload["temperature"] = float(temperature)
 
-    b = base_url.rstrip("/")
     headers = {
         "x-api-key": api_key,
         "anthropic-version": "2023-06-01",
     }
+    return payload, headers
+
 
+def anthropic_chat(
+    model: str,
+    messages: list[dict],
+    *,
+    api_key: str = "",
+    max_tokens: int | None = None,
+    temperature: float | None = None,
+    base_url: str = "https://api.anthropic.com",
+    debug: bool = False,
+    cache: Optional[ResponseCache] = None,
+) -> str:
+    """
+    Maps GAIT messages -> Anthropic Messages API.
+    - GAIT system messages => joined into a single `system` string.
+    - user/assistant => `messages` with roles user/assistant
+    """
+    key, hit = _cache_lookup(cache, "anthropic", base_url.rstrip("/"), model, messages, temperature, max_tokens)
+    if hit is not None:
+        return hit
+
+    payload, headers = _anthropic_request(
+        model, messages, api_key=api_key, max_tokens=max_tokens, temperature=temperature, stream=False,
+    )
+
+    b = base_url.rstrip("/")
     r = _http_json(f"{b}/v1/messages", method="POST", payload=payload, headers=headers, timeout=600.0)
 
     if debug:
@@ -388,4 +756,45 @@ def anthropic_chat(
     out = "".join(texts).strip()
     if not out:
         raise RuntimeError(f"Anthropic returned empty text blocks: {r}")
-    return out
+    return _cache_store(cache, key, out, "anthropic", model)
+
+
+def anthropic_chat_stream(
+    model: str,
+    messages: list[dict],
+    *,
+    api_key: str = "",
+    max_tokens: int | None = None,
+    temperature: float | None = None,
+    base_url: str = "https://api.anthropic.com",
+    cache: Optional[ResponseCache] = None,
+) -> ChatStream:
+    """
+    Streaming anthropic_chat: server-sent events; text arrives in
+    content_block_delta events, the output token count in message_delta.
+    """
+    key, hit = _cache_lookup(cache, "anthropic", base_url.rstrip("/"), model, messages, temperature, max_tokens)
+    if hit is not None:
+        return _cached_stream(cache, key, hit, None, "anthropic", model)
+
+    payload, headers = _anthropic_request(
+        model, messages, api_key=api_key, max_tokens=max_tokens, temperature=temperature, stream=True,
+    )
+    url = f"{base_url.rstrip('/')}/v1/messages"
+
+    def events() -> Iterator[Any]:
+        for data in _sse_data(_http_lines(url, payload=payload, headers=headers)):
+            r = json.loads(data)
+            kind = r.get("type")
+            if kind == "content_block_delta":
+                delta = r.get("delta") or {}
+                if delta.get("type") == "text_delta":
+                    yield delta.get("text") or ""
+            elif kind == "message_delta":
+                usage = r.get("usage") or {}
+                if usage.get("output_tokens") is not None:
+                    yield {"output_tokens": usage["output_tokens"]}
+            elif kind == "error":
+                raise RuntimeError(f"Anthropic error: {r.get('error')}")
+
+    return _cached_stream(cache, key, hit, events, "anthropic", model)
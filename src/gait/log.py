@@ -5,18 +5,22 @@ from typing import Dict, Iterator, List, Optional, Set, Tuple
 from .repo import GaitRepo
 
 
+def walk_commit_ids(repo: GaitRepo, start_commit: Optional[str] = None, limit: int = 50) -> List[str]:
+    """
+    First-parent commit ids from the commit-graph (no JSON parsing).
+    """
+    cid = start_commit if start_commit is not None else repo.head_commit_id()
+    if not cid:
+        return []
+    return repo.iter_commit_ids_from_head_first_parent(start_commit=cid, limit_commits=limit)
+
+
 def walk_commits(repo: GaitRepo, start_commit: Optional[str] = None, limit: int = 50) -> Iterator[Dict]:
     """
     Simple parent-walk (first parent) for v0.
+    Traversal comes from the commit-graph; only the yielded commits are loaded.
     """
-    cid = start_commit if start_commit is not None else repo.head_commit_id()
-    seen: Set[str] = set()
-    n = 0
-    while cid and cid not in seen and n < limit:
-        seen.add(cid)
+    for cid in walk_commit_ids(repo, start_commit, limit):
         c = repo.get_commit(cid)
         c["_id"] = cid
         yield c
-        parents = c.get("parents") or []
-        cid = parents[0] if parents else ""
-        n += 1
@@ -2,9 +2,15 @@ from __future__ import annotations
 
 import hashlib
 import json
+import zlib
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
+from . import oidindex, pack
+
+
+# one shared encoder: json.dumps() with non-default options builds a new one per call
+_CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False)
 
 def canonical_json_bytes(obj: Any) -> bytes:
     """
@@ -13,8 +19,7 @@ def canonical_json_bytes(obj: Any) -> bytes:
     - sorted keys
     - no whitespace variance
     """
-    s = json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
-    return s.encode("utf-8")
+    return _CANONICAL_ENCODER.encode(obj).encode("utf-8")
 
 
 def sha256_hex(data: bytes) -> str:
@@ -31,54 +36,227 @@ def fanout_path(objects_dir: Path, oid: str) -> Path:
 def canonical_payload_bytes(raw: bytes) -> bytes:
     return raw[:-1] if raw.endswith(b"\n") else raw
 
-def store_object(objects_dir: Path, obj: Dict[str, Any]) -> str:
+# On-disk encodings. Canonical JSON objects always start with "{", a zlib
+# stream always starts with 0x78 ("x"), so the first byte tells them apart.
+# The oid is always sha256 of the *decoded* canonical JSON.
+ZLIB_MAGIC = b"x"
+DEFAULT_COMPRESSION_LEVEL = 6
+
+def encode_packed(canon: bytes, *, compress: bool = False, level: int = DEFAULT_COMPRESSION_LEVEL) -> bytes:
+    """
+    Pack entry bytes for canonical JSON (packs store no trailing newline).
+    """
+    return zlib.compress(canon, level) if compress else canon
+
+def decode_payload(raw: bytes) -> bytes:
+    """
+    Canonical JSON bytes from a stored/transferred payload (plain or zlib).
+    """
+    if raw[:1] == ZLIB_MAGIC:
+        return zlib.decompress(raw)
+    return canonical_payload_bytes(raw)
+
+def encode_payload(canon: bytes, *, compress: bool = False, level: int = DEFAULT_COMPRESSION_LEVEL) -> bytes:
+    """
+    Loose-file bytes for canonical JSON: zlib stream, or canonical + newline.
+    """
+    if compress:
+        return zlib.compress(canon, level)
+    return canon + b"\n"
+
+def _is_hex_name(name: str) -> bool:
+    return len(name) == 64 and all(c in "0123456789abcdef" for c in name)
+
+def has_object(objects_dir: Path, oid: str) -> bool:
+    return fanout_path(objects_dir, oid).exists() or pack.has_packed(objects_dir, oid)
+
+def store_object(objects_dir: Path, obj: Dict[str, Any], *, compress: bool = False, level: int = DEFAULT_COMPRESSION_LEVEL) -> str:
     """
     Stores a JSON object content-addressed by sha256(canonical_json(obj)).
+    With compress=True the file holds a zlib stream of the same canonical bytes.
     Returns oid.
     """
-    oid = object_id(obj)
-    path = fanout_path(objects_dir, oid)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    if not path.exists():
-        path.write_bytes(canonical_json_bytes(obj) + b"\n")
+    canon = canonical_json_bytes(obj)
+    oid = sha256_hex(canon)
+    store_object_bytes(objects_dir, oid, canon, compress=compress, level=level)
     return oid
 
+def store_object_bytes(
+    objects_dir: Path,
+    oid: str,
+    canon: bytes,
+    *,
+    compress: bool = False,
+    level: int = DEFAULT_COMPRESSION_LEVEL,
+) -> None:
+    """
+    Store already-canonical payload bytes under a known oid (remote fetch path).
+    The caller is responsible for having checked sha256(canon) == oid.
+    """
+    path = fanout_path(objects_dir, oid)
+    if not path.exists() and not pack.has_packed(objects_dir, oid):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(encode_payload(canon, compress=compress, level=level))
+        oidindex.record(objects_dir, oid)
+
+def read_object_bytes(objects_dir: Path, oid: str) -> bytes:
+    """
+    Canonical payload bytes (no trailing newline) for a full oid,
+    from a loose file or any pack.
+    """
+    path = fanout_path(objects_dir, oid)
+    try:
+        return decode_payload(path.read_bytes())
+    except FileNotFoundError:
+        pass
+    data = pack.find_packed(objects_dir, oid)
+    if data is None:
+        raise FileNotFoundError(f"Object not found: {oid}")
+    return decode_payload(data)
+
+def iter_loose_oids(objects_dir: Path) -> Iterator[str]:
+    if not objects_dir.exists():
+        return
+    for d1 in objects_dir.iterdir():
+        if len(d1.name) != 2 or not d1.is_dir():
+            continue
+        for d2 in d1.iterdir():
+            if not d2.is_dir():
+                continue
+            for p in d2.iterdir():
+                if _is_hex_name(p.name):
+                    yield p.name
+
+def iter_object_ids(objects_dir: Path) -> Iterator[str]:
+    """
+    Every oid in the store (loose + packed), each yielded once.
+    """
+    seen: Set[str] = set()
+    for oid in iter_loose_oids(objects_dir):
+        seen.add(oid)
+        yield oid
+    for oid in pack.iter_packed_oids(objects_dir):
+        if oid not in seen:
+            seen.add(oid)
+            yield oid
+
+def repack_objects(
+    objects_dir: Path,
+    *,
+    prune_loose: bool = True,
+    compress: bool = False,
+    level: int = DEFAULT_COMPRESSION_LEVEL,
+) -> Dict[str, Any]:
+    """
+    Write every loose and packed object into a single new pack, then drop
+    the old packs and (unless prune_loose=False) the loose files.
+    Pack entries are (re)encoded as zlib when compress=True, plain canonical JSON otherwise.
+    """
+    old_packs = [p.pack_path for p in pack.load_packs(objects_dir)]
+    loose = list(iter_loose_oids(objects_dir))
+
+    def items() -> Iterator[Tuple[str, bytes]]:
+        for oid in loose:
+            yield oid, encode_packed(read_object_bytes(objects_dir, oid), compress=compress, level=level)
+        for p in pack.load_packs(objects_dir):
+            for oid, data in p.iter_payloads():
+                yield oid, encode_packed(decode_payload(data), compress=compress, level=level)
+
+    w = pack.PackWriter(objects_dir)
+    try:
+        for oid, data in items():
+            w.add(oid, data)
+    except BaseException:
+        w.abort()
+        raise
+    count = len(w)
+    new_pack = w.commit()
+    pack.forget_packs(objects_dir)
+
+    for old in old_packs:
+        if new_pack is not None and old != new_pack:
+            pack.remove_pack(old)
+
+    pruned = 0
+    if prune_loose and new_pack is not None:
+        for oid in loose:
+            path = fanout_path(objects_dir, oid)
+            path.unlink(missing_ok=True)
+            pruned += 1
+            for d in (path.parent, path.parent.parent):
+                try:
+                    d.rmdir()
+                except OSError:
+                    break
+        oidindex.rebuild(objects_dir)
+
+    return {
+        "pack": str(new_pack.name) if new_pack is not None else "",
+        "objects": count,
+        "loose_pruned": pruned,
+        "packs_replaced": len([p for p in old_packs if p != new_pack]),
+    }
+
 def resolve_prefix(objects_dir: Path, prefix: str) -> str:
+    """
+    Expand a short oid. Loose objects are looked up in the sorted loose index
+    (oidindex), packed objects in each pack .idx; both are binary searches.
+    """
     prefix = prefix.strip()
     if len(prefix) >= 64:
         return prefix
+    prefix = prefix.lower()
 
-    if len(prefix) < 2:
-        base = objects_dir
-    elif len(prefix) < 4:
-        base = objects_dir / prefix[:2]
-    else:
-        base = objects_dir / prefix[:2] / prefix[2:4]
-
-    if not base.exists():
-        raise FileNotFoundError(f"No object found with prefix: {prefix}")
+    matches = oidindex.match_prefix(objects_dir, prefix, limit=10)
+    for pk in pack.load_packs(objects_dir):
+        for oid in pk.match_prefix(prefix, limit=10):
+            if oid not in matches:
+                matches.append(oid)
 
-    matches = []
-    # Only scan files in the narrowed directory tree
-    for p in base.rglob("*"):
-        if p.is_file() and p.name.startswith(prefix):
-            matches.append(p.name)
+    if not matches:
+        # index may lag behind files written by older versions / other tools
+        matches = _scan_prefix(objects_dir, prefix)
+        if matches:
+            oidindex.rebuild(objects_dir)
 
     if not matches:
         raise FileNotFoundError(f"No object found with prefix: {prefix}")
     if len(matches) > 1:
         cand = ", ".join(m[:12] for m in matches[:10])
-        raise ValueError(f"Ambiguous prefix {prefix} matches {len(matches)} objects: {cand} ...")
+        n = f"{len(matches)}" if len(matches) < 10 else "10+"
+        raise ValueError(f"Ambiguous prefix {prefix} matches {n} objects: {cand} ...")
 
     return matches[0]
 
+def _fanout_dirs(base: Path, prefix: str) -> List[Path]:
+    """
+    Sub-directories of `base` whose 2-char fan-out name is compatible with `prefix`.
+    """
+    if len(prefix) >= 2:
+        return [base / prefix[:2]]
+    try:
+        return [
+            p for p in base.iterdir()
+            if len(p.name) == 2 and all(c in "0123456789abcdef" for c in p.name) and p.name.startswith(prefix)
+        ]
+    except FileNotFoundError:
+        return []
+
+def _scan_prefix(objects_dir: Path, prefix: str) -> list:
+    # walk only the objects/xx/yy directories the prefix can fall into
+    matches = []
+    for d1 in _fanout_dirs(objects_dir, prefix):
+        for d2 in _fanout_dirs(d1, prefix[2:]):
+            if not d2.exists():
+                continue
+            for p in d2.iterdir():
+                if p.is_file() and _is_hex_name(p.name) and p.name.startswith(prefix):
+                    matches.append(p.name)
+    return matches
+
 def load_object(objects_dir: Path, oid: str) -> Dict[str, Any]:
     oid = resolve_prefix(objects_dir, oid)
-    path = fanout_path(objects_dir, oid)
-    if not path.exists():
-        raise FileNotFoundError(f"Object not found: {oid}")
-    raw = path.read_text(encoding="utf-8").strip()
-    return json.loads(raw)
+    return json.loads(read_object_bytes(objects_dir, oid))
 
 def short_oid(oid: str, n: int = 8) -> str:
     return oid[:n]
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# ---------------------------------------------------------------------
+# Sorted index of loose object ids, for prefix resolution without
+# walking the fan-out directories.
+#
+#   .gait/objects/info/loose-index      header + sorted 32-byte raw oids
+#   .gait/objects/info/loose-index.log  raw 32-byte oids appended by store_object
+#
+# Lookups binary-search the base file and scan the (bounded) log. Once the
+# log grows past LOG_MERGE_ENTRIES it is merged into a new base file.
+# Packed objects are not listed here; each pack .idx is already sorted.
+# ---------------------------------------------------------------------
+
+INDEX_MAGIC = b"GOIX"
+INDEX_VERSION = 1
+LOG_MERGE_ENTRIES = 4096
+
+_HEADER = struct.Struct(">4sII")   # magic, version, count
+_OID = 32
+
+
+def info_dir(objects_dir: Path) -> Path:
+    return objects_dir / "info"
+
+
+def index_path(objects_dir: Path) -> Path:
+    return info_dir(objects_dir) / "loose-index"
+
+
+def log_path(objects_dir: Path) -> Path:
+    return info_dir(objects_dir) / "loose-index.log"
+
+
+def _is_hex(s: str) -> bool:
+    return all(c in "0123456789abcdef" for c in s)
+
+
+def _scan_loose(objects_dir: Path) -> List[bytes]:
+    out: List[bytes] = []
+    if not objects_dir.exists():
+        return out
+    for d1 in objects_dir.iterdir():
+        if len(d1.name) != 2 or not d1.is_dir():
+            continue
+        for d2 in d1.iterdir():
+            if not d2.is_dir():
+                continue
+            for p in d2.iterdir():
+                n = p.name
+                if len(n) == 64 and _is_hex(n):
+                    out.append(bytes.fromhex(n))
+    return out
+
+
+def _write_base(objects_dir: Path, keys: Iterable[bytes]) -> None:
+    uniq = sorted(set(keys))
+    p = index_path(objects_dir)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(f"{p.name}.tmp-{os.getpid()}")
+    with tmp.open("wb") as f:
+        f.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(uniq)))
+        f.write(b"".join(uniq))
+    os.replace(tmp, p)
+
+
+def _read_log(objects_dir: Path) -> bytes:
+    try:
+        data = log_path(objects_dir).read_bytes()
+    except FileNotFoundError:
+        return b""
+    # ignore a torn trailing write
+    return data[: len(data) - (len(data) % _OID)]
+
+
+class _Base:
+    def __init__(self, data: bytes) -> None:
+        magic, version, count = _HEADER.unpack_from(data, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError("Unsupported loose index")
+        self.data = data
+        self.count = count
+
+    def _key(self, i: int) -> bytes:
+        off = _HEADER.size + i * _OID
+        return self.data[off : off + _OID]
+
+    def match_prefix(self, prefix: str, limit: int) -> List[str]:
+        key = bytes.fromhex((prefix + "0" * 64)[:64])
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        out: List[str] = []
+        while lo < self.count:
+            h = self._key(lo).hex()
+            if not h.startswith(prefix):
+                break
+            out.append(h)
+            if len(out) >= limit:
+                break
+            lo += 1
+        return out
+
+
+# (mtime_ns, size) -> parsed base, per objects dir
+_LOADED: Dict[str, Tuple[Tuple[int, int], _Base]] = {}
+
+
+def _load_base(objects_dir: Path) -> Optional[_Base]:
+    p = index_path(objects_dir)
+    try:
+        st = p.stat()
+    except FileNotFoundError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    hit = _LOADED.get(str(p))
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    try:
+        base = _Base(p.read_bytes())
+    except (OSError, ValueError, struct.error):
+        return None
+    _LOADED[str(p)] = (stamp, base)
+    return base
+
+
+def rebuild(objects_dir: Path) -> int:
+    """
+    Rebuild the base index from the loose files on disk and clear the log.
+    Returns the number of indexed oids.
+    """
+    keys = _scan_loose(objects_dir)
+    _write_base(objects_dir, keys)
+    log_path(objects_dir).unlink(missing_ok=True)
+    return len(set(keys))
+
+
+def _merge_log(objects_dir: Path) -> None:
+    log = _read_log(objects_dir)
+    base = _load_base(objects_dir)
+    keys = [log[i : i + _OID] for i in range(0, len(log), _OID)]
+    if base is not None:
+        start = _HEADER.size
+        body = base.data[start : start + base.count * _OID]
+        keys.extend(body[i : i + _OID] for i in range(0, len(body), _OID))
+    _write_base(objects_dir, keys)
+
+    # keep anything appended while we were merging
+    lp = log_path(objects_dir)
+    try:
+        cur = lp.read_bytes()
+    except FileNotFoundError:
+        return
+    tail = cur[len(log):]
+    tmp = lp.with_name(f"{lp.name}.tmp-{os.getpid()}")
+    tmp.write_bytes(tail)
+    os.replace(tmp, lp)
+
+
+def record(objects_dir: Path, oid: str) -> None:
+    """
+    Note a newly written loose object. Called by store_object.
+    """
+    if index_path(objects_dir).exists():
+        lp = log_path(objects_dir)
+        with lp.open("ab") as f:
+            f.write(bytes.fromhex(oid))
+            size = f.tell()
+        if size >= LOG_MERGE_ENTRIES * _OID:
+            _merge_log(objects_dir)
+    # no base yet: the first lookup builds it from a full scan
+
+
+def match_prefix(objects_dir: Path, prefix: str, limit: int = 10) -> List[str]:
+    """
+    Loose oids starting with `prefix` (at most `limit`).
+    """
+    prefix = prefix.lower()
+    if not _is_hex(prefix):
+        return []
+
+    base = _load_base(objects_dir)
+    if base is None:
+        rebuild(objects_dir)
+        base = _load_base(objects_dir)
+
+    out: List[str] = base.match_prefix(prefix, limit) if base is not None else []
+
+    log_hex = _read_log(objects_dir).hex()
+    for i in range(0, len(log_hex), 64):
+        h = log_hex[i : i + 64]
+        if h.startswith(prefix) and h not in out:
+            out.append(h)
+            if len(out) >= limit:
+                break
+    return out
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# ---------------------------------------------------------------------
+# Packfiles
+#
+# Layout under .gait/objects/pack/:
+#   pack-<name>.pack   header + object payloads back to back
+#   pack-<name>.idx    header + fixed-width entries sorted by oid:
+#                        32-byte raw oid | u64 offset | u32 length
+#
+# <name> is sha256 over each sorted oid and the hash of its payload bytes,
+# so packing the same objects with the same encoding again (in any order)
+# produces the same name, while re-encoding them (compression on/off,
+# another level) does not.
+# Payloads are canonical JSON (no trailing newline) or a zlib stream of
+# it; objects.decode_payload tells them apart.
+# ---------------------------------------------------------------------
+
+PACK_MAGIC = b"GPAK"
+IDX_MAGIC = b"GIDX"
+PACK_VERSION = 1
+
+_HEADER = struct.Struct(">4sII")       # magic, version, count
+_ENTRY = struct.Struct(">32sQI")       # oid, offset, length
+HEADER_SIZE = _HEADER.size
+ENTRY_SIZE = _ENTRY.size
+
+
+def pack_dir(objects_dir: Path) -> Path:
+    return objects_dir / "pack"
+
+
+class PackIndex:
+    """
+    Read-only view over one pack-<name>.idx / pack-<name>.pack pair.
+    The index is memory-mapped; lookups are binary searches over raw oids.
+    """
+
+    def __init__(self, idx_path: Path) -> None:
+        self.idx_path = idx_path
+        self.pack_path = idx_path.with_suffix(".pack")
+        with idx_path.open("rb") as f:
+            head = f.read(HEADER_SIZE)
+            magic, version, count = _HEADER.unpack(head)
+            if magic != IDX_MAGIC or version != PACK_VERSION:
+                raise ValueError(f"Unsupported pack index: {idx_path}")
+            self.count = count
+            self._buf: bytes | mmap.mmap = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if count else b""
+            )
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _key(self, i: int) -> bytes:
+        off = HEADER_SIZE + i * ENTRY_SIZE
+        return self._buf[off : off + 32]
+
+    def _entry(self, i: int) -> Tuple[bytes, int, int]:
+        off = HEADER_SIZE + i * ENTRY_SIZE
+        return _ENTRY.unpack_from(self._buf, off)
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, oid: str) -> Optional[Tuple[int, int]]:
+        try:
+            key = bytes.fromhex(oid)
+        except ValueError:
+            return None
+        i = self._lower_bound(key)
+        if i < self.count:
+            k, off, length = self._entry(i)
+            if k == key:
+                return off, length
+        return None
+
+    def match_prefix(self, prefix: str, limit: int = 0) -> List[str]:
+        """
+        All oids starting with hex `prefix` (stops after `limit` matches when > 0).
+        """
+        prefix = prefix.lower()
+        if not all(c in "0123456789abcdef" for c in prefix):
+            return []
+        lo_key = bytes.fromhex((prefix + "0" * 64)[:64])
+        out: List[str] = []
+        i = self._lower_bound(lo_key)
+        while i < self.count:
+            h = self._key(i).hex()
+            if not h.startswith(prefix):
+                break
+            out.append(h)
+            if limit and len(out) >= limit:
+                break
+            i += 1
+        return out
+
+    def read(self, oid: str) -> Optional[bytes]:
+        loc = self.find(oid)
+        if loc is None:
+            return None
+        off, length = loc
+        with self.pack_path.open("rb") as f:
+            f.seek(off)
+            return f.read(length)
+
+    def iter_oids(self) -> Iterator[str]:
+        for i in range(self.count):
+            yield self._key(i).hex()
+
+    def iter_entries(self) -> Iterator[Tuple[str, int, int]]:
+        for i in range(self.count):
+            k, off, length = self._entry(i)
+            yield k.hex(), off, length
+
+    def iter_payloads(self) -> Iterator[Tuple[str, bytes]]:
+        """
+        (oid, payload) for every entry, read sequentially in pack order.
+        """
+        entries = sorted(self.iter_entries(), key=lambda e: e[1])
+        with self.pack_path.open("rb") as f:
+            for oid, off, length in entries:
+                f.seek(off)
+                yield oid, f.read(length)
+
+    def close(self) -> None:
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+
+# Loaded indexes per pack dir, keyed on the directory mtime so a repack
+# (or a pack written by another process) is picked up on next access.
+_LOADED: Dict[str, Tuple[int, List[PackIndex]]] = {}
+
+
+def load_packs(objects_dir: Path) -> List[PackIndex]:
+    d = pack_dir(objects_dir)
+    try:
+        stamp = d.stat().st_mtime_ns
+    except FileNotFoundError:
+        return []
+
+    key = str(d)
+    hit = _LOADED.get(key)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+
+    packs: List[PackIndex] = []
+    for p in sorted(d.glob("pack-*.idx")):
+        if not p.with_suffix(".pack").exists():
+            continue
+        try:
+            packs.append(PackIndex(p))
+        except (OSError, ValueError, struct.error):
+            continue
+
+    # superseded indexes are left to the GC: a caller may still be iterating one
+    _LOADED[key] = (stamp, packs)
+    return packs
+
+
+def forget_packs(objects_dir: Path) -> None:
+    hit = _LOADED.pop(str(pack_dir(objects_dir)), None)
+    if hit is not None:
+        for p in hit[1]:
+            p.close()
+
+
+def find_packed(objects_dir: Path, oid: str) -> Optional[bytes]:
+    for p in load_packs(objects_dir):
+        data = p.read(oid)
+        if data is not None:
+            return data
+    return None
+
+
+def has_packed(objects_dir: Path, oid: str) -> bool:
+    return any(p.find(oid) is not None for p in load_packs(objects_dir))
+
+
+def iter_packed_oids(objects_dir: Path) -> Iterator[str]:
+    for p in load_packs(objects_dir):
+        yield from p.iter_oids()
+
+
+# ---------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------
+
+class PackWriter:
+    """
+    Streams objects into a new pack. Nothing is visible to readers until
+    commit() renames the finished .pack/.idx into place (idx last).
+    """
+
+    def __init__(self, objects_dir: Path) -> None:
+        self.dir = pack_dir(objects_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._tmp_pack = self.dir / f"tmp-{os.getpid()}-{id(self):x}.pack"
+        self._f = self._tmp_pack.open("wb")
+        self._f.write(_HEADER.pack(PACK_MAGIC, PACK_VERSION, 0))
+        self._entries: Dict[bytes, Tuple[int, int]] = {}
+        self._digests: Dict[bytes, bytes] = {}  # oid -> sha256(payload), for the name
+        self._offset = HEADER_SIZE
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, oid: str) -> bool:
+        return bytes.fromhex(oid) in self._entries
+
+    def add(self, oid: str, data: bytes) -> None:
+        key = bytes.fromhex(oid)
+        if key in self._entries:
+            return
+        self._f.write(data)
+        self._entries[key] = (self._offset, len(data))
+        self._digests[key] = hashlib.sha256(data).digest()
+        self._offset += len(data)
+
+    def commit(self) -> Optional[Path]:
+        """
+        Finish the pack. Returns the .pack path, or None if nothing was added.
+        """
+        if not self._entries:
+            self.abort()
+            return None
+
+        keys = sorted(self._entries)
+        self._f.seek(0)
+        self._f.write(_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(keys)))
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._f.close()
+
+        name = hashlib.sha256(b"".join(k + self._digests[k] for k in keys)).hexdigest()
+        final_pack = self.dir / f"pack-{name}.pack"
+        final_idx = self.dir / f"pack-{name}.idx"
+
+        tmp_idx = self._tmp_pack.with_suffix(".idx")
+        with tmp_idx.open("wb") as f:
+            f.write(_HEADER.pack(IDX_MAGIC, PACK_VERSION, len(keys)))
+            for k in keys:
+                off, length = self._entries[k]
+                f.write(_ENTRY.pack(k, off, length))
+            f.flush()
+            os.fsync(f.fileno())
+
+        if final_idx.exists():
+            # the same objects, encoded the same way, are already packed
+            self._tmp_pack.unlink(missing_ok=True)
+            tmp_idx.unlink(missing_ok=True)
+            return final_pack
+
+        os.replace(self._tmp_pack, final_pack)
+        os.replace(tmp_idx, final_idx)
+        return final_pack
+
+    def abort(self) -> None:
+        if not self._f.closed:
+            self._f.close()
+        self._tmp_pack.unlink(missing_ok=True)
+        self._tmp_pack.with_suffix(".idx").unlink(missing_ok=True)
+
+
+def write_pack(objects_dir: Path, items: Iterable[Tuple[str, bytes]]) -> Optional[Path]:
+    w = PackWriter(objects_dir)
+    try:
+        for oid, data in items:
+            w.add(oid, data)
+    except BaseException:
+        w.abort()
+        raise
+    return w.commit()
+
+
+def remove_pack(pack_path: Path) -> None:
+    pack_path.with_suffix(".idx").unlink(missing_ok=True)
+    pack_path.unlink(missing_ok=True)
@@ -1,16 +1,24 @@
 from __future__ import annotations
 
+import os
+import random
 import re
 import hashlib
 import json
 import string
-import urllib.request
-import urllib.error
+import time
+import zlib
+import http.client
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
-from .repo import GaitRepo
+from .repo import GaitRepo, check_ref_name
+from .objects import decode_payload, encode_packed, has_object, read_object_bytes, store_object_bytes
+from .pack import PackWriter
+from .httppool import Response, default_pool
+from . import wire
 
 _OID_RE = re.compile(r"^[0-9a-f]{64}$")
 _HEX = set(string.hexdigits.lower())
@@ -20,8 +28,8 @@ _HEX = set(string.hexdigits.lower())
 # ---------------------------------------------------------------------
 
 def _canonical_payload_bytes(raw: bytes) -> bytes:
-    # Accept either canonical JSON bytes or canonical JSON bytes + "\n"
-    return raw[:-1] if raw.endswith(b"\n") else raw
+    # Accept canonical JSON bytes, canonical JSON bytes + "\n", or a zlib stream of them
+    return decode_payload(raw)
 
 
 def _sha256_hex(b: bytes) -> str:
@@ -29,14 +37,66 @@ def _sha256_hex(b: bytes) -> str:
 
 
 def _sha256_payload(raw: bytes) -> str:
-    return _sha256_hex(_canonical_payload_bytes(raw))
+    try:
+        return _sha256_hex(_canonical_payload_bytes(raw))
+    except zlib.error:
+        return ""
 
 
 # ---------------------------------------------------------------------
-# HTTP helpers (urllib, consistent with your CLI style)
+# HTTP helpers (pooled keep-alive connections, see httppool.py)
 # ---------------------------------------------------------------------
 
-def _http_bytes(method: str, url: str, *, token: str = "", body: Optional[bytes] = None, headers: Optional[dict] = None, timeout: float = 60.0) -> bytes:
+class HTTPStatusError(RuntimeError):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+# servers without the batch endpoints answer these; callers fall back to per-object calls
+UNSUPPORTED_STATUS = (404, 405, 501)
+
+
+# worth another try after a pause: the server (or a proxy in front of it) is
+# overloaded or restarting
+TRANSIENT_STATUS = (429, 502, 503, 504)
+
+DEFAULT_HTTP_RETRIES = 4
+HTTP_BACKOFF = 0.5       # seconds before the first retry, doubled each time
+HTTP_BACKOFF_MAX = 30.0
+
+
+def http_retries_from_env() -> int:
+    """
+    GAIT_HTTP_RETRIES overrides how often a transient failure is retried (0 disables).
+    """
+    v = os.environ.get("GAIT_HTTP_RETRIES", "").strip()
+    return max(0, int(v)) if v else DEFAULT_HTTP_RETRIES
+
+
+def _backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    if retry_after and retry_after.strip().isdigit():
+        return min(HTTP_BACKOFF_MAX, float(retry_after.strip()))
+    delay = min(HTTP_BACKOFF_MAX, HTTP_BACKOFF * (2 ** attempt))
+    # jitter keeps parallel transfer workers from retrying in lockstep
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _http_open(
+    method: str,
+    url: str,
+    *,
+    token: str = "",
+    body: Optional[bytes] = None,
+    headers: Optional[dict] = None,
+    timeout: float = 60.0,
+    retries: Optional[int] = None,
+) -> Response:
+    """
+    Open a request and return the response for streaming; the caller closes it.
+    Connection failures and TRANSIENT_STATUS answers are retried with
+    exponential backoff (`retries` times, default http_retries_from_env()).
+    """
     h = {}
     if token:
         h["Authorization"] = f"Bearer {token}"
@@ -48,36 +108,80 @@ def _http_bytes(method: str, url: str, *, token: str = "", body: Optional[bytes]
     if headers:
         h.update(headers)
 
-    req = urllib.request.Request(url, data=body, headers=h, method=method)
-    
-    try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            return resp.read()
-    except urllib.error.HTTPError as e:
-        txt = e.read().decode("utf-8", errors="replace")
-        raise RuntimeError(f"HTTP {e.code} {e.reason} @ {url}: {txt}") from e
-    except urllib.error.URLError as e:
-        raise RuntimeError(f"Cannot reach {url}: {e}") from e
+    attempts = http_retries_from_env() if retries is None else max(0, retries)
+    attempt = 0
+    while True:
+        try:
+            resp = default_pool().request(method, url, body=body, headers=h, timeout=timeout)
+        except (OSError, http.client.HTTPException) as e:
+            if attempt >= attempts:
+                raise RuntimeError(f"Cannot reach {url}: {e}") from e
+            time.sleep(_backoff_delay(attempt))
+            attempt += 1
+            continue
 
+        if resp.status in TRANSIENT_STATUS and attempt < attempts:
+            retry_after = resp.headers.get("Retry-After")
+            with resp:
+                try:
+                    resp.read()
+                except (OSError, http.client.HTTPException):
+                    pass
+            time.sleep(_backoff_delay(attempt, retry_after))
+            attempt += 1
+            continue
 
-def _http_json(method: str, url: str, *, token: str = "", payload: Optional[dict] = None, headers: Optional[dict] = None, timeout: float = 60.0) -> dict:
+        if resp.status >= 300:
+            with resp:
+                txt = resp.read().decode("utf-8", errors="replace")
+            raise HTTPStatusError(resp.status, f"HTTP {resp.status} {resp.reason} @ {url}: {txt}")
+        return resp
+
+
+def _http_bytes(
+    method: str,
+    url: str,
+    *,
+    token: str = "",
+    body: Optional[bytes] = None,
+    headers: Optional[dict] = None,
+    timeout: float = 60.0,
+    retries: Optional[int] = None,
+) -> bytes:
+    """
+    Whole response body. A connection lost while reading it is retried like
+    a failed request.
+    """
+    attempts = http_retries_from_env() if retries is None else max(0, retries)
+    attempt = 0
+    while True:
+        with _http_open(method, url, token=token, body=body, headers=headers, timeout=timeout, retries=attempts - attempt) as resp:
+            try:
+                return resp.read()
+            except (OSError, http.client.HTTPException) as e:
+                if attempt >= attempts:
+                    raise RuntimeError(f"Cannot reach {url}: {e}") from e
+        time.sleep(_backoff_delay(attempt))
+        attempt += 1
+
+
+def _http_json(
+    method: str,
+    url: str,
+    *,
+    token: str = "",
+    payload: Optional[dict] = None,
+    headers: Optional[dict] = None,
+    timeout: float = 60.0,
+    retries: Optional[int] = None,
+) -> dict:
     data = None if payload is None else json.dumps(payload).encode("utf-8")
     h = {"Content-Type": "application/json"}
-    if token:
-        h["Authorization"] = f"Bearer {token}"
     if headers:
         h.update(headers)
 
-    req = urllib.request.Request(url, data=data, headers=h, method=method)
-    try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            raw = resp.read().decode("utf-8", errors="replace")
-            return json.loads(raw) if raw.strip() else {}
-    except urllib.error.HTTPError as e:
-        txt = e.read().decode("utf-8", errors="replace")
-        raise RuntimeError(f"HTTP {e.code} {e.reason} @ {url}: {txt}") from e
-    except urllib.error.URLError as e:
-        raise RuntimeError(f"Cannot reach {url}: {e}") from e
+    raw = _http_bytes(method, url, token=token, body=data, headers=h, timeout=timeout, retries=retries).decode("utf-8", errors="replace")
+    return json.loads(raw) if raw.strip() else {}
 
 
 def _norm_base(url: str) -> str:
@@ -93,15 +197,11 @@ def _repo_base(remote_url: str, owner: str, repo: str) -> str:
 # ---------------------------------------------------------------------
 
 def _load_config(repo: GaitRepo) -> Dict[str, Any]:
-    p = repo.gait_dir / "config.json"
-    if not p.exists():
-        return {"schema": "gait.config.v0", "remotes": {}}
-    return json.loads(p.read_text(encoding="utf-8"))
+    return repo.read_config()
 
 
 def _save_config(repo: GaitRepo, cfg: Dict[str, Any]) -> None:
-    p = repo.gait_dir / "config.json"
-    p.write_text(json.dumps(cfg, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    repo.write_config(cfg)
 
 
 def remote_add(repo: GaitRepo, name: str, url: str) -> None:
@@ -120,6 +220,50 @@ def remote_get(repo: GaitRepo, name: str) -> str:
     return url
 
 
+# ---------------------------------------------------------------------
+# Ref advertisement cache: .gait/remote-refs.json
+#   {repo base URL: {"etag": ..., "refs": {"heads": {...}, "memory": {...}}}}
+# Lets get_refs ask "changed since?" instead of downloading /refs again.
+# ---------------------------------------------------------------------
+
+def _refs_cache_path(repo: GaitRepo) -> Path:
+    return repo.gait_dir / "remote-refs.json"
+
+
+def _read_refs_cache(repo: GaitRepo) -> Dict[str, Any]:
+    try:
+        data = json.loads(_refs_cache_path(repo).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _remote_refs(repo: GaitRepo, client: "RemoteClient") -> Dict[str, Any]:
+    """
+    The remote's refs; the cached copy is revalidated with If-None-Match and
+    reused when the server answers 304.
+    """
+    cache = _read_refs_cache(repo)
+    entry = cache.get(client.base()) or {}
+    cached = entry.get("refs") if isinstance(entry.get("refs"), dict) else None
+
+    refs, etag = client.get_refs(etag=str(entry.get("etag") or "") if cached is not None else "")
+    if refs is None:
+        return cached or {}
+    # branch names become paths under refs/remotes/<remote>/
+    for kind in ("heads", "memory"):
+        for name in (refs.get(kind) or {}):
+            check_ref_name(name)
+
+    if etag:
+        cache[client.base()] = {"etag": etag, "refs": refs}
+        p = _refs_cache_path(repo)
+        tmp = p.with_name(f"{p.name}.tmp-{os.getpid()}")
+        tmp.write_text(json.dumps(cache, sort_keys=True) + "\n", encoding="utf-8")
+        os.replace(tmp, p)
+    return refs
+
+
 # ---------------------------------------------------------------------
 # Spec + client
 # ---------------------------------------------------------------------
@@ -132,11 +276,31 @@ class RemoteSpec:
     name: str = "origin"
 
 
+PACK_UPLOAD_BYTES = 8 * 1024 * 1024  # payload bytes per POST /objects/pack
+COMPRESS_MIN_BYTES = 1024
+
+
+# what each server said about the batch endpoints, so later clients in this
+# process (e.g. lazy partial-clone reads) don't probe again
+_PACK_SUPPORT: Dict[str, bool] = {}
+
+
 class RemoteClient:
     def __init__(self, spec: RemoteSpec, *, token: str) -> None:
         self.spec = spec
         self.token = token
 
+    @property
+    def supports_pack(self) -> Optional[bool]:
+        """
+        None until we learn whether the server has the batch endpoints.
+        """
+        return _PACK_SUPPORT.get(self.base())
+
+    @supports_pack.setter
+    def supports_pack(self, value: bool) -> None:
+        _PACK_SUPPORT[self.base()] = value
+
     def base(self) -> str:
         return _repo_base(self.spec.base_url, self.spec.owner, self.spec.repo)
 
@@ -158,18 +322,106 @@ class RemoteClient:
         # canon_bytes should NOT include newline
         _http_bytes("PUT", f"{self.base()}/objects/{oid}", token=self.token, body=canon_bytes)
 
+    # ---- batch objects (wire.py stream) ----
+
+    def put_pack(self, items: List[Tuple[str, bytes]]) -> bool:
+        """
+        Upload many objects in one request. Returns False if the server has no
+        batch endpoint (the caller should fall back to put_object_bytes).
+        """
+        if self.supports_pack is False:
+            return False
+        body = wire.encode_stream_bytes(items)
+        headers = {"Content-Type": wire.CONTENT_TYPE}
+        if len(body) >= COMPRESS_MIN_BYTES:
+            body = zlib.compress(body, 6)
+            headers["Content-Encoding"] = "deflate"
+        try:
+            _http_bytes("POST", f"{self.base()}/objects/pack", token=self.token, body=body, headers=headers)
+        except HTTPStatusError as e:
+            if e.code in UNSUPPORTED_STATUS and not self.supports_pack:
+                self.supports_pack = False
+                return False
+            raise
+        self.supports_pack = True
+        return True
+
+    def fetch_pack(
+        self,
+        wants: List[str],
+        haves: List[str],
+        *,
+        depth: Optional[int] = None,
+        since: Optional[str] = None,
+        omit_turns: bool = False,
+        exact: bool = False,
+    ):
+        """
+        Open a fetch-pack response; returns None if the server has no batch
+        endpoint. Iterate wire.iter_stream(resp, encoding=...) and close it.
+        """
+        if self.supports_pack is False:
+            return None
+        req: Dict[str, Any] = {"wants": wants, "haves": haves}
+        if depth:
+            req["depth"] = depth
+        if since:
+            req["since"] = since
+        if omit_turns:
+            req["filter"] = "turns"
+        if exact:
+            req["closure"] = False
+        try:
+            resp = _http_open(
+                "POST",
+                f"{self.base()}/objects/fetch-pack",
+                token=self.token,
+                body=json.dumps(req).encode("utf-8"),
+                headers={
+                    "Content-Type": "application/json",
+                    "Accept": wire.CONTENT_TYPE,
+                    "Accept-Encoding": "deflate",
+                },
+                timeout=300.0,
+            )
+        except HTTPStatusError as e:
+            if e.code in UNSUPPORTED_STATUS and not self.supports_pack:
+                self.supports_pack = False
+                return None
+            raise
+        self.supports_pack = True
+        return resp
+
     # ---- refs ----
 
-    def get_refs(self) -> Dict[str, Any]:
-        return _http_json("GET", f"{self.base()}/refs", token=self.token)
+    def get_refs(self, *, etag: str = "") -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        (refs, etag). With the etag of an earlier answer, a server that
+        supports conditional GET replies 304 and refs comes back as None.
+        """
+        headers = {"If-None-Match": etag} if etag else {}
+        try:
+            with _http_open("GET", f"{self.base()}/refs", token=self.token, headers=headers) as resp:
+                raw = resp.read()
+                new_etag = resp.headers.get("ETag") or ""
+        except HTTPStatusError as e:
+            if e.code == 304 and etag:
+                return None, etag
+            raise
+        except (OSError, http.client.HTTPException) as e:
+            raise RuntimeError(f"Cannot reach {self.base()}/refs: {e}") from e
+        text = raw.decode("utf-8", errors="replace")
+        return (json.loads(text) if text.strip() else {}), new_etag
 
     def put_head_ref(self, branch: str, oid: str, *, expected_old: Optional[str]) -> None:
+        check_ref_name(branch)
         headers = {}
         if expected_old is not None:
             headers["If-Match"] = expected_old
         _http_json("PUT", f"{self.base()}/refs/heads/{branch}", token=self.token, payload={"oid": oid}, headers=headers)
 
     def put_memory_ref(self, branch: str, oid: str, *, expected_old: Optional[str]) -> None:
+        check_ref_name(branch)
         headers = {}
         if expected_old is not None:
             headers["If-Match"] = expected_old
@@ -186,44 +438,418 @@ def _is_oid(name: str) -> bool:
     n = name.lower()
     return all(c in _HEX for c in n)
 
-def _iter_local_oids(repo: GaitRepo) -> List[str]:
-    if not repo.objects_dir.exists():
-        return []
-    out: List[str] = []
-    for p in repo.objects_dir.rglob("*"):
-        if not p.is_file():
-            continue
-        if _is_oid(p.name):
-            out.append(p.name.lower())
-    return out
+MISSING_BATCH = 1000  # oids per /objects/missing request
 
 def _store_local_object_bytes(repo: GaitRepo, oid: str, canon_bytes: bytes) -> None:
-    # store as canonical bytes + newline (matches objects.py)
-    sub = repo.objects_dir / oid[:2] / oid[2:4]
-    sub.mkdir(parents=True, exist_ok=True)
-    path = sub / oid
-    if not path.exists():
-        path.write_bytes(canon_bytes + b"\n")
+    # store using the repo's configured on-disk encoding (matches objects.py)
+    store_object_bytes(repo.objects_dir, oid, canon_bytes, **repo.storage_options())
 
 
 def _load_local_object_bytes(repo: GaitRepo, oid: str) -> bytes:
     if not _OID_RE.match(oid):
         raise RuntimeError(f"Invalid oid encountered during push: {oid!r}")
-    path = repo.objects_dir / oid[:2] / oid[2:4] / oid
-    return path.read_bytes()
+    return read_object_bytes(repo.objects_dir, oid)
+
+
+class _LocalHave(set):
+    """
+    Objects known to be local: those stored during this transfer, plus
+    whatever the object store answers for. Replaces listing every object in
+    the repo up front.
+    """
+
+    def __init__(self, repo: GaitRepo) -> None:
+        super().__init__()
+        self._objects_dir = repo.objects_dir
+
+    def __contains__(self, oid: object) -> bool:
+        if set.__contains__(self, oid):
+            return True
+        if isinstance(oid, str) and _OID_RE.match(oid) and has_object(self._objects_dir, oid):
+            self.add(oid)
+            return True
+        return False
+
+
+# ---------------------------------------------------------------------
+# Fetch journal: .gait/fetch-journal
+#
+#   line 1   {"remote": name, "url": base, "omit_turns": bool}
+#   then     "d <oid>"  written before the object is stored
+#            "q <oid>"  one per dependency of it that was missing locally
+#
+# An interrupted fetch/clone leaves the file behind; the next fetch from
+# the same remote restarts from the frontier (queued but never stored)
+# instead of from the refs, whose tips may already be local while their
+# history is not. The file is removed once a fetch completes.
+# ---------------------------------------------------------------------
+
+def _journal_path(repo: GaitRepo) -> Path:
+    return repo.gait_dir / "fetch-journal"
+
+
+class _FetchJournal:
+    def __init__(self, repo: GaitRepo, key: Dict[str, Any], have: Set[str], *, turns: bool = True) -> None:
+        self.path = _journal_path(repo)
+        self.key = key
+        self.have = have
+        self.turns = turns
+        self._f: Optional[Any] = None
+        self._resumed = False
+
+    def frontier(self) -> List[str]:
+        """
+        Objects an earlier, interrupted fetch with the same key still needed.
+        """
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return []
+        try:
+            header = json.loads(lines[0]) if lines else None
+        except ValueError:
+            header = None
+        if header != self.key:
+            return []
+        self._resumed = True
+
+        stored: Dict[str, None] = {}
+        queued: Dict[str, None] = {}
+        for line in lines[1:]:
+            tag, _, oid = line.partition(" ")
+            if not _OID_RE.match(oid):
+                continue  # torn last line
+            (stored if tag == "d" else queued)[oid] = None
+        # a "d" whose object never reached the store is still pending
+        pending = [oid for oid in queued if oid not in stored]
+        pending.extend(stored)
+        return [oid for oid in dict.fromkeys(pending) if oid not in self.have]
+
+    def begin(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self._resumed:
+            self._f = self.path.open("a", encoding="utf-8")
+        else:
+            self._f = self.path.open("w", encoding="utf-8")
+            self._f.write(json.dumps(self.key, sort_keys=True) + "\n")
+            self._f.flush()
+
+    def record(self, oid: str, obj: Any) -> None:
+        """
+        Call before storing `oid`; `obj` is its parsed payload.
+        """
+        if self._f is None:
+            return
+        deps: List[str] = []
+        if isinstance(obj, dict):
+            _enqueue_deps(obj, deps, turns=self.turns)
+        lines = [f"d {oid}\n"]
+        lines.extend(f"q {d}\n" for d in dict.fromkeys(deps) if d and d not in self.have)
+        self._f.write("".join(lines))
+        self._f.flush()
+
+    def close(self) -> None:
+        f, self._f = self._f, None
+        if f is not None:
+            f.close()
+
+    def finish(self) -> None:
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------------------
+# Transfer engine: bounded thread pool for object GET/PUT
+# ---------------------------------------------------------------------
+
+DEFAULT_TRANSFER_JOBS = 8
+
+
+def transfer_jobs_from_env() -> int:
+    """
+    GAIT_TRANSFER_JOBS overrides the default number of concurrent object requests.
+    """
+    v = os.environ.get("GAIT_TRANSFER_JOBS", "").strip()
+    return max(1, int(v)) if v else DEFAULT_TRANSFER_JOBS
+
+
+@dataclass
+class TransferStats:
+    objects: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    jobs: int = 1
+
+    @property
+    def objects_per_sec(self) -> float:
+        return self.objects / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def mb_per_sec(self) -> float:
+        return self.bytes / (1024 * 1024) / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "objects": self.objects,
+            "bytes": self.bytes,
+            "seconds": self.seconds,
+            "jobs": self.jobs,
+            "objects_per_sec": self.objects_per_sec,
+            "mb_per_sec": self.mb_per_sec,
+        }
+
+
+def _run_pipelined(
+    fn: Callable[[str], bytes],
+    roots: Iterable[str],
+    *,
+    jobs: int,
+    on_done: Callable[[str, bytes, List[str]], None],
+    skip: Callable[[str], bool] = lambda oid: False,
+) -> None:
+    """
+    Run fn(oid) for every oid in `roots` with at most `jobs` requests in
+    flight. on_done(oid, result, queue) runs on the calling thread and may
+    append newly discovered oids to `queue`; they are scheduled while other
+    requests are still running.
+    """
+    q: List[str] = list(roots)
+    queued: Set[str] = set()
+    inflight: Dict[Future, str] = {}
+    ex = ThreadPoolExecutor(max_workers=max(1, jobs))
+    try:
+        while q or inflight:
+            while q and len(inflight) < max(1, jobs) * 2:
+                oid = q.pop()
+                if not oid or oid in queued or skip(oid):
+                    continue
+                queued.add(oid)
+                inflight[ex.submit(fn, oid)] = oid
+            if not inflight:
+                continue
+            done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                oid = inflight.pop(fut)
+                on_done(oid, fut.result(), q)
+    finally:
+        ex.shutdown(wait=True, cancel_futures=True)
+
+
+def _load_verified(repo: GaitRepo, oid: str) -> bytes:
+    raw = _load_local_object_bytes(repo, oid)
+    if _sha256_payload(raw) != oid:
+        raise RuntimeError(f"Local object corrupt: {oid}")
+    return _canonical_payload_bytes(raw)
+
+
+def _upload_packs(repo: GaitRepo, client: "RemoteClient", oids: List[str], *, stats: TransferStats) -> List[str]:
+    """
+    Upload through POST /objects/pack in batches of ~PACK_UPLOAD_BYTES.
+    Returns the oids still to send (all of them if the server lacks the endpoint).
+    """
+    t0 = time.perf_counter()
+    batch: List[Tuple[str, bytes]] = []
+    size = 0
+    sent = 0
+    try:
+        for oid in oids:
+            canon = _load_verified(repo, oid)
+            batch.append((oid, canon))
+            size += len(canon)
+            if size >= PACK_UPLOAD_BYTES:
+                if not client.put_pack(batch):
+                    return oids[sent:]
+                sent += len(batch)
+                stats.objects += len(batch)
+                stats.bytes += size
+                batch, size = [], 0
+        if batch:
+            if not client.put_pack(batch):
+                return oids[sent:]
+            stats.objects += len(batch)
+            stats.bytes += size
+        return []
+    finally:
+        stats.seconds += time.perf_counter() - t0
+
+
+def _upload_objects(repo: GaitRepo, client: "RemoteClient", oids: List[str], *, jobs: int, stats: TransferStats) -> None:
+    stats.jobs = jobs
+    oids = _upload_packs(repo, client, oids, stats=stats) if oids else oids
+    if not oids:
+        return
+    t0 = time.perf_counter()
+
+    def upload(oid: str) -> bytes:
+        canon = _load_verified(repo, oid)
+        client.put_object_bytes(oid, canon)
+        return canon
+
+    def done(oid: str, canon: bytes, q: List[str]) -> None:
+        stats.objects += 1
+        stats.bytes += len(canon)
+
+    _run_pipelined(upload, oids, jobs=jobs, on_done=done)
+    stats.seconds += time.perf_counter() - t0
+
+
+def _download_pack(
+    repo: GaitRepo,
+    client: "RemoteClient",
+    wants: List[str],
+    haves: List[str],
+    *,
+    have: Set[str],
+    stats: TransferStats,
+    depth: Optional[int] = None,
+    since: Optional[str] = None,
+    parents_out: Optional[Dict[str, List[str]]] = None,
+    omit_turns: bool = False,
+    exact: bool = False,
+    journal: Optional[_FetchJournal] = None,
+) -> bool:
+    """
+    One POST /objects/fetch-pack; objects go straight into a new local pack.
+    Returns False if the server lacks the endpoint. With `parents_out`, the
+    parents of every received commit are recorded there. With a `journal`,
+    what arrived before a failure is kept and journaled for the next fetch.
+    """
+    t0 = time.perf_counter()
+    resp = client.fetch_pack(wants, haves, depth=depth, since=since, omit_turns=omit_turns, exact=exact)
+    if resp is None:
+        return False
+
+    opts = repo.storage_options()
+    w = PackWriter(repo.objects_dir)
+    try:
+        with resp:
+            for oid, payload in wire.iter_stream(resp, encoding=resp.headers.get("Content-Encoding")):
+                if oid in have:
+                    continue
+                if _sha256_payload(payload) != oid:
+                    raise RuntimeError(f"Remote sent bad object: {oid}")
+                canon = _canonical_payload_bytes(payload)
+                if journal is not None:
+                    try:
+                        journal.record(oid, json.loads(canon))
+                    except ValueError:
+                        journal.record(oid, None)
+                w.add(oid, encode_packed(canon, **opts))
+                have.add(oid)
+                if parents_out is not None and b'"gait.commit.v0"' in canon:
+                    obj = json.loads(canon)
+                    if obj.get("schema") == "gait.commit.v0":
+                        parents_out[oid] = [p for p in (obj.get("parents") or []) if p]
+                stats.objects += 1
+                stats.bytes += len(canon)
+    except BaseException as e:
+        if journal is not None and len(w):
+            w.commit()
+        else:
+            w.abort()
+        if isinstance(e, (OSError, http.client.HTTPException)):
+            raise RuntimeError(f"Connection lost during fetch-pack: {e}") from e
+        if isinstance(e, ValueError):
+            # truncated or garbled stream
+            raise RuntimeError(f"Bad fetch-pack stream: {e}") from e
+        raise
+    w.commit()
+    stats.seconds += time.perf_counter() - t0
+    return True
+
+
+def _download_closure(
+    repo: GaitRepo,
+    client: "RemoteClient",
+    roots: List[str],
+    *,
+    have: Set[str],
+    jobs: int,
+    stats: TransferStats,
+    depth: Optional[int] = None,
+    since: Optional[str] = None,
+    omit_turns: bool = False,
+    journal: Optional[_FetchJournal] = None,
+) -> Set[str]:
+    """
+    Fetch `roots` and everything they reference that is not in `have`,
+    storing each object as it arrives. Objects are hash-checked in the
+    worker threads; the local store is only written from this thread.
+
+    depth / since cut the commit walk (roots count as depth 1); returns the
+    stored commits whose parents were deliberately not fetched. omit_turns
+    skips turn objects (partial clone). Each object is journaled before it
+    is stored when a `journal` is given.
+    """
+    stats.jobs = jobs
+    t0 = time.perf_counter()
+    commit_depth: Dict[str, int] = {}
+    children: Dict[str, List[str]] = {}
+    shallow: Set[str] = set()
+
+    def download(oid: str) -> bytes:
+        raw = client.get_object_bytes(oid)
+        if _sha256_payload(raw) != oid:
+            raise RuntimeError(f"Remote sent bad object: {oid}")
+        return _canonical_payload_bytes(raw)
+
+    def done(oid: str, canon: bytes, q: List[str]) -> None:
+        try:
+            obj = json.loads(canon.decode("utf-8"))
+        except Exception:
+            obj = None
+
+        limited = isinstance(obj, dict) and obj.get("schema") == "gait.commit.v0" and (depth or since)
+        if limited:
+            d = commit_depth.get(oid, 1)
+            if since and d > 1 and str(obj.get("created_at") or "") < since:
+                # older than the cutoff: leave it out, its children become the boundary
+                shallow.update(children.get(oid, []))
+                return
+
+        if journal is not None:
+            journal.record(oid, obj)
+        _store_local_object_bytes(repo, oid, canon)
+        have.add(oid)
+        stats.objects += 1
+        stats.bytes += len(canon)
+        if not isinstance(obj, dict):
+            return
+
+        if obj.get("schema") == "gait.memory.v0":
+            # pinned commits are needed in full, like tips
+            for it in (obj.get("items") or []):
+                if it.get("commit_id"):
+                    commit_depth[str(it["commit_id"])] = 1
+
+        if limited:
+            parents = [p for p in (obj.get("parents") or []) if p]
+            if depth and d >= depth:
+                if any(p not in have for p in parents):
+                    shallow.add(oid)
+                obj = dict(obj, parents=[])
+            else:
+                for p in parents:
+                    commit_depth[p] = min(commit_depth.get(p, d + 1), d + 1)
+                    children.setdefault(p, []).append(oid)
+        _enqueue_deps(obj, q, turns=not omit_turns)
+
+    _run_pipelined(download, roots, jobs=jobs, on_done=done, skip=have.__contains__)
+    stats.seconds += time.perf_counter() - t0
+    return shallow
 
 
 # ---------------------------------------------------------------------
 # Dependency walking (commit/turn/memory)
 # ---------------------------------------------------------------------
 
-def _enqueue_deps(obj: Dict[str, Any], q: List[str]) -> None:
+def _enqueue_deps(obj: Dict[str, Any], q: List[str], *, turns: bool = True) -> None:
     schema = obj.get("schema") or ""
     if schema == "gait.commit.v0":
         for p in (obj.get("parents") or []):
             if p:
                 q.append(p)
-        for tid in (obj.get("turn_ids") or []):
+        for tid in (obj.get("turn_ids") or []) if turns else []:
             if tid:
                 q.append(tid)
         sid = obj.get("snapshot_id")
@@ -235,88 +861,317 @@ def _enqueue_deps(obj: Dict[str, Any], q: List[str]) -> None:
             tid = it.get("turn_id")
             if cid:
                 q.append(str(cid))
-            if tid:
+            if tid and turns:
                 q.append(str(tid))
     # gait.turn.v0 has no oid deps in v0
 
 
+def _push_candidates(
+    repo: GaitRepo,
+    *,
+    head: str,
+    mem: str,
+    remote_heads: List[str],
+    remote_mems: List[str],
+) -> List[str]:
+    """
+    Objects reachable from `head` / `mem` that the remote may not have.
+    Walks commits from the local tips and stops at any commit that is (an
+    ancestor of) a remote head we also have locally; the remote holds the
+    full history behind its own refs.
+    """
+    graph = repo.commit_graph
+    tips = [t for t in dict.fromkeys(remote_heads) if t and graph.add(t) is not None]
+    tipset = set(tips)
+
+    out: List[str] = []
+    commits: List[str] = [head] if head else []
+
+    if mem and mem not in set(remote_mems):
+        out.append(mem)
+        for it in (repo.get_object(mem).get("items") or []):
+            if it.get("commit_id"):
+                commits.append(str(it["commit_id"]))
+            if it.get("turn_id"):
+                out.append(str(it["turn_id"]))
+
+    seen: Set[str] = set()
+    shallow = repo.read_shallow()
+    while commits:
+        cid = commits.pop()
+        if not cid or cid in seen:
+            continue
+        seen.add(cid)
+        # generation numbers make this cheap for commits newer than every tip
+        if cid in tipset or any(graph.is_ancestor(cid, t) for t in tips):
+            continue
+        out.append(cid)
+        commit = repo.get_commit(cid)
+        if cid not in shallow:
+            commits.extend(p for p in (commit.get("parents") or []) if p)
+        out.extend(t for t in (commit.get("turn_ids") or []) if t)
+        if commit.get("snapshot_id"):
+            out.append(str(commit["snapshot_id"]))
+
+    return list(dict.fromkeys(out))
+
+
 # ---------------------------------------------------------------------
 # High-level operations
 # ---------------------------------------------------------------------
 
-def push(repo: GaitRepo, spec: RemoteSpec, *, token: str, branch: Optional[str] = None) -> None:
+def push(
+    repo: GaitRepo,
+    spec: RemoteSpec,
+    *,
+    token: str,
+    branch: Optional[str] = None,
+    jobs: Optional[int] = None,
+    stats: Optional[TransferStats] = None,
+) -> None:
     branch = branch or repo.current_branch()
     client = RemoteClient(spec, token=token)
 
     local_head = repo.read_ref(branch)
     local_mem = repo.read_memory_ref(branch)
-
-    all_oids = _iter_local_oids(repo)
-    missing = client.missing(all_oids)
-
-    for oid in missing:
-        raw = _load_local_object_bytes(repo, oid)
-        if _sha256_payload(raw) != oid:
-            raise RuntimeError(f"Local object corrupt: {oid}")
-        canon = _canonical_payload_bytes(raw)
-        client.put_object_bytes(oid, canon)
-
-    remote_refs = client.get_refs()
-    remote_head_old = (remote_refs.get("heads") or {}).get(branch, "") or None
-    remote_mem_old  = (remote_refs.get("memory") or {}).get(branch, "") or None
+    if not local_head:
+        raise ValueError(f"Branch {branch} has no commits to push")
+
+    remote_refs = _remote_refs(repo, client)
+    remote_heads: Dict[str, str] = dict(remote_refs.get("heads") or {})
+    remote_mems: Dict[str, str] = dict(remote_refs.get("memory") or {})
+
+    candidates = _push_candidates(
+        repo,
+        head=local_head,
+        mem=local_mem,
+        remote_heads=list(remote_heads.values()),
+        remote_mems=list(remote_mems.values()),
+    )
+    missing: List[str] = []
+    for i in range(0, len(candidates), MISSING_BATCH):
+        missing.extend(client.missing(candidates[i : i + MISSING_BATCH]))
+
+    _upload_objects(
+        repo, client, missing,
+        jobs=jobs or transfer_jobs_from_env(),
+        stats=stats if stats is not None else TransferStats(),
+    )
+
+    # CAS against the refs we negotiated with, so a concurrent push is not overwritten
+    remote_head_old = remote_heads.get(branch, "") or None
+    remote_mem_old  = remote_mems.get(branch, "") or None
 
     client.put_head_ref(branch, local_head, expected_old=remote_head_old)
     client.put_memory_ref(branch, local_mem, expected_old=remote_mem_old)
 
 
-def fetch(repo: GaitRepo, spec: RemoteSpec, *, token: str) -> Tuple[Dict[str, str], Dict[str, str]]:
-    client = RemoteClient(spec, token=token)
-    refs = client.get_refs()
-
-    heads: Dict[str, str] = dict(refs.get("heads") or {})
-    mems: Dict[str, str] = dict(refs.get("memory") or {})
-
-    # write remote-tracking refs into local refs using nested paths
+def fetch_promised(repo: GaitRepo, oids: List[str], *, jobs: Optional[int] = None) -> int:
+    """
+    Download exactly `oids` (no dependencies) from the repo's promisor remote.
+    Used by GaitRepo.get_object / prefetch in a partial clone. Returns the
+    number of objects stored.
+    """
+    promisor = repo.promisor()
+    if promisor is None:
+        return 0
+    spec = RemoteSpec(
+        base_url=remote_get(repo, promisor["remote"]),
+        owner=str(promisor.get("owner") or ""),
+        repo=str(promisor.get("repo") or ""),
+        name=promisor["remote"],
+    )
+    client = RemoteClient(spec, token=os.environ.get("GAITHUB_TOKEN", "").strip())
+    have: Set[str] = set()
+    stats = TransferStats()
+    if not _download_pack(repo, client, oids, [], have=have, stats=stats, exact=True):
+        def download(oid: str) -> bytes:
+            try:
+                raw = client.get_object_bytes(oid)
+            except HTTPStatusError as e:
+                if e.code == 404:
+                    return b""
+                raise
+            if _sha256_payload(raw) != oid:
+                raise RuntimeError(f"Remote sent bad object: {oid}")
+            return _canonical_payload_bytes(raw)
+
+        def done(oid: str, canon: bytes, q: List[str]) -> None:
+            if canon:
+                _store_local_object_bytes(repo, oid, canon)
+                stats.objects += 1
+
+        _run_pipelined(download, oids, jobs=jobs or transfer_jobs_from_env(), on_done=done)
+    return stats.objects
+
+
+def _tracking_refs_match(repo: GaitRepo, spec: RemoteSpec, heads: Dict[str, str], mems: Dict[str, str]) -> bool:
+    if _journal_path(repo).exists():
+        return False
+    for base, refs in ((repo.refs_dir, heads), (repo.memory_refs_dir, mems)):
+        for br, oid in refs.items():
+            p = base / "remotes" / spec.name / br
+            if not p.exists() or p.read_text(encoding="utf-8").strip() != (oid or ""):
+                return False
+            # the tip itself may have been lost (gc, a deleted pack) since
+            if oid and not has_object(repo.objects_dir, oid):
+                return False
+    return True
+
+
+def _write_tracking_refs(repo: GaitRepo, spec: RemoteSpec, heads: Dict[str, str], mems: Dict[str, str]) -> None:
+    # remote-tracking refs use nested paths: refs/heads/remotes/<remote>/<branch>
     for br, oid in heads.items():
         repo.write_ref(f"remotes/{spec.name}/{br}", oid or "")
     for br, oid in mems.items():
         repo.write_memory_ref(oid or "", f"remotes/{spec.name}/{br}")
 
-    have: Set[str] = set(_iter_local_oids(repo))
-    q: List[str] = []
-
-    for oid in heads.values():
-        if oid:
-            q.append(oid)
-    for oid in mems.values():
-        if oid:
-            q.append(oid)
 
-    while q:
-        oid = q.pop()
-        if not oid or oid in have:
+def _normalize_since(since: str) -> str:
+    """
+    DATE or DATE-TIME -> the created_at format ("%Y-%m-%dT%H:%M:%S"), so it compares as a string.
+    """
+    for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+        try:
+            return time.strftime("%Y-%m-%dT%H:%M:%S", time.strptime(since.strip(), fmt))
+        except ValueError:
             continue
+    raise ValueError(f"Invalid --since date: {since!r} (expected YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS)")
+
+
+def fetch(
+    repo: GaitRepo,
+    spec: RemoteSpec,
+    *,
+    token: str,
+    jobs: Optional[int] = None,
+    stats: Optional[TransferStats] = None,
+    depth: Optional[int] = None,
+    since: Optional[str] = None,
+    unshallow: bool = False,
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Update remote-tracking refs and download every object they reach that is
+    missing locally. Pass `stats` to receive transfer counters.
 
-        raw = client.get_object_bytes(oid)
-        if _sha256_payload(raw) != oid:
-            raise RuntimeError(f"Remote sent bad object: {oid}")
+    depth / since limit how much new history is downloaded; the cut-off
+    commits are recorded in .gait/shallow. unshallow downloads the history
+    behind every recorded boundary. An interrupted full fetch resumes from
+    .gait/fetch-journal on the next run.
+    """
+    if depth is not None and depth < 1:
+        raise ValueError("depth must be >= 1")
+    if unshallow and (depth or since):
+        raise ValueError("--unshallow cannot be combined with --depth/--since")
+    since = _normalize_since(since) if since else None
 
-        canon = _canonical_payload_bytes(raw)
-        _store_local_object_bytes(repo, oid, canon)
-        have.add(oid)
+    client = RemoteClient(spec, token=token)
+    refs = _remote_refs(repo, client)
 
-        try:
-            obj = json.loads(canon.decode("utf-8"))
-        except Exception:
-            continue
-        _enqueue_deps(obj, q)
+    heads: Dict[str, str] = dict(refs.get("heads") or {})
+    mems: Dict[str, str] = dict(refs.get("memory") or {})
 
+    # nothing moved since the last complete fetch (the usual case when /refs
+    # came back 304) and there is no interrupted transfer to finish
+    if not (unshallow or depth or since) and _tracking_refs_match(repo, spec, heads, mems):
+        return heads, mems
+
+    # local branch tips (incl. remote-tracking refs from the last fetch) bound
+    # the server's walk in fetch-pack. Tracking refs are only moved once
+    # everything they reach is local, so each tip stands for complete history.
+    tips: List[str] = []
+    if repo.refs_dir.exists():
+        for p in repo.refs_dir.rglob("*"):
+            if p.is_file():
+                tips.append(p.read_text(encoding="utf-8").strip())
+
+    have = _LocalHave(repo)
+    roots = [oid for oid in list(heads.values()) + list(mems.values()) if oid]
+    stats = stats if stats is not None else TransferStats()
+
+    # a partial clone keeps leaving turn bodies on its promisor remote
+    promisor = repo.promisor()
+    omit_turns = promisor is not None and promisor.get("remote") == spec.name
+
+    # depth/since walks keep per-commit state a journal cannot replay; only
+    # full (and partial-clone) fetches are resumable
+    limited = bool(depth or since)
+    journal = None if limited else _FetchJournal(
+        repo,
+        {"remote": spec.name, "url": client.base(), "omit_turns": omit_turns},
+        have,
+        turns=not omit_turns,
+    )
+
+    shallow = repo.read_shallow()
+    wants = [oid for oid in dict.fromkeys(roots) if oid not in have]
+    if journal is not None:
+        wants.extend(journal.frontier())
+    if unshallow:
+        for cid in shallow:
+            wants.extend(p for p in (repo.get_commit(cid).get("parents") or []) if p and p not in have)
+    wants = list(dict.fromkeys(wants))
+    if not wants:
+        if journal is not None:
+            journal.finish()
+        if unshallow and shallow:
+            repo.write_shallow(())
+            repo.commit_graph.invalidate()
+        _write_tracking_refs(repo, spec, heads, mems)
+        return heads, mems
+
+    # the server stops at history reachable from haves; when unshallowing that
+    # history is exactly what we lack, so send none
+    haves = [] if unshallow else [oid for oid in dict.fromkeys(tips) if oid in have]
+
+    received: Dict[str, List[str]] = {}
+    if journal is not None:
+        journal.begin()
+    try:
+        if _download_pack(
+            repo, client, wants, haves,
+            have=have, stats=stats, depth=depth, since=since,
+            parents_out=received if limited else None,
+            omit_turns=omit_turns, journal=journal,
+        ):
+            boundary = {cid for cid, ps in received.items() if any(p not in have for p in ps)}
+        else:
+            boundary = _download_closure(
+                repo, client, wants,
+                have=have, jobs=jobs or transfer_jobs_from_env(), stats=stats,
+                depth=depth, since=since, omit_turns=omit_turns, journal=journal,
+            )
+    finally:
+        if journal is not None:
+            journal.close()
+    if journal is not None:
+        journal.finish()
+
+    # boundaries whose parents have now arrived are complete again
+    candidates = shallow | boundary
+    completed = {cid for cid in candidates if all(p in have for p in (repo.get_commit(cid).get("parents") or []) if p)}
+    if candidates != shallow or completed:
+        repo.write_shallow(candidates - completed)
+    if completed & shallow:
+        # the graph recorded those parents as missing
+        repo.commit_graph.invalidate()
+
+    _write_tracking_refs(repo, spec, heads, mems)
     return heads, mems
 
-def pull(repo: GaitRepo, spec: RemoteSpec, *, token: str, branch: Optional[str] = None, with_memory: bool = False) -> str:
+def pull(
+    repo: GaitRepo,
+    spec: RemoteSpec,
+    *,
+    token: str,
+    branch: Optional[str] = None,
+    with_memory: bool = False,
+    jobs: Optional[int] = None,
+    stats: Optional[TransferStats] = None,
+) -> str:
     branch = branch or repo.current_branch()
 
-    heads, mems = fetch(repo, spec, token=token)
+    heads, mems = fetch(repo, spec, token=token, jobs=jobs, stats=stats)
 
     remote_tracking = f"remotes/{spec.name}/{branch}"
     remote_head = repo.read_ref(remote_tracking).strip()
@@ -343,14 +1198,33 @@ def create_repo(spec: RemoteSpec, *, token: str) -> None:
     _http_json("POST", f"{_repo_base(spec.base_url, spec.owner, spec.repo)}", token=token, payload={})
 
 
-def clone_into(dest: Path, spec: RemoteSpec, *, token: str, branch: str = "main") -> None:
+def clone_into(
+    dest: Path,
+    spec: RemoteSpec,
+    *,
+    token: str,
+    branch: str = "main",
+    jobs: Optional[int] = None,
+    stats: Optional[TransferStats] = None,
+    depth: Optional[int] = None,
+    since: Optional[str] = None,
+    partial: bool = False,
+) -> None:
+    """
+    partial=True fetches commits, memory manifests and refs only; turn bodies
+    are downloaded from the remote on first use (see fetch_promised).
+    """
     dest.mkdir(parents=True, exist_ok=True)
     repo = GaitRepo(root=dest)
     repo.init()
 
     remote_add(repo, spec.name, spec.base_url)
+    if partial:
+        cfg = repo.read_config()
+        cfg["promisor"] = {"remote": spec.name, "owner": spec.owner, "repo": spec.repo}
+        repo.write_config(cfg)
 
-    heads, mems = fetch(repo, spec, token=token)
+    heads, mems = fetch(repo, spec, token=token, jobs=jobs, stats=stats, depth=depth, since=since)
 
     head = heads.get(branch, "") or ""
     mem = mems.get(branch, "") or ""
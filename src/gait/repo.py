@@ -1,20 +1,66 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple, List
+from typing import Any, Dict, Iterable, Optional, Set, Tuple, List
 import json
-
-from .objects import store_object, load_object
+import os
+import threading
+import time
+
+from .objects import (
+    DEFAULT_COMPRESSION_LEVEL,
+    canonical_json_bytes, sha256_hex, object_id, encode_packed,
+    has_object, store_object, repack_objects, read_object_bytes, resolve_prefix,
+)
+from .pack import PackWriter
+from .commitgraph import CommitGraph
+from .turnindex import TurnIndex
+from .respcache import ResponseCache, response_cache_from_env
+from .tokenindex import TokenIndex
+from .tokens import DEFAULT_ENCODING, count_tokens_batch
+from .cache import LRUCache, object_cache_from_env
 from .schema import Turn, Commit
 from .memory import MemoryManifest, MemoryItem, now_iso
 
 GAIT_DIR = ".gait"
+_TOKEN_CHUNK = 256  # turns read and encoded per batch in turn_token_counts
+
+
+def check_ref_name(name: str) -> str:
+    """
+    Validate a branch name used as a path under refs/ ("main", "remotes/origin/main").
+    Raises ValueError for empty, "." or ".." components, a leading "/",
+    backslashes or NUL, so a name from a remote or a bundle cannot leave refs/.
+    """
+    if not isinstance(name, str) or not name:
+        raise ValueError("Empty ref name")
+    if name.startswith("/") or "\\" in name or "\x00" in name:
+        raise ValueError(f"Bad ref name: {name!r}")
+    if any(part in ("", ".", "..") for part in name.split("/")):
+        raise ValueError(f"Bad ref name: {name!r}")
+    return name
+
+
+def ref_file(base: Path, name: str) -> Path:
+    """
+    base/name for a valid ref name, refusing anything that resolves outside base.
+    """
+    path = base / check_ref_name(name)
+    if not path.resolve().is_relative_to(base.resolve()):
+        raise ValueError(f"Ref {name!r} resolves outside {base}")
+    return path
 
 
 @dataclass
 class GaitRepo:
     root: Path
+    _graph: Optional[CommitGraph] = field(default=None, init=False, repr=False, compare=False)
+    _storage: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    _turn_index: Optional[TurnIndex] = field(default=None, init=False, repr=False, compare=False)
+    _response_cache: Optional[ResponseCache] = field(default=None, init=False, repr=False, compare=False)
+    _token_index: Optional[TokenIndex] = field(default=None, init=False, repr=False, compare=False)
+    object_cache: LRUCache[bytes] = field(default_factory=object_cache_from_env, init=False, repr=False, compare=False)
 
     # ----------------------------
     # Paths
@@ -48,6 +94,38 @@ class GaitRepo:
     def memory_log(self) -> Path:
         return self.gait_dir / "memory.jsonl"
 
+    @property
+    def shallow_file(self) -> Path:
+        return self.gait_dir / "shallow"
+
+    @property
+    def config_file(self) -> Path:
+        return self.gait_dir / "config.json"
+
+    @property
+    def commit_graph(self) -> CommitGraph:
+        if self._graph is None:
+            self._graph = CommitGraph(self.objects_dir)
+        return self._graph
+
+    @property
+    def turn_index(self) -> TurnIndex:
+        if self._turn_index is None:
+            self._turn_index = TurnIndex(self.gait_dir, self.turns_log)
+        return self._turn_index
+
+    @property
+    def token_index(self) -> TokenIndex:
+        if self._token_index is None:
+            self._token_index = TokenIndex(self.gait_dir)
+        return self._token_index
+
+    @property
+    def response_cache(self) -> ResponseCache:
+        if self._response_cache is None:
+            self._response_cache = response_cache_from_env(self.gait_dir)
+        return self._response_cache
+
     # ----------------------------
     # Setup / discover
     # ----------------------------
@@ -63,12 +141,16 @@ class GaitRepo:
                 return GaitRepo(root=p)
         raise FileNotFoundError("No .gait directory found (run `gait init`).")
 
-    def init(self) -> None:
+    def init(self, *, compression: Optional[str] = None) -> None:
         self.gait_dir.mkdir(parents=True, exist_ok=True)
         self.objects_dir.mkdir(parents=True, exist_ok=True)
         self.refs_dir.mkdir(parents=True, exist_ok=True)
         self.memory_refs_dir.mkdir(parents=True, exist_ok=True)
 
+        # object encoding (config.json core.compression)
+        if compression is not None:
+            self.set_compression(compression)
+
         # default branch
         main_ref = self.refs_dir / "main"
         if not main_ref.exists():
@@ -90,9 +172,70 @@ class GaitRepo:
         main_mem_ref = self.memory_refs_dir / "main"
         if not main_mem_ref.exists():
             empty = MemoryManifest.empty()
-            mem_id = store_object(self.objects_dir, empty.to_dict())
+            mem_id = self._store(empty.to_dict())
             main_mem_ref.write_text(mem_id + "\n", encoding="utf-8")
 
+    # ----------------------------
+    # Config (.gait/config.json)
+    # ----------------------------
+
+    def read_config(self) -> Dict[str, Any]:
+        p = self.config_file
+        if not p.exists():
+            return {"schema": "gait.config.v0", "remotes": {}}
+        return json.loads(p.read_text(encoding="utf-8"))
+
+    def write_config(self, cfg: Dict[str, Any]) -> None:
+        self.config_file.write_text(json.dumps(cfg, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        self._storage = None
+
+    def read_shallow(self) -> Set[str]:
+        """
+        Commits whose parents were not fetched (shallow clone/fetch boundary).
+        """
+        try:
+            text = self.shallow_file.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return set()
+        return {line.strip() for line in text.splitlines() if line.strip()}
+
+    def write_shallow(self, commit_ids: Iterable[str]) -> None:
+        ids = sorted(set(commit_ids))
+        if not ids:
+            self.shallow_file.unlink(missing_ok=True)
+            return
+        self.shallow_file.write_text("".join(f"{c}\n" for c in ids), encoding="utf-8")
+
+    def is_shallow(self) -> bool:
+        return self.shallow_file.exists()
+
+    def storage_options(self) -> Dict[str, Any]:
+        """
+        Object encoding from config "core": {"compression": "zlib"|"none", "compression_level": N}.
+        Returned as store_object() keyword arguments.
+        """
+        if self._storage is None:
+            core = self.read_config().get("core") or {}
+            algo = str(core.get("compression") or "none").strip().lower()
+            if algo not in ("none", "zlib"):
+                raise ValueError(f"Unsupported core.compression in config.json: {algo!r}")
+            self._storage = {
+                "compress": algo == "zlib",
+                "level": int(core.get("compression_level", DEFAULT_COMPRESSION_LEVEL)),
+            }
+        return dict(self._storage)
+
+    def set_compression(self, algo: str, level: Optional[int] = None) -> None:
+        cfg = self.read_config()
+        core = cfg.setdefault("core", {})
+        core["compression"] = algo
+        if level is not None:
+            core["compression_level"] = int(level)
+        self.write_config(cfg)
+
+    def _store(self, obj: Dict[str, Any]) -> str:
+        return store_object(self.objects_dir, obj, **self.storage_options())
+
     # ----------------------------
     # HEAD / refs
     # ----------------------------
@@ -108,15 +251,19 @@ class GaitRepo:
         return self.head_ref_path().name
 
     def read_ref(self, branch: str) -> str:
-        path = self.refs_dir / branch
+        path = self.refs_dir / check_ref_name(branch)
         if not path.exists():
             raise FileNotFoundError(f"Branch does not exist: {branch}")
         return path.read_text(encoding="utf-8").strip()
 
     def write_ref(self, branch: str, commit_id: str) -> None:
-        path = self.refs_dir / branch
+        path = ref_file(self.refs_dir, branch)
         path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(commit_id + "\n", encoding="utf-8")
+        # replace, don't rewrite in place: readers never see an empty ref.
+        # The temp file lives outside refs/ so branch listings skip it.
+        tmp = self.gait_dir / f".ref.tmp-{os.getpid()}-{threading.get_ident()}"
+        tmp.write_text(commit_id + "\n", encoding="utf-8")
+        os.replace(tmp, path)
 
     def head_commit_id(self) -> str:
         return self.read_ref(self.current_branch())
@@ -127,20 +274,20 @@ class GaitRepo:
 
     def memory_ref_path(self, branch: Optional[str] = None) -> Path:
         b = branch or self.current_branch()
-        return self.memory_refs_dir / b
+        return self.memory_refs_dir / check_ref_name(b)
 
     def read_memory_ref(self, branch: Optional[str] = None) -> str:
         path = self.memory_ref_path(branch)
         if not path.exists():
             empty = MemoryManifest.empty()
-            mem_id = store_object(self.objects_dir, empty.to_dict())
+            mem_id = self._store(empty.to_dict())
             path.parent.mkdir(parents=True, exist_ok=True)
             path.write_text(mem_id + "\n", encoding="utf-8")
             return mem_id
         return path.read_text(encoding="utf-8").strip()
 
     def write_memory_ref(self, mem_id: str, branch: Optional[str] = None) -> None:
-        path = self.memory_ref_path(branch)
+        path = ref_file(self.memory_refs_dir, branch or self.current_branch())
         path.parent.mkdir(parents=True, exist_ok=True)
         path.write_text(mem_id + "\n", encoding="utf-8")
 
@@ -173,17 +320,18 @@ class GaitRepo:
 
     def get_memory(self, branch: Optional[str] = None) -> MemoryManifest:
         mem_id = self.read_memory_ref(branch)
-        obj = load_object(self.objects_dir, mem_id)
+        obj = self.get_object(mem_id)
         return MemoryManifest.from_dict(obj)
 
     def set_memory(self, manifest: MemoryManifest, branch: Optional[str] = None) -> str:
-        mem_id = store_object(self.objects_dir, manifest.to_dict())
+        mem_id = self._store(manifest.to_dict())
         self.write_memory_ref(mem_id, branch)
         return mem_id
 
     def build_context_bundle(self, *, full: bool = False) -> Dict[str, Any]:
         branch = self.current_branch()
         manifest = self.get_memory(branch)
+        self.prefetch(it.turn_id for it in manifest.items)
 
         items = []
         for idx, it in enumerate(manifest.items, start=1):
@@ -227,21 +375,31 @@ class GaitRepo:
         if not cid:
             return []
     
-        turns_newest_first: List[Dict[str, Any]] = []
+        turn_ids_newest_first: List[str] = []
         seen_commits = set()
+        shallow = self.read_shallow()
     
-        while cid and cid not in seen_commits and len(turns_newest_first) < limit_turns:
+        while cid and cid not in seen_commits and len(turn_ids_newest_first) < limit_turns:
             seen_commits.add(cid)
-            c = self.get_commit(cid)
+            try:
+                c = self.get_commit(cid)
+            except FileNotFoundError:
+                # truncated history (shallow clone): stop at what we have
+                if len(seen_commits) == 1:
+                    raise
+                break
     
             for tid in (c.get("turn_ids") or []):
-                turns_newest_first.append(self.get_turn(tid))
-                if len(turns_newest_first) >= limit_turns:
+                turn_ids_newest_first.append(tid)
+                if len(turn_ids_newest_first) >= limit_turns:
                     break
                 
             parents = c.get("parents") or []
-            cid = parents[0] if parents else ""
+            cid = parents[0] if parents and cid not in shallow else ""
     
+        # partial clone: fetch the turn bodies we are about to read in one request
+        self.prefetch(turn_ids_newest_first)
+        turns_newest_first = [self.get_turn(tid) for tid in turn_ids_newest_first]
         turns_newest_first.reverse()
         return turns_newest_first
 
@@ -259,16 +417,10 @@ class GaitRepo:
         if not cid:
             return []
 
-        out: List[str] = []
-        seen = set()
-
-        while cid and cid not in seen and len(out) < limit_commits:
-            seen.add(cid)
-            out.append(cid)
-            c = self.get_commit(cid)
-            parents = c.get("parents") or []
-            cid = parents[0] if parents else ""
-
+        cid = resolve_prefix(self.objects_dir, cid)
+        out = self.commit_graph.first_parent_ids(cid, limit_commits)
+        if not out:
+            raise FileNotFoundError(f"Object not found: {cid}")
         return out
 
     def _make_backup_ref(self, *, branch: str, head_commit: str, reason: str) -> str:
@@ -316,7 +468,7 @@ class GaitRepo:
         # Walk history newest->oldest
         commit_ids = self.iter_commit_ids_from_head_first_parent(start_commit=old_head, limit_commits=500)
 
-        # Pick commits that actually contain turns
+        # Pick commits that actually contain turns (re-read below via the object cache)
         picked: List[str] = []
         for cid in commit_ids:
             c = self.get_commit(cid)
@@ -398,7 +550,7 @@ class GaitRepo:
             visibility="private",
         )
 
-        summary_turn_id = store_object(self.objects_dir, summary_turn.to_dict())
+        summary_turn_id = self._store(summary_turn.to_dict())
 
         # Create squash commit (parent = base_parent)
         parents: List[str] = [base_parent] if base_parent else []
@@ -420,7 +572,9 @@ class GaitRepo:
             message=message or f"squash last {len(picked)} turn-commit(s)",
             meta=squash_meta,
         )
-        squash_commit_id = store_object(self.objects_dir, squash_commit.to_dict())
+        squash_commit_dict = squash_commit.to_dict()
+        squash_commit_id = self._store(squash_commit_dict)
+        self.commit_graph.add(squash_commit_id, squash_commit_dict)
 
         # Backup ref (soft mode)
         backup_ref = ""
@@ -457,7 +611,7 @@ class GaitRepo:
         *,
         inherit_memory: bool = True,
     ) -> None:
-        path = self.refs_dir / name
+        path = ref_file(self.refs_dir, name)
         if path.exists():
             raise FileExistsError(f"Branch already exists: {name}")
 
@@ -473,7 +627,7 @@ class GaitRepo:
             self.read_memory_ref(name)
 
     def checkout(self, name: str) -> None:
-        path = self.refs_dir / name
+        path = self.refs_dir / check_ref_name(name)
         if not path.exists():
             raise FileNotFoundError(f"Branch does not exist: {name}")
         self.head_file.write_text(f"ref: refs/heads/{name}\n", encoding="utf-8")
@@ -498,7 +652,7 @@ class GaitRepo:
         if name == "main" and not force:
             raise ValueError("Refusing to delete 'main' without force=True")
 
-        head_ref = self.refs_dir / name
+        head_ref = self.refs_dir / check_ref_name(name)
         if not head_ref.exists():
             raise FileNotFoundError(f"Branch does not exist: {name}")
 
@@ -563,21 +717,8 @@ class GaitRepo:
         from .objects import resolve_prefix
         anc = resolve_prefix(self.objects_dir, maybe_ancestor)
         cur = resolve_prefix(self.objects_dir, commit_id)
-
-        stack = [cur]
-        seen = set()
-        while stack:
-            cid = stack.pop()
-            if cid in seen:
-                continue
-            seen.add(cid)
-            if cid == anc:
-                return True
-            c = self.get_commit(cid)
-            for p in (c.get("parents") or []):
-                if p and p not in seen:
-                    stack.append(p)
-        return False
+        # commit-graph walk: no JSON parsing, pruned by generation number
+        return self.commit_graph.is_ancestor(anc, cur)
 
     def reset_memory_to_commit(self, branch: str, commit_id: str) -> str:
         """
@@ -704,23 +845,19 @@ class GaitRepo:
     def budget_for_memory(self, branch: Optional[str] = None) -> Dict[str, Any]:
         b = branch or self.current_branch()
         manifest = self.get_memory(b)
+        counts = self.turn_token_counts(it.turn_id for it in manifest.items)
         total_in = 0
         total_out = 0
         unknown = 0
 
         for it in manifest.items:
-            t = self.get_turn(it.turn_id)
-            tokens = t.get("tokens") or {}
-            in_t = tokens.get("input_total")
-            out_t = tokens.get("output_total")
-            if isinstance(in_t, int):
-                total_in += in_t
-            else:
-                unknown += 1
-            if isinstance(out_t, int):
-                total_out += out_t
-            else:
-                unknown += 1
+            c = counts.get(it.turn_id)
+            if c is None:
+                # body not available (partial clone without its promisor)
+                unknown += 2
+                continue
+            total_in += c["input_total"]
+            total_out += c["output_total"]
 
         return {
             "branch": b,
@@ -730,6 +867,102 @@ class GaitRepo:
             "unknown_token_fields": unknown,
         }
 
+    # ----------------------------
+    # Token counts (side index, see tokenindex.py)
+    # ----------------------------
+
+    def turn_token_counts(
+        self,
+        turn_ids: Iterable[str],
+        *,
+        encoding: str = DEFAULT_ENCODING,
+        threads: int = 0,
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        {turn_id: {"input_total", "output_total"}} from the token index.
+        Turns not indexed yet are counted in batches and added; counts the
+        turn recorded itself are reused when their encoding matches (none
+        recorded means DEFAULT_ENCODING). Turns whose body cannot be read
+        are left out.
+        """
+        ids = list(dict.fromkeys(turn_ids))
+        found = self.token_index.lookup(ids, encoding)
+        todo = [t for t in ids if t not in found]
+        for i in range(0, len(todo), _TOKEN_CHUNK):
+            found.update(self._count_turn_tokens(todo[i : i + _TOKEN_CHUNK], encoding, threads))
+        return {
+            t: {"input_total": found[t][0], "output_total": found[t][1]}
+            for t in ids if t in found
+        }
+
+    def _count_turn_tokens(self, turn_ids: List[str], encoding: str, threads: int) -> Dict[str, Tuple[int, int]]:
+        self.prefetch(turn_ids)
+        counts: Dict[str, Tuple[int, int]] = {}
+        pending: List[str] = []
+        texts: List[str] = []
+        for tid in turn_ids:
+            try:
+                t = self.get_turn(tid)
+            except FileNotFoundError:
+                continue
+            tokens = t.get("tokens") or {}
+            in_t, out_t = tokens.get("input_total"), tokens.get("output_total")
+            # turns recorded before the encoding was stored were counted with the default
+            recorded = tokens.get("encoding") or DEFAULT_ENCODING
+            if recorded == encoding and isinstance(in_t, int) and isinstance(out_t, int):
+                counts[tid] = (in_t, out_t)
+                continue
+            pending.append(tid)
+            texts.append((t.get("user") or {}).get("text", "") or "")
+            texts.append((t.get("assistant") or {}).get("text", "") or "")
+        if pending:
+            n = count_tokens_batch(texts, encoding=encoding, threads=threads)
+            for j, tid in enumerate(pending):
+                counts[tid] = (n[2 * j], n[2 * j + 1])
+        self.token_index.store(counts, encoding)
+        return counts
+
+    def _reachable_turn_ids(self) -> List[str]:
+        """
+        Turn ids of every commit reachable from any branch (remote-tracking
+        ones included), so cloned history is covered too.
+        """
+        stack = [
+            p.read_text(encoding="utf-8").strip()
+            for p in sorted(self.refs_dir.rglob("*")) if p.is_file()
+        ]
+        seen: Set[str] = set()
+        out: List[str] = []
+        while stack:
+            cid = stack.pop()
+            if not cid or cid in seen:
+                continue
+            seen.add(cid)
+            try:
+                c = self.get_commit(cid)
+            except FileNotFoundError:
+                continue  # shallow boundary
+            out.extend(c.get("turn_ids") or [])
+            stack.extend(c.get("parents") or [])
+        return out
+
+    def backfill_token_index(self, *, encoding: str = DEFAULT_ENCODING, threads: int = 0) -> Dict[str, int]:
+        """
+        Index token counts for every turn in turns.jsonl or reachable from a
+        branch.
+        """
+        ids = list(dict.fromkeys(self.turn_index.turn_ids() + self._reachable_turn_ids()))
+        todo = self.token_index.missing(ids, encoding)
+        counted = 0
+        for i in range(0, len(todo), _TOKEN_CHUNK):
+            counted += len(self._count_turn_tokens(todo[i : i + _TOKEN_CHUNK], encoding, threads))
+        return {
+            "turns": len(ids),
+            "already_indexed": len(ids) - len(todo),
+            "counted": counted,
+            "unavailable": len(todo) - counted,
+        }
+
     def rewind_memory_to_head(self, *, branch: Optional[str] = None, head_commit: str) -> tuple[str, str]:
         b = branch or self.current_branch()
         old_mem = self.read_memory_ref(b)
@@ -745,35 +978,146 @@ class GaitRepo:
         with self.turns_log.open("a", encoding="utf-8") as f:
             f.write(json.dumps(entry, ensure_ascii=False) + "\n")
 
-    def record_turn(
+    def turn_commit(
         self,
         turn: Turn,
         *,
+        branch: str,
+        parent: str,
         message: str = "",
         kind: str = "auto",
         meta: Optional[Dict[str, Any]] = None,
-    ) -> Tuple[str, str]:
-        turn_id = store_object(self.objects_dir, turn.to_dict())
-
-        branch = self.current_branch()
-        parent = self.head_commit_id()
-        parents: List[str] = [parent] if parent else []
-
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        The (turn, commit) objects record_turn would write on top of `parent`,
+        without touching disk.
+        """
+        turn_dict = turn.to_dict()
         commit = Commit.v0(
-            parents=parents,
-            turn_ids=[turn_id],
+            parents=[parent] if parent else [],
+            turn_ids=[object_id(turn_dict)],
             branch=branch,
             snapshot_id=None,
             kind=kind,
             message=message,
             meta=meta or {},
         )
-        commit_id = store_object(self.objects_dir, commit.to_dict())
+        return turn_dict, commit.to_dict()
+
+    def write_turn(self, branch: str, turn_dict: Dict[str, Any], commit_dict: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Persist a turn_commit() pair: objects first, then the ref, then
+        turns.jsonl, so a crash part-way never leaves a ref to a missing object.
+        """
+        turn_id = self._store(turn_dict)
+        commit_id = self._store(commit_dict)
+        self.commit_graph.add(commit_id, commit_dict)
 
         self.write_ref(branch, commit_id)
         self.append_turn_log(turn_id, commit_id)
         return turn_id, commit_id
 
+    def record_turn(
+        self,
+        turn: Turn,
+        *,
+        message: str = "",
+        kind: str = "auto",
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, str]:
+        branch = self.current_branch()
+        turn_dict, commit_dict = self.turn_commit(
+            turn, branch=branch, parent=self.head_commit_id(), message=message, kind=kind, meta=meta
+        )
+        return self.write_turn(branch, turn_dict, commit_dict)
+
+    def record_turns(
+        self,
+        turns: Iterable[Turn],
+        *,
+        message: str = "",
+        kind: str = "import",
+        meta: Optional[Dict[str, Any]] = None,
+        branch: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Bulk version of record_turn: one commit per turn, chained in order on `branch`
+        (default: current). Objects are streamed straight into a new pack; the commit
+        graph, branch ref and turns.jsonl are each updated once at the end, so an
+        interrupted import leaves the repo untouched.
+        """
+        t0 = time.perf_counter()
+        branch = branch or self.current_branch()
+        old_head = self.read_ref(branch)
+        opts = self.storage_options()
+        commit_meta = meta or {}
+
+        # every imported commit differs only in parents/turn_ids/created_at
+        template = Commit.v0(
+            parents=[],
+            turn_ids=[],
+            branch=branch,
+            snapshot_id=None,
+            kind=kind,
+            message=message,
+            meta=commit_meta,
+        ).to_dict()
+
+        parent = old_head
+        log_lines: List[str] = []
+        graph: List[Tuple[str, Dict[str, Any]]] = []
+
+        w = PackWriter(self.objects_dir)
+        try:
+            for turn in turns:
+                td = turn.to_dict()
+                tcanon = canonical_json_bytes(td)
+                turn_id = sha256_hex(tcanon)
+                w.add(turn_id, encode_packed(tcanon, **opts))
+
+                parents: List[str] = [parent] if parent else []
+                commit = dict(template)
+                commit["parents"] = parents
+                commit["turn_ids"] = [turn_id]
+                commit["created_at"] = td["created_at"]
+                ccanon = canonical_json_bytes(commit)
+                commit_id = sha256_hex(ccanon)
+                w.add(commit_id, encode_packed(ccanon, **opts))
+
+                graph.append((commit_id, {"parents": parents, "created_at": td["created_at"]}))
+                # same line append_turn_log writes (oids are plain hex, no escaping needed)
+                log_lines.append(f'{{"turn_id": "{turn_id}", "commit_id": "{commit_id}"}}\n')
+                parent = commit_id
+        except BaseException:
+            w.abort()
+            raise
+
+        if not log_lines:
+            w.abort()
+            return {"turns": 0, "branch": branch, "old_head": old_head, "new_head": old_head,
+                    "pack": "", "seconds": time.perf_counter() - t0, "turns_per_sec": 0.0}
+
+        pack_path = w.commit()
+
+        if self.read_ref(branch) != old_head:
+            raise RuntimeError(f"Branch {branch} moved during import; objects are packed but the ref was not updated.")
+
+        self.commit_graph.extend(graph)
+        self.write_ref(branch, parent)
+        with self.turns_log.open("a", encoding="utf-8") as f:
+            f.write("".join(log_lines))
+
+        secs = time.perf_counter() - t0
+        return {
+            "turns": len(log_lines),
+            "branch": branch,
+            "old_head": old_head,
+            "new_head": parent,
+            "pack": pack_path.name if pack_path is not None else "",
+            "seconds": secs,
+            "turns_per_sec": len(log_lines) / secs if secs > 0 else 0.0,
+        }
+
     def merge(self, source_branch: str, *, message: str = "", with_memory: bool = False) -> str:
         target_branch = self.current_branch()
         target_head = self.read_ref(target_branch)
@@ -867,7 +1211,9 @@ class GaitRepo:
             message=message or f"merge {source_branch} -> {target_branch}",
             meta=merge_meta,
         )
-        merge_commit_id = store_object(self.objects_dir, commit.to_dict())
+        commit_dict = commit.to_dict()
+        merge_commit_id = self._store(commit_dict)
+        self.commit_graph.add(merge_commit_id, commit_dict)
         self.write_ref(target_branch, merge_commit_id)
         return merge_commit_id
 
@@ -876,9 +1222,71 @@ class GaitRepo:
     # Read helpers
     # ----------------------------
 
+    def get_object(self, oid: str) -> Dict[str, Any]:
+        """
+        Decoded object by oid or prefix. The per-repo LRU cache keeps the
+        canonical bytes (no file read, pack lookup or decompression on a hit);
+        each call decodes its own copy, so callers may edit what they get.
+        """
+        full = resolve_prefix(self.objects_dir, oid)
+        raw = self.object_cache.get(full)
+        if raw is None:
+            try:
+                raw = read_object_bytes(self.objects_dir, full)
+            except FileNotFoundError:
+                # partial clone: the promisor remote has it
+                if not self.prefetch([full]):
+                    raise
+                raw = read_object_bytes(self.objects_dir, full)
+            self.object_cache.put(full, raw, len(raw))
+        return json.loads(raw)
+
     def get_commit(self, commit_id: str) -> Dict[str, Any]:
-        return load_object(self.objects_dir, commit_id)
+        return self.get_object(commit_id)
 
     def get_turn(self, turn_id: str) -> Dict[str, Any]:
-        return load_object(self.objects_dir, turn_id)
+        return self.get_object(turn_id)
+
+    def promisor(self) -> Optional[Dict[str, Any]]:
+        """
+        {"remote", "owner", "repo"} for a partial clone, else None.
+        """
+        p = self.read_config().get("promisor")
+        return p if isinstance(p, dict) and p.get("remote") else None
+
+    def prefetch(self, oids: Iterable[str]) -> int:
+        """
+        Download objects that are missing locally from the promisor remote in
+        one batch. Returns how many were fetched (0 when not a partial clone).
+        """
+        missing = [o for o in dict.fromkeys(oids) if len(o) == 64 and not has_object(self.objects_dir, o)]
+        if not missing or self.promisor() is None:
+            return 0
+        from .remote import fetch_promised  # remote imports this module
+        return fetch_promised(self, missing)
+
+    def commits_for_turn(self, turn_id: str) -> List[str]:
+        """
+        Commits that introduced `turn_id` (oid or prefix), oldest first, from the
+        indexed turns.jsonl. Only covers turns recorded in this repo.
+        """
+        return self.turn_index.commits_for_turn(resolve_prefix(self.objects_dir, turn_id))
+
+    def turns_for_commit(self, commit_id: str) -> List[str]:
+        return self.turn_index.turns_for_commit(resolve_prefix(self.objects_dir, commit_id))
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.object_cache.stats()
+
+    # ----------------------------
+    # Maintenance
+    # ----------------------------
+
+    def repack(self, *, prune_loose: bool = True) -> Dict[str, Any]:
+        """
+        Consolidate loose objects and existing packs into one pack under
+        .gait/objects/pack/. Loose objects written later stay readable alongside it.
+        Entries use the configured object encoding (core.compression).
+        """
+        return repack_objects(self.objects_dir, prune_loose=prune_loose, **self.storage_options())
 
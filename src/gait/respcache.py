@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .objects import canonical_json_bytes
+
+# ---------------------------------------------------------------------
+# LLM response cache: .gait/llm-cache.db (SQLite), opt-in
+#
+#   responses(key, provider, model, text, bytes, created, used, hits)
+#
+# key = sha256 of the canonical JSON of
+#   {provider, endpoint, model, temperature, max_tokens, messages}
+# so replaying the same message list against the same model returns the
+# stored reply without an HTTP request. The total size of stored replies
+# is bounded; least recently used entries are evicted first.
+# ---------------------------------------------------------------------
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key      TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    model    TEXT NOT NULL,
+    text     TEXT NOT NULL,
+    bytes    INTEGER NOT NULL,
+    created  REAL NOT NULL,
+    used     REAL NOT NULL,
+    hits     INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_by_used ON responses (used);
+"""
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def cache_path(gait_dir: Path) -> Path:
+    return gait_dir / "llm-cache.db"
+
+
+def response_key(
+    provider: str,
+    model: str,
+    messages: List[Dict[str, Any]],
+    *,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    endpoint: str = "",
+) -> str:
+    """
+    Stable cache key for one chat request.
+    """
+    req = {
+        "provider": provider,
+        "endpoint": endpoint,
+        "model": model,
+        "temperature": None if temperature is None else float(temperature),
+        "max_tokens": None if max_tokens is None else int(max_tokens),
+        "messages": [{"role": m.get("role", ""), "content": m.get("content", "")} for m in messages],
+    }
+    return hashlib.sha256(canonical_json_bytes(req)).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, gait_dir: Path, *, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.path = cache_path(gait_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT text FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with db:
+                db.execute("UPDATE responses SET used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, text: str, *, provider: str = "", model: str = "") -> None:
+        size = len(text.encode("utf-8"))
+        if not text or size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO responses (key, provider, model, text, bytes, created, used, hits) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                    (key, provider, model, text, size, now, now),
+                )
+                self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        total = db.execute("SELECT COALESCE(SUM(bytes), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed: List[str] = []
+        for key, size in db.execute("SELECT key, bytes FROM responses ORDER BY used"):
+            if total <= self.max_bytes:
+                break
+            doomed.append(key)
+            total -= size
+        db.executemany("DELETE FROM responses WHERE key = ?", [(k,) for k in doomed])
+        self.evictions += len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._db().execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM responses"
+            ).fetchone()
+            total = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+
+def response_cache_enabled_from_env() -> bool:
+    """
+    GAIT_LLM_CACHE=1 turns the cache on without passing --cache.
+    """
+    return os.environ.get("GAIT_LLM_CACHE", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def response_cache_from_env(gait_dir: Path) -> ResponseCache:
+    """
+    GAIT_LLM_CACHE_MB overrides the size bound (default 64).
+    """
+    mb = os.environ.get("GAIT_LLM_CACHE_MB", "").strip()
+    return ResponseCache(
+        gait_dir,
+        max_bytes=int(float(mb) * 1024 * 1024) if mb else DEFAULT_MAX_BYTES,
+    )
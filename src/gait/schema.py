@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Union
 import time
 
@@ -19,9 +19,19 @@ class Tokens:
     output_total: Optional[int] = None
     estimated: bool = True
     by_role: Dict[str, int] = field(default_factory=dict)
+    encoding: Optional[str] = None  # tiktoken encoding the totals were counted with
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        d: Dict[str, Any] = {
+            "input_total": self.input_total,
+            "output_total": self.output_total,
+            "estimated": self.estimated,
+            "by_role": dict(self.by_role),
+        }
+        # only when known, so turns without it keep their old shape (and ids)
+        if self.encoding:
+            d["encoding"] = self.encoding
+        return d
 
 
 # ----------------------------
@@ -50,6 +60,7 @@ class Turn:
         model: Optional[Dict[str, Any]] = None,
         tokens: Optional[Union[Tokens, Dict[str, Any]]] = None,
         visibility: str = "private",
+        created_at: Optional[str] = None,
     ) -> "Turn":
 
         # normalize tokens input
@@ -63,13 +74,14 @@ class Turn:
                 output_total=tokens.get("output_total"),
                 estimated=bool(tokens.get("estimated", True)),
                 by_role=dict(tokens.get("by_role") or {}),
+                encoding=tokens.get("encoding") or None,
             )
         else:
             raise TypeError(f"tokens must be Tokens | dict | None, got {type(tokens)}")
 
         return Turn(
             schema="gait.turn.v0",
-            created_at=now_iso(),
+            created_at=created_at or now_iso(),
             user={"type": "message", "text": user_text},
             assistant={"type": "message", "text": assistant_text},
             context=context or {},
@@ -80,7 +92,17 @@ class Turn:
         )
 
     def to_dict(self) -> Dict[str, Any]:
-        d = asdict(self)
+        # built by hand rather than asdict(): same shape, no recursive deep copy
+        d: Dict[str, Any] = {
+            "schema": self.schema,
+            "created_at": self.created_at,
+            "user": dict(self.user),
+            "assistant": dict(self.assistant),
+            "context": dict(self.context),
+            "tools": dict(self.tools),
+            "model": dict(self.model),
+            "visibility": self.visibility,
+        }
 
         # robust tokens serialization
         if isinstance(self.tokens, Tokens):
@@ -119,10 +141,11 @@ class Commit:
         kind: str = "auto",
         message: str = "",
         meta: Optional[Dict[str, Any]] = None,
+        created_at: Optional[str] = None,
     ) -> "Commit":
         return Commit(
             schema="gait.commit.v0",
-            created_at=now_iso(),
+            created_at=created_at or now_iso(),
             parents=parents,
             turn_ids=turn_ids,
             snapshot_id=snapshot_id,
@@ -133,4 +156,14 @@ class Commit:
         )
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            "schema": self.schema,
+            "created_at": self.created_at,
+            "parents": list(self.parents),
+            "turn_ids": list(self.turn_ids),
+            "snapshot_id": self.snapshot_id,
+            "branch": self.branch,
+            "kind": self.kind,
+            "message": self.message,
+            "meta": dict(self.meta),
+        }
@@ -0,0 +1,476 @@
+from __future__ import annotations
+
+import hashlib
+import ipaddress
+import json
+import re
+import threading
+import zlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .repo import GaitRepo, ref_file
+from .objects import decode_payload, encode_packed, has_object, read_object_bytes, store_object_bytes
+from .pack import PackWriter
+from .remote import _enqueue_deps
+from . import wire
+
+# ---------------------------------------------------------------------
+# Local gaithubd-compatible server (`gait serve`)
+#
+# Serves the endpoints RemoteClient uses, for repos stored as ordinary
+# GaitRepos under <root>/<owner>/<repo>:
+#
+#   POST /repos/<owner>/<repo>                      create
+#   GET  /repos/<owner>/<repo>/refs                 {"heads": {...}, "memory": {...}}, ETag
+#   PUT  /repos/<owner>/<repo>/refs/heads/<branch>  {"oid": ...}, If-Match: <old oid>
+#   PUT  /repos/<owner>/<repo>/refs/memory/<branch>
+#   POST /repos/<owner>/<repo>/objects/missing      {"oids": [...]} -> {"missing": [...]}
+#   GET  /repos/<owner>/<repo>/objects/<oid>
+#   PUT  /repos/<owner>/<repo>/objects/<oid>
+#   POST /repos/<owner>/<repo>/objects/pack         wire.py stream -> {"stored": n}
+#   POST /repos/<owner>/<repo>/objects/fetch-pack   see wire.py
+#
+# Meant for local use and benchmarks: with a token set, requests that
+# write must carry it as a Bearer token; reads are open. Without a token,
+# writes are only accepted when bound to a loopback address.
+# ---------------------------------------------------------------------
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+
+_NAME = r"[A-Za-z0-9][A-Za-z0-9._-]*"
+_ROUTE = re.compile(rf"^/repos/({_NAME})/({_NAME})(/.*)?$")
+_OID = re.compile(r"^[0-9a-f]{64}$")
+_OBJECT = re.compile(r"^/objects/([0-9a-f]{64})$")
+_REF = re.compile(r"^/refs/(heads|memory)/(.+)$")
+
+_CHUNK = 256 * 1024
+
+
+class _Served:
+    """
+    One repo being served; `lock` guards ref updates and the commit graph.
+    """
+
+    def __init__(self, repo: GaitRepo) -> None:
+        self.repo = repo
+        self.lock = threading.Lock()
+
+
+class GaitServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], root: Path, *, token: str = "", batch: bool = True) -> None:
+        super().__init__(address, _Handler)
+        self.root = Path(root)
+        self.token = token
+        # no token on a non-loopback address: serve reads only
+        self.read_only = not token and not is_loopback(address[0])
+        # batch=False hides the pack endpoints, like an older gaithubd
+        self.batch = batch
+        self._repos: Dict[Tuple[str, str], _Served] = {}
+        self._repos_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def served(self, owner: str, name: str, *, create: bool = False) -> Optional[_Served]:
+        key = (owner, name)
+        with self._repos_lock:
+            s = self._repos.get(key)
+            if s is not None:
+                return s
+            repo = GaitRepo(root=self.root / owner / name)
+            if not repo.gait_dir.exists():
+                if not create:
+                    return None
+                repo.root.mkdir(parents=True, exist_ok=True)
+                repo.init()
+            s = self._repos[key] = _Served(repo)
+            return s
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _list_refs(base: Path) -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    if base.exists():
+        for p in sorted(base.rglob("*")):
+            if p.is_file():
+                oid = p.read_text(encoding="utf-8").strip()
+                if oid:
+                    out[p.relative_to(base).as_posix()] = oid
+    return out
+
+
+def iter_pack_objects(
+    served: _Served,
+    wants: List[str],
+    haves: List[str],
+    *,
+    depth: Optional[int] = None,
+    since: Optional[str] = None,
+    turns: bool = True,
+    closure: bool = True,
+) -> Iterator[Tuple[str, bytes]]:
+    """
+    The fetch-pack walk: everything reachable from `wants` but not from
+    `haves`, breadth first so depth counts the shortest path to a want.
+    """
+    repo = served.repo
+    if not closure:
+        for oid in dict.fromkeys(wants):
+            try:
+                yield oid, read_object_bytes(repo.objects_dir, oid)
+            except FileNotFoundError:
+                continue
+        return
+
+    graph = repo.commit_graph
+    with served.lock:
+        stops = [h for h in dict.fromkeys(haves) if graph.add(h) is not None]
+    stopset = set(stops)
+
+    seen = set()
+    queue = deque((w, 1) for w in wants)
+    while queue:
+        oid, d = queue.popleft()
+        if not oid or oid in seen:
+            continue
+        seen.add(oid)
+        try:
+            canon = read_object_bytes(repo.objects_dir, oid)
+        except FileNotFoundError:
+            continue
+        try:
+            obj = json.loads(canon)
+        except ValueError:
+            yield oid, canon
+            continue
+        if not isinstance(obj, dict):
+            yield oid, canon
+            continue
+
+        schema = obj.get("schema")
+        if schema == "gait.commit.v0":
+            if oid in stopset:
+                continue
+            if stops:
+                with served.lock:
+                    if any(graph.is_ancestor(oid, h) for h in stops):
+                        continue
+            if since and d > 1 and str(obj.get("created_at") or "") < since:
+                continue
+            if depth and d >= depth:
+                obj = dict(obj, parents=[])
+        yield oid, canon
+
+        deps: List[str] = []
+        _enqueue_deps(obj, deps, turns=turns)
+        # pinned commits count as wants
+        nd = 1 if schema == "gait.memory.v0" else d + 1
+        queue.extend((x, nd) for x in deps)
+
+
+class _BodyReader:
+    """
+    read(n) over a request body: at most Content-Length bytes of rfile.
+    """
+
+    def __init__(self, f: Any, length: int) -> None:
+        self._f = f
+        self.left = max(0, length)
+
+    def read(self, n: int = -1) -> bytes:
+        if self.left <= 0:
+            return b""
+        n = self.left if n is None or n < 0 else min(n, self.left)
+        data = self._f.read(n)
+        self.left = self.left - len(data) if data else 0
+        return data
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    _reader: Optional[_BodyReader] = None  # POST body not read up front
+    # headers and body go out as separate writes; with Nagle on, every
+    # keep-alive response waits for the client's delayed ACK
+    disable_nagle_algorithm = True
+    server: GaitServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    # ----------------------------
+    # Plumbing
+    # ----------------------------
+
+    def _send(self, code: int, body: bytes = b"", ctype: str = "application/json", headers: Optional[Dict[str, str]] = None) -> None:
+        self._start_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, code: int, payload: Dict[str, Any]) -> None:
+        self._send(code, json.dumps(payload).encode("utf-8"))
+
+    def _error(self, code: int, message: str) -> None:
+        self._json(code, {"error": message})
+
+    def _body(self) -> bytes:
+        n = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(n) if n > 0 else b""
+
+    def _end_body(self) -> None:
+        # whatever is left of a streamed request body would be parsed as the
+        # next request: drain a small rest, close the connection after a large one
+        body, self._reader = self._reader, None
+        if body is None or not body.left:
+            return
+        if body.left > _CHUNK:
+            self.close_connection = True
+        else:
+            body.read()
+
+    def _start_response(self, code: int) -> None:
+        self._end_body()
+        self.send_response(code)
+        if self.close_connection:
+            self.send_header("Connection", "close")
+
+    def _authorized(self) -> bool:
+        if self.server.read_only:
+            self._error(403, "read-only: set a token to accept writes on a non-loopback address")
+            return False
+        if not self.server.token:
+            return True
+        if self.headers.get("Authorization") == f"Bearer {self.server.token}":
+            return True
+        self._error(401, "unauthorized")
+        return False
+
+    def _route(self, *, create: bool = False) -> Optional[Tuple[_Served, str]]:
+        m = _ROUTE.match(self.path.split("?", 1)[0])
+        if not m:
+            self._error(404, "not found")
+            return None
+        owner, name, rest = m.group(1), m.group(2), m.group(3) or ""
+        create = create and rest == ""
+        if create and not self._authorized():
+            return None
+        served = self.server.served(owner, name, create=create)
+        if served is None:
+            self._error(404, f"unknown repo {owner}/{name}")
+            return None
+        return served, rest
+
+    def _stream(self, items: Iterator[Tuple[str, bytes]]) -> None:
+        # chunked, so the size need not be known up front
+        deflate = "deflate" in (self.headers.get("Accept-Encoding") or "").lower()
+        self._start_response(200)
+        self.send_header("Content-Type", wire.CONTENT_TYPE)
+        self.send_header("Transfer-Encoding", "chunked")
+        if deflate:
+            self.send_header("Content-Encoding", "deflate")
+        self.end_headers()
+
+        z = zlib.compressobj(6) if deflate else None
+        buf: List[bytes] = []
+        size = 0
+
+        def emit(data: bytes) -> None:
+            if data:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+        for piece in wire.encode_stream(items):
+            buf.append(piece)
+            size += len(piece)
+            if size >= _CHUNK:
+                data = b"".join(buf)
+                emit(z.compress(data) if z else data)
+                buf, size = [], 0
+        data = b"".join(buf)
+        emit(z.compress(data) + z.flush() if z else data)
+        self.wfile.write(b"0\r\n\r\n")
+
+    # ----------------------------
+    # Methods
+    # ----------------------------
+
+    def do_GET(self) -> None:
+        r = self._route()
+        if r is None:
+            return
+        served, rest = r
+        repo = served.repo
+
+        if rest == "/refs":
+            body = json.dumps(
+                {"heads": _list_refs(repo.refs_dir), "memory": _list_refs(repo.memory_refs_dir)},
+                sort_keys=True,
+            ).encode("utf-8")
+            etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            return self._send(200, body, headers={"ETag": etag})
+
+        m = _OBJECT.match(rest)
+        if m:
+            try:
+                canon = read_object_bytes(repo.objects_dir, m.group(1))
+            except FileNotFoundError:
+                return self._error(404, "no such object")
+            return self._send(200, canon, "application/octet-stream")
+
+        self._error(404, "not found")
+
+    def do_PUT(self) -> None:
+        body = self._body()
+        r = self._route()
+        if r is None:
+            return
+        served, rest = r
+        repo = served.repo
+        if not self._authorized():
+            return
+
+        m = _OBJECT.match(rest)
+        if m:
+            oid = m.group(1)
+            try:
+                canon = decode_payload(body)
+            except zlib.error:
+                return self._error(400, "undecodable object")
+            if hashlib.sha256(canon).hexdigest() != oid:
+                return self._error(400, "object hash mismatch")
+            store_object_bytes(repo.objects_dir, oid, canon, **repo.storage_options())
+            return self._json(200, {"stored": oid})
+
+        m = _REF.match(rest)
+        if m:
+            kind, branch = m.group(1), m.group(2)
+            try:
+                path = ref_file(repo.refs_dir if kind == "heads" else repo.memory_refs_dir, branch)
+            except ValueError as e:
+                return self._error(400, str(e))
+            try:
+                oid = str((json.loads(body or b"{}") or {}).get("oid") or "")
+            except ValueError:
+                return self._error(400, "bad JSON")
+            if not _OID.match(oid):
+                return self._error(400, "oid must be 64 lowercase hex characters")
+            if not has_object(repo.objects_dir, oid):
+                return self._error(400, f"unknown object {oid}")
+            expected = self.headers.get("If-Match")
+            with served.lock:
+                cur = path.read_text(encoding="utf-8").strip() if path.exists() else ""
+                if expected is not None and expected != cur:
+                    return self._json(409, {"error": "conflict", "current": cur})
+                if kind == "heads":
+                    repo.write_ref(branch, oid)
+                else:
+                    repo.write_memory_ref(oid, branch)
+            return self._json(200, {"oid": oid})
+
+        self._error(404, "not found")
+
+    def do_POST(self) -> None:
+        self._reader = reader = _BodyReader(self.rfile, int(self.headers.get("Content-Length") or 0))
+        self._post(reader)
+
+    def _post(self, reader: "_BodyReader") -> None:
+        r = self._route(create=True)
+        if r is None:
+            return
+        served, rest = r
+        repo = served.repo
+
+        if rest == "":
+            return self._json(200, {"ok": True})
+
+        if rest == "/objects/pack" and self.server.batch:
+            if not self._authorized():
+                return
+            # streamed from the socket: an upload is never held in memory whole
+            return self._receive_pack(repo, reader)
+
+        body = reader.read()
+
+        if rest == "/objects/missing":
+            try:
+                oids = list((json.loads(body or b"{}") or {}).get("oids") or [])
+            except ValueError:
+                return self._error(400, "bad JSON")
+            return self._json(200, {"missing": [o for o in oids if not has_object(repo.objects_dir, o)]})
+
+        if rest == "/objects/fetch-pack" and self.server.batch:
+            try:
+                req = json.loads(body or b"{}")
+            except ValueError:
+                return self._error(400, "bad JSON")
+            items = iter_pack_objects(
+                served,
+                [str(o) for o in req.get("wants") or []],
+                [str(o) for o in req.get("haves") or []],
+                depth=int(req["depth"]) if req.get("depth") else None,
+                since=str(req["since"]) if req.get("since") else None,
+                turns=req.get("filter") != "turns",
+                closure=req.get("closure") is not False,
+            )
+            return self._stream(items)
+
+        self._error(404, "not found")
+
+    def _receive_pack(self, repo: GaitRepo, body: "_BodyReader") -> None:
+        opts = repo.storage_options()
+        w = PackWriter(repo.objects_dir)
+        try:
+            for oid, payload in wire.iter_stream(body, encoding=self.headers.get("Content-Encoding")):
+                canon = decode_payload(payload)
+                if hashlib.sha256(canon).hexdigest() != oid:
+                    w.abort()
+                    return self._error(400, f"object hash mismatch: {oid}")
+                if oid not in w and not has_object(repo.objects_dir, oid):
+                    w.add(oid, encode_packed(canon, **opts))
+        except (ValueError, zlib.error) as e:
+            w.abort()
+            return self._error(400, f"bad object stream: {e}")
+        n = len(w)
+        w.commit()
+        self._json(200, {"stored": n})
+
+
+def make_server(root: Path, *, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, token: str = "", batch: bool = True) -> GaitServer:
+    """
+    Bind (port 0 picks a free one); call serve_forever() to run.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    return GaitServer((host, port), root, token=token, batch=batch)
+
+
+def serve_in_thread(root: Path, **kwargs: Any) -> GaitServer:
+    """
+    Start a server on a daemon thread; stop it with shutdown().
+    """
+    srv = make_server(root, **kwargs)
+    threading.Thread(target=srv.serve_forever, name="gait-serve", daemon=True).start()
+    return srv
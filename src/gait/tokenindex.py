@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# ---------------------------------------------------------------------
+# Token-count side index: .gait/tokens.db (SQLite)
+#
+#   turn_tokens(turn_id, encoding, input_total, output_total)
+#
+# Turns are immutable, so a count never goes stale. Rows are filled lazily
+# by GaitRepo.turn_token_counts (or all at once by `gait tokens backfill`);
+# deleting the file only costs a recount.
+# ---------------------------------------------------------------------
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS turn_tokens (
+    turn_id      TEXT NOT NULL,
+    encoding     TEXT NOT NULL,
+    input_total  INTEGER NOT NULL,
+    output_total INTEGER NOT NULL,
+    PRIMARY KEY (turn_id, encoding)
+);
+"""
+
+_BATCH = 500  # ids per IN (...) query, under SQLite's variable limit
+
+
+def token_index_path(gait_dir: Path) -> Path:
+    return gait_dir / "tokens.db"
+
+
+class TokenIndex:
+    def __init__(self, gait_dir: Path) -> None:
+        self.path = token_index_path(gait_dir)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def lookup(self, turn_ids: Iterable[str], encoding: str) -> Dict[str, Tuple[int, int]]:
+        """
+        {turn_id: (input_total, output_total)} for the ids already indexed.
+        """
+        ids = list(dict.fromkeys(turn_ids))
+        out: Dict[str, Tuple[int, int]] = {}
+        with self._lock:
+            db = self._db()
+            for i in range(0, len(ids), _BATCH):
+                chunk = ids[i : i + _BATCH]
+                marks = ",".join("?" * len(chunk))
+                rows = db.execute(
+                    f"SELECT turn_id, input_total, output_total FROM turn_tokens "
+                    f"WHERE encoding = ? AND turn_id IN ({marks})",
+                    (encoding, *chunk),
+                ).fetchall()
+                for tid, in_t, out_t in rows:
+                    out[tid] = (in_t, out_t)
+        return out
+
+    def store(self, counts: Dict[str, Tuple[int, int]], encoding: str) -> None:
+        if not counts:
+            return
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO turn_tokens (turn_id, encoding, input_total, output_total) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(tid, encoding, in_t, out_t) for tid, (in_t, out_t) in counts.items()],
+                )
+
+    def count(self, encoding: Optional[str] = None) -> int:
+        with self._lock:
+            db = self._db()
+            if encoding is None:
+                return db.execute("SELECT COUNT(*) FROM turn_tokens").fetchone()[0]
+            return db.execute("SELECT COUNT(*) FROM turn_tokens WHERE encoding = ?", (encoding,)).fetchone()[0]
+
+    def missing(self, turn_ids: Iterable[str], encoding: str) -> List[str]:
+        ids = list(dict.fromkeys(turn_ids))
+        have = self.lookup(ids, encoding)
+        return [t for t in ids if t not in have]
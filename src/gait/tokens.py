@@ -1,20 +1,72 @@
 from __future__ import annotations
-from typing import Dict
-import tiktoken
+import os
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Sequence
 
-_DEFAULT_ENCODING = "cl100k_base"
+if TYPE_CHECKING:
+    import tiktoken
 
-def count_tokens(text: str, *, encoding: str = _DEFAULT_ENCODING) -> int:
+DEFAULT_ENCODING = "cl100k_base"
+
+@lru_cache(maxsize=None)
+def _encoding(name: str) -> "tiktoken.Encoding":
+    # tiktoken is slow to import; only commands that count tokens pay for it
+    import tiktoken
+
+    return tiktoken.get_encoding(name)
+
+def count_tokens(text: str, *, encoding: str = DEFAULT_ENCODING) -> int:
     if not text:
         return 0
-    enc = tiktoken.get_encoding(encoding)
-    return len(enc.encode(text))
+    return len(_encoding(encoding).encode(text))
+
+def token_threads_from_env() -> int:
+    """
+    GAIT_TOKEN_THREADS: threads for batch encoding (default: CPUs, at most 8).
+    """
+    raw = os.environ.get("GAIT_TOKEN_THREADS", "").strip()
+    if raw:
+        return max(1, int(raw))
+    return max(1, min(8, os.cpu_count() or 1))
+
+def count_tokens_batch(
+    texts: Sequence[str],
+    *,
+    encoding: str = DEFAULT_ENCODING,
+    threads: int = 0,
+) -> List[int]:
+    """
+    count_tokens for many texts at once; tiktoken encodes them on a pool of
+    `threads` threads (default token_threads_from_env()).
+    """
+    out = [0] * len(texts)
+    todo = [i for i, t in enumerate(texts) if t]
+    if not todo:
+        return out
+    encoded = _encoding(encoding).encode_batch(
+        [texts[i] for i in todo], num_threads=threads or token_threads_from_env()
+    )
+    for i, ids in zip(todo, encoded):
+        out[i] = len(ids)
+    return out
+
+def truncate_tokens(text: str, max_tokens: int, *, encoding: str = DEFAULT_ENCODING) -> str:
+    """
+    The longest prefix of `text` that is at most `max_tokens` tokens.
+    """
+    if max_tokens <= 0:
+        return ""
+    enc = _encoding(encoding)
+    ids = enc.encode(text)
+    if len(ids) <= max_tokens:
+        return text
+    return enc.decode(ids[:max_tokens])
 
 def count_turn_tokens(
     *,
     user_text: str,
     assistant_text: str,
-    encoding: str = _DEFAULT_ENCODING,
+    encoding: str = DEFAULT_ENCODING,
 ) -> Dict[str, int]:
     user_tokens = count_tokens(user_text, encoding=encoding)
     assistant_tokens = count_tokens(assistant_text, encoding=encoding)
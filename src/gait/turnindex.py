@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# ---------------------------------------------------------------------
+# Side index over .gait/turns.jsonl: .gait/index.db (SQLite)
+#
+#   turn_commits(turn_id, commit_id)   one row per log line, both directions indexed
+#   meta(key, value)                   "turns_log_offset": bytes of the log consumed
+#
+# The log stays the source of truth. Every lookup first indexes whatever was
+# appended since the stored offset, so writers never have to touch the db.
+# If the log shrinks (rewritten by hand), the index is rebuilt from scratch.
+# ---------------------------------------------------------------------
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS turn_commits (
+    turn_id   TEXT NOT NULL,
+    commit_id TEXT NOT NULL,
+    PRIMARY KEY (turn_id, commit_id)
+);
+CREATE INDEX IF NOT EXISTS turn_commits_by_commit ON turn_commits (commit_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_OFFSET_KEY = "turns_log_offset"
+_CHUNK = 8 * 1024 * 1024
+
+
+def index_path(gait_dir: Path) -> Path:
+    return gait_dir / "index.db"
+
+
+def _parse_line(line: bytes) -> Optional[Tuple[str, str]]:
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(entry, dict):
+        return None
+    tid, cid = entry.get("turn_id"), entry.get("commit_id")
+    if not tid or not cid:
+        return None
+    return str(tid), str(cid)
+
+
+class TurnIndex:
+    def __init__(self, gait_dir: Path, turns_log: Path) -> None:
+        self.path = index_path(gait_dir)
+        self.turns_log = turns_log
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _offset(self, db: sqlite3.Connection) -> int:
+        row = db.execute("SELECT value FROM meta WHERE key = ?", (_OFFSET_KEY,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def _sync(self) -> int:
+        db = self._db()
+        try:
+            size = self.turns_log.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        offset = self._offset(db)
+        if size == offset:
+            return 0
+        if size < offset:
+            with db:
+                db.execute("DELETE FROM turn_commits")
+            offset = 0
+
+        added = 0
+        with self.turns_log.open("rb") as f:
+            f.seek(offset)
+            carry = b""
+            while True:
+                chunk = f.read(_CHUNK)
+                if not chunk:
+                    break
+                data = carry + chunk
+                cut = data.rfind(b"\n") + 1
+                carry = data[cut:]
+                rows = [r for r in map(_parse_line, data[:cut].splitlines()) if r is not None]
+                offset += cut
+                # rows and the offset they came from land in one transaction
+                with db:
+                    db.executemany("INSERT OR IGNORE INTO turn_commits (turn_id, commit_id) VALUES (?, ?)", rows)
+                    db.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                        (_OFFSET_KEY, str(offset)),
+                    )
+                added += len(rows)
+            # a torn trailing line is picked up once its newline is written
+        return added
+
+    def sync(self) -> int:
+        """
+        Index lines appended to turns.jsonl since the last call. Returns rows added.
+        """
+        with self._lock:
+            return self._sync()
+
+    def rebuild(self) -> int:
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("DELETE FROM turn_commits")
+                db.execute("DELETE FROM meta WHERE key = ?", (_OFFSET_KEY,))
+            return self._sync()
+
+    def commits_for_turn(self, turn_id: str) -> List[str]:
+        """
+        Commits that recorded `turn_id`, oldest first.
+        """
+        with self._lock:
+            self._sync()
+            rows = self._db().execute(
+                "SELECT commit_id FROM turn_commits WHERE turn_id = ? ORDER BY rowid", (turn_id,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def turns_for_commit(self, commit_id: str) -> List[str]:
+        with self._lock:
+            self._sync()
+            rows = self._db().execute(
+                "SELECT turn_id FROM turn_commits WHERE commit_id = ? ORDER BY rowid", (commit_id,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def turn_ids(self) -> List[str]:
+        """
+        Every turn id in the log, in first-recorded order.
+        """
+        with self._lock:
+            self._sync()
+            rows = self._db().execute(
+                "SELECT turn_id FROM turn_commits GROUP BY turn_id ORDER BY MIN(rowid)"
+            ).fetchall()
+        return [r[0] for r in rows]
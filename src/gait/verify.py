@@ -1,16 +1,108 @@
 from __future__ import annotations
 import hashlib
 import json
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from .repo import GaitRepo
-from .objects import canonical_payload_bytes
+from .objects import decode_payload, fanout_path, iter_loose_oids, read_object_bytes
+from .pack import load_packs
+
+LOOSE_BATCH = 512
+PACK_BATCH = 4096
+
+# (objects checked, payload bytes read, problems) from one unit of work
+_Result = Tuple[int, int, List[str]]
 
 def _sha256_hex(b: bytes) -> str:
     return hashlib.sha256(b).hexdigest()
 
-def verify_repo(repo: GaitRepo) -> Dict[str, Any]:
+def watermark_path(repo: GaitRepo) -> Path:
+    return repo.objects_dir / "info" / "verified"
+
+# ----------------------------
+# Work units (module level so a process pool can run them)
+# ----------------------------
+
+def _check_loose(objects_dir: str, oids: List[str]) -> _Result:
+    problems: List[str] = []
+    nbytes = 0
+    for oid in oids:
+        p = fanout_path(Path(objects_dir), oid)
+        try:
+            raw = p.read_bytes()
+        except FileNotFoundError:
+            # removed (e.g. by repack) since it was listed
+            continue
+        nbytes += len(raw)
+        try:
+            canon = decode_payload(raw)
+        except zlib.error:
+            problems.append(f"Undecodable object on disk: {p}")
+            continue
+        if _sha256_hex(canon) != oid:
+            problems.append(f"Bad object on disk: {p}")
+    return len(oids), nbytes, problems
+
+def _check_pack(pack_path: str, entries: List[Tuple[str, int, int]]) -> _Result:
+    problems: List[str] = []
+    nbytes = 0
+    name = Path(pack_path).name
+    with open(pack_path, "rb") as f:
+        for oid, off, length in entries:
+            f.seek(off)
+            data = f.read(length)
+            nbytes += len(data)
+            try:
+                canon = decode_payload(data)
+            except zlib.error:
+                problems.append(f"Undecodable object in {name}: {oid}")
+                continue
+            if _sha256_hex(canon) != oid:
+                problems.append(f"Bad object in {name}: {oid}")
+    return len(entries), nbytes, problems
+
+# ----------------------------
+# Incremental watermark: .gait/objects/info/verified
+#   {"packs": [names verified clean], "loose_since_ns": start time of the last clean run}
+# Packs are immutable once named, so a verified pack is skipped; loose
+# objects are re-checked if modified at or after the last clean run began.
+# ----------------------------
+
+def _read_watermark(repo: GaitRepo) -> Dict[str, Any]:
+    try:
+        data = json.loads(watermark_path(repo).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def _write_watermark(repo: GaitRepo, packs: List[str], loose_since_ns: int) -> None:
+    p = watermark_path(repo)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(f"{p.name}.tmp-{os.getpid()}")
+    tmp.write_text(json.dumps({"packs": sorted(packs), "loose_since_ns": loose_since_ns}) + "\n", encoding="utf-8")
+    os.replace(tmp, p)
+
+def verify_repo(
+    repo: GaitRepo,
+    *,
+    jobs: int = 1,
+    incremental: bool = False,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Check refs and re-hash every object on disk.
+
+    jobs > 1 hashes in a process pool. incremental skips packs and loose
+    objects already verified by an earlier clean run. progress(done, total)
+    is called as object batches complete.
+    """
+    t0 = time.perf_counter()
+    started_ns = time.time_ns()
     problems: List[str] = []
     checked_objects = 0
 
@@ -28,12 +120,14 @@ def verify_repo(repo: GaitRepo) -> Dict[str, Any]:
         oid = path.read_text(encoding="utf-8").strip()
         if not oid:
             return
-        obj_path = repo.objects_dir / oid[:2] / oid[2:4] / oid
-        if not obj_path.exists():
+        try:
+            canon = read_object_bytes(repo.objects_dir, oid)
+        except FileNotFoundError:
             problems.append(f"Missing object for ref {path}: {oid}")
             return
-        raw = obj_path.read_bytes()
-        canon = canonical_payload_bytes(raw)
+        except zlib.error:
+            problems.append(f"Undecodable object {oid} referenced by {path}")
+            return
         if _sha256_hex(canon) != oid:
             problems.append(f"Bad hash for object {oid} referenced by {path}")
         checked_objects += 1
@@ -49,20 +143,75 @@ def verify_repo(repo: GaitRepo) -> Dict[str, Any]:
             if p.is_file():
                 verify_ref_file(p)
 
-    # 3) optionally verify ALL objects on disk
-    for p in repo.objects_dir.rglob("*"):
-        if not p.is_file():
-            continue
-        oid = p.name
-        if len(oid) != 64:
+    # 3) verify ALL objects on disk (loose, then packed), as batches of work
+    mark = _read_watermark(repo) if incremental else {}
+    verified_packs: Set[str] = set(mark.get("packs") or [])
+    loose_since = int(mark.get("loose_since_ns") or 0)
+
+    units: List[Tuple[Callable[..., _Result], Tuple[Any, ...]]] = []
+    skipped = 0
+
+    loose: List[str] = []
+    for oid in iter_loose_oids(repo.objects_dir):
+        if loose_since:
+            try:
+                if fanout_path(repo.objects_dir, oid).stat().st_mtime_ns < loose_since:
+                    skipped += 1
+                    continue
+            except FileNotFoundError:
+                continue
+        loose.append(oid)
+    for i in range(0, len(loose), LOOSE_BATCH):
+        units.append((_check_loose, (str(repo.objects_dir), loose[i : i + LOOSE_BATCH])))
+
+    packs = load_packs(repo.objects_dir)
+    for pk in packs:
+        if pk.pack_path.name in verified_packs:
+            skipped += len(pk)
             continue
-        raw = p.read_bytes()
-        canon = canonical_payload_bytes(raw)
-        if _sha256_hex(canon) != oid:
-            problems.append(f"Bad object on disk: {p}")
+        entries = sorted(pk.iter_entries(), key=lambda e: e[1])
+        for i in range(0, len(entries), PACK_BATCH):
+            units.append((_check_pack, (str(pk.pack_path), entries[i : i + PACK_BATCH])))
+
+    total = sum(len(args[1]) for _, args in units)
+    done = 0
+    nbytes = 0
+
+    def collect(r: _Result) -> None:
+        nonlocal done, nbytes
+        done += r[0]
+        nbytes += r[1]
+        problems.extend(r[2])
+        if progress is not None:
+            progress(done, total)
+
+    if progress is not None:
+        progress(0, total)
+    if jobs > 1 and len(units) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as ex:
+            futures = [ex.submit(fn, *args) for fn, args in units]
+            for fut in as_completed(futures):
+                collect(fut.result())
+    else:
+        for fn, args in units:
+            collect(fn(*args))
+
+    ok = len(problems) == 0
+    if ok:
+        present = {pk.pack_path.name for pk in packs}
+        _write_watermark(repo, list(present), started_ns)
 
+    secs = time.perf_counter() - t0
     return {
-        "ok": len(problems) == 0,
+        "ok": ok,
         "problems": problems,
         "checked_ref_objects": checked_objects,
+        "checked_objects": done,
+        "skipped_objects": skipped,
+        "bytes": nbytes,
+        "jobs": max(1, jobs),
+        "incremental": incremental,
+        "seconds": secs,
+        "objects_per_sec": done / secs if secs > 0 else 0.0,
+        "mb_per_sec": nbytes / (1024 * 1024) / secs if secs > 0 else 0.0,
     }
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple
+
+# ---------------------------------------------------------------------
+# Object stream used by the batch endpoints
+#
+#   POST /objects/pack        body: stream      -> {"stored": n}
+#   POST /objects/fetch-pack  body: {"wants": [...], "haves": [...]} -> stream
+#
+#   stream  b"GWPK" | u32 version
+#           records: 32-byte raw oid | u32 length | canonical JSON payload
+#           end:     32 zero bytes | u32 0
+#
+# Either side may send the stream with "Content-Encoding: deflate" (zlib).
+# fetch-pack returns everything reachable from `wants` that is not
+# reachable from `haves`; the receiver re-hashes every payload. Optional
+# request fields a server may honour (ignoring them only costs bandwidth):
+#   depth: N           stop following parents N commits below each want
+#   since: timestamp   leave out commits created before it
+#   filter: "turns"    leave out turn objects (partial clone)
+#   closure: false     send the wants themselves, no dependencies
+# ---------------------------------------------------------------------
+
+STREAM_MAGIC = b"GWPK"
+STREAM_VERSION = 1
+CONTENT_TYPE = "application/x-gait-pack"
+
+_HEADER = struct.Struct(">4sI")
+_REC = struct.Struct(">32sI")
+_END = _REC.pack(b"\0" * 32, 0)
+
+
+def encode_stream(items: Iterable[Tuple[str, bytes]]) -> Iterator[bytes]:
+    yield _HEADER.pack(STREAM_MAGIC, STREAM_VERSION)
+    for oid, payload in items:
+        yield _REC.pack(bytes.fromhex(oid), len(payload))
+        yield payload
+    yield _END
+
+
+def encode_stream_bytes(items: Iterable[Tuple[str, bytes]]) -> bytes:
+    return b"".join(encode_stream(items))
+
+
+class _Inflater:
+    """
+    file-like read(n) over a deflate-encoded file object.
+    """
+
+    def __init__(self, f: BinaryIO) -> None:
+        self._f = f
+        self._z = zlib.decompressobj()
+        self._buf = bytearray()
+        self._pos = 0  # bytes of _buf already returned
+
+    def read(self, n: int) -> bytes:
+        while len(self._buf) - self._pos < n:
+            chunk = self._f.read(64 * 1024)
+            # drop what was returned only when refilling, so each byte is
+            # moved at most once more instead of on every small read
+            del self._buf[: self._pos]
+            self._pos = 0
+            if not chunk:
+                self._buf += self._z.flush()
+                break
+            self._buf += self._z.decompress(chunk)
+        out = bytes(self._buf[self._pos : self._pos + n])
+        self._pos += len(out)
+        return out
+
+
+def _read_exact(f: BinaryIO, n: int) -> bytes:
+    parts = []
+    need = n
+    while need:
+        b = f.read(need)
+        if not b:
+            raise ValueError("Truncated object stream")
+        parts.append(b)
+        need -= len(b)
+    return b"".join(parts)
+
+
+def iter_stream(f: BinaryIO, *, encoding: Optional[str] = None) -> Iterator[Tuple[str, bytes]]:
+    """
+    (oid, payload) pairs from a stream; `encoding` is the Content-Encoding, if any.
+    """
+    if encoding:
+        if encoding.lower() != "deflate":
+            raise ValueError(f"Unsupported stream encoding: {encoding}")
+        f = _Inflater(f)  # type: ignore[assignment]
+
+    magic, version = _HEADER.unpack(_read_exact(f, _HEADER.size))
+    if magic != STREAM_MAGIC or version != STREAM_VERSION:
+        raise ValueError("Not a gait object stream")
+    while True:
+        raw, length = _REC.unpack(_read_exact(f, _REC.size))
+        if length == 0 and raw == b"\0" * 32:
+            return
+        yield raw.hex(), _read_exact(f, length)
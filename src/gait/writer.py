@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import atexit
+import os
+import queue
+import signal
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .objects import fanout_path, object_id
+from .repo import GaitRepo
+from .schema import Turn
+
+# ---------------------------------------------------------------------
+# Background turn writer for gait chat
+#
+# record_turn() computes the turn and commit ids in memory, advances an
+# in-memory HEAD and returns; one writer thread then does what
+# GaitRepo.record_turn does synchronously (objects, commit graph, ref,
+# turns.jsonl), in submission order.
+#
+# Crash safety:
+#   - jobs are written one at a time, each in the order objects -> ref ->
+#     log, so the tree on disk is always a prefix of the chat's history,
+#     never a ref to a missing object
+#   - a ref is only moved if it still holds the parent the commit was
+#     built on; if another process moved it meanwhile, the objects are kept
+#     and the error names the unattached commit (nothing is overwritten)
+#   - close() (also run at exit) drains the queue and fsyncs what was
+#     written, which plain record_turn never did
+#   - SIGTERM and SIGHUP, which would end the process without running
+#     atexit, are turned into SystemExit while turns can be queued, so the
+#     queue is drained on those too (Ctrl-C already raises KeyboardInterrupt)
+# Only SIGKILL or a crash of the interpreter can lose turns still queued;
+# the queue is bounded (GAIT_TURN_QUEUE, default 64) so that window stays
+# small, and GAIT_TURN_QUEUE=0 writes synchronously as before.
+# ---------------------------------------------------------------------
+
+DEFAULT_TURN_QUEUE = 64
+
+
+def turn_queue_from_env() -> int:
+    """
+    GAIT_TURN_QUEUE: turns that may wait for the background writer (0: write synchronously).
+    """
+    env = os.environ.get("GAIT_TURN_QUEUE", "").strip()
+    if not env:
+        return DEFAULT_TURN_QUEUE
+    n = int(env)
+    if n < 0:
+        raise ValueError("GAIT_TURN_QUEUE must be >= 0")
+    return n
+
+
+_EXIT_SIGNALS = tuple(getattr(signal, n) for n in ("SIGTERM", "SIGHUP") if hasattr(signal, n))
+
+
+def _exit_on_signal(signum: int, frame: Any) -> None:
+    # unwinds the main thread like Ctrl-C does, so `finally` blocks and
+    # atexit (TurnWriter.close) run
+    raise SystemExit(128 + signum)
+
+
+def _fsync(path: Path) -> None:
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except FileNotFoundError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# (branch, expected parent, turn dict, commit dict)
+_Job = Tuple[str, str, Dict[str, Any], Dict[str, Any]]
+
+
+class TurnWriter:
+    def __init__(self, repo: GaitRepo, *, max_pending: Optional[int] = None) -> None:
+        self.repo = repo
+        self.max_pending = turn_queue_from_env() if max_pending is None else max_pending
+        self.written = 0
+        self._heads: Dict[str, str] = {}  # branch -> newest queued commit
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._error: Optional[BaseException] = None
+        self._dirty: List[Path] = []  # written since the last sync
+        self._closed = False
+        self._queue: Optional[queue.Queue[Optional[_Job]]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._signals: Dict[int, Any] = {}  # handlers replaced by _exit_on_signal
+        if self.max_pending > 0:
+            self._queue = queue.Queue(maxsize=self.max_pending)
+            self._thread = threading.Thread(target=self._run, name="gait-turn-writer", daemon=True)
+            self._thread.start()
+            self._catch_exit_signals()
+        atexit.register(self.close)
+
+    def _catch_exit_signals(self) -> None:
+        # handlers can only be set from the main thread; a handler someone
+        # else installed is left alone
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for sig in _EXIT_SIGNALS:
+            if signal.getsignal(sig) == signal.SIG_DFL:
+                signal.signal(sig, _exit_on_signal)
+                self._signals[sig] = signal.SIG_DFL
+
+    def _restore_signals(self) -> None:
+        signals, self._signals = self._signals, {}
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for sig, handler in signals.items():
+            if signal.getsignal(sig) is _exit_on_signal:
+                signal.signal(sig, handler)
+
+    # ----------------------------
+    # Caller side
+    # ----------------------------
+
+    def head(self, branch: str) -> str:
+        """
+        HEAD of `branch` as the chat sees it: the newest queued commit, else the ref on disk.
+        """
+        with self._lock:
+            if branch in self._heads:
+                return self._heads[branch]
+        return self.repo.read_ref(branch)
+
+    def record_turn(
+        self,
+        turn: Turn,
+        *,
+        message: str = "",
+        kind: str = "auto",
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, str]:
+        """
+        Like GaitRepo.record_turn, but returns once the turn is queued.
+        Blocks while max_pending turns are already waiting.
+        """
+        if self._closed:
+            raise RuntimeError("TurnWriter is closed")
+        self._raise_error()
+        repo = self.repo
+        branch = repo.current_branch()
+        parent = self.head(branch)
+        turn_dict, commit_dict = repo.turn_commit(
+            turn, branch=branch, parent=parent, message=message, kind=kind, meta=meta
+        )
+        turn_id, commit_id = commit_dict["turn_ids"][0], object_id(commit_dict)
+        job = (branch, parent, turn_dict, commit_dict)
+
+        if self._queue is None:
+            self._write(job)
+            self._raise_error()
+            return turn_id, commit_id
+
+        with self._lock:
+            self._heads[branch] = commit_id
+            self._pending += 1
+        self._queue.put(job)
+        return turn_id, commit_id
+
+    def flush(self) -> None:
+        """
+        Wait until every queued turn is on disk; raise if any failed.
+        """
+        with self._idle:
+            while self._pending:
+                self._idle.wait()
+        self._raise_error()
+
+    def sync(self) -> None:
+        """
+        fsync objects, refs and turns.jsonl written so far, in that order.
+        """
+        with self._lock:
+            paths, self._dirty = self._dirty, []
+        if not paths:
+            return
+        seen = set()
+        for p in paths:
+            if p not in seen:
+                seen.add(p)
+                _fsync(p)
+        _fsync(self.repo.turns_log)
+
+    def close(self) -> None:
+        """
+        Drain the queue, fsync, and stop the writer thread. Safe to call twice.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        try:
+            if self._queue is not None and self._thread is not None:
+                self._queue.put(None)
+                self._thread.join()
+            self.sync()
+        finally:
+            self._restore_signals()
+            self._raise_error()
+
+    def __enter__(self) -> "TurnWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _raise_error(self) -> None:
+        with self._lock:
+            err, self._error = self._error, None
+        if err is not None:
+            raise RuntimeError(f"Failed to save turn: {err}") from err
+
+    # ----------------------------
+    # Writer side
+    # ----------------------------
+
+    def _run(self) -> None:
+        assert self._queue is not None
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            self._write(job)
+            with self._idle:
+                self._pending -= 1
+                if not self._pending:
+                    self._heads.clear()  # the refs on disk are current again
+                    self._idle.notify_all()
+
+    def _write(self, job: _Job) -> None:
+        branch, parent, turn_dict, commit_dict = job
+        repo = self.repo
+        try:
+            with self._lock:
+                failed = self._error is not None
+            if failed:
+                # a turn before this one was not attached; keep the objects
+                # but don't move the ref past the gap
+                self._store_only(turn_dict, commit_dict)
+                return
+            on_disk = repo.read_ref(branch)
+            if on_disk != parent:
+                commit_id = self._store_only(turn_dict, commit_dict)
+                raise RuntimeError(
+                    f"branch {branch} moved to {on_disk[:8] or '(empty)'} while saving; "
+                    f"commit {commit_id} was stored but not attached"
+                )
+            turn_id, commit_id = repo.write_turn(branch, turn_dict, commit_dict)
+            self._mark_dirty(turn_id, commit_id, repo.refs_dir / branch)
+            self.written += 1
+        except Exception as e:
+            with self._lock:
+                if self._error is None:
+                    self._error = e
+
+    def _store_only(self, turn_dict: Dict[str, Any], commit_dict: Dict[str, Any]) -> str:
+        turn_id = self.repo._store(turn_dict)
+        commit_id = self.repo._store(commit_dict)
+        self._mark_dirty(turn_id, commit_id)
+        return commit_id
+
+    def _mark_dirty(self, turn_id: str, commit_id: str, ref: Optional[Path] = None) -> None:
+        objects_dir = self.repo.objects_dir
+        paths = [fanout_path(objects_dir, turn_id), fanout_path(objects_dir, commit_id)]
+        if ref is not None:
+            paths.append(ref)
+        with self._lock:
+            self._dirty.extend(paths)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from gait.bundle import create_bundle, read_bundle_header, unbundle
+from gait.objects import iter_object_ids
+from gait.pack import load_packs
+from gait.repo import GaitRepo
+from gait.schema import Turn
+from gait.verify import verify_repo
+
+
+def _repo(root: Path, n: int = 0) -> GaitRepo:
+    repo = GaitRepo(root=root)
+    root.mkdir()
+    repo.init()
+    _add_turns(repo, n)
+    return repo
+
+
+def _add_turns(repo: GaitRepo, n: int, tag: str = "q") -> None:
+    for i in range(n):
+        repo.record_turn(Turn.v0(user_text=f"{tag}{i}", assistant_text=f"a{i}"))
+
+
+def _log(repo: GaitRepo, start: str):
+    return repo.iter_commit_ids_from_head_first_parent(start_commit=start, limit_commits=100)
+
+
+def test_full_bundle_round_trip(tmp_path):
+    src = _repo(tmp_path / "src", 5)
+    r = create_bundle(src, tmp_path / "x.bundle", ["main"])
+    assert r["heads"] == {"main": src.head_commit_id()} and r["prerequisites"] == []
+    assert read_bundle_header(tmp_path / "x.bundle")["heads"] == r["heads"]
+
+    dst = _repo(tmp_path / "dst")
+    u = unbundle(dst, tmp_path / "x.bundle")
+    assert 0 < u["objects"] <= r["objects"]
+    tip = dst.read_ref("remotes/bundle/main")
+    assert tip == src.head_commit_id()
+    assert _log(dst, tip) == _log(src, tip)
+    assert dst.read_memory_ref("remotes/bundle/main") == src.read_memory_ref("main")
+    assert set(iter_object_ids(src.objects_dir)) <= set(iter_object_ids(dst.objects_dir))
+    assert verify_repo(dst)["ok"]
+
+    # a second import stores nothing new
+    packs = len(load_packs(dst.objects_dir))
+    assert unbundle(dst, tmp_path / "x.bundle", name="again")["objects"] == 0
+    assert len(load_packs(dst.objects_dir)) == packs
+
+
+def test_incremental_bundle_needs_and_extends_its_base(tmp_path):
+    src = _repo(tmp_path / "src", 5)
+    first = create_bundle(src, tmp_path / "full.bundle", ["main"])
+    base = src.head_commit_id()
+    _add_turns(src, 3, tag="more")
+
+    r = create_bundle(src, tmp_path / "inc.bundle", ["main"], bases=[base[:12]])
+    assert r["prerequisites"] == [base]
+    # only the new commits, their turns and the memory that changed
+    assert 0 < r["objects"] < first["objects"]
+
+    # without the base the bundle is refused, and nothing is stored
+    lonely = _repo(tmp_path / "lonely")
+    before = set(iter_object_ids(lonely.objects_dir))
+    with pytest.raises(RuntimeError, match="needs commit"):
+        unbundle(lonely, tmp_path / "inc.bundle")
+    assert set(iter_object_ids(lonely.objects_dir)) == before
+
+    dst = _repo(tmp_path / "dst")
+    unbundle(dst, tmp_path / "full.bundle")
+    assert dst.read_ref("remotes/bundle/main") == base
+    unbundle(dst, tmp_path / "inc.bundle")
+    tip = dst.read_ref("remotes/bundle/main")
+    assert tip == src.head_commit_id()
+    assert len(_log(dst, tip)) == 8
+    assert dst.commit_graph.is_ancestor(base, tip)
+    assert verify_repo(dst)["ok"]
+
+    with pytest.raises(ValueError, match="Base is not a local commit"):
+        create_bundle(src, tmp_path / "bad.bundle", ["main"], bases=["0" * 64])
+
+
+def test_bundle_of_a_shallow_repo_carries_its_boundary(tmp_path):
+    src = _repo(tmp_path / "src", 6)
+    log = _log(src, src.head_commit_id())
+    src.write_shallow([log[2]])
+
+    r = create_bundle(src, tmp_path / "s.bundle", ["main"])
+    assert read_bundle_header(tmp_path / "s.bundle")["shallow"] == [log[2]]
+
+    dst = _repo(tmp_path / "dst")
+    unbundle(dst, tmp_path / "s.bundle")
+    assert dst.read_shallow() == {log[2]}
+    assert _log(dst, log[0]) == log[:3]
+    assert r["objects"] < len(set(iter_object_ids(src.objects_dir)))
+
+
+def test_damaged_bundles_are_rejected_whole(tmp_path):
+    src = _repo(tmp_path / "src", 5)
+    path = tmp_path / "x.bundle"
+    create_bundle(src, path, ["main"])
+    data = path.read_bytes()
+
+    dst = _repo(tmp_path / "dst")
+    before = set(iter_object_ids(dst.objects_dir))
+    path.write_bytes(data[: len(data) - 40])
+    with pytest.raises(RuntimeError, match="Corrupt bundle"):
+        unbundle(dst, path)
+    assert set(iter_object_ids(dst.objects_dir)) == before
+    assert load_packs(dst.objects_dir) == []
+    assert not (dst.refs_dir / "remotes").exists()
+
+    path.write_bytes(b"not a bundle\n" + data)
+    with pytest.raises(ValueError, match="Not a gait bundle"):
+        unbundle(dst, path)
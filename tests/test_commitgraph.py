@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List
+
+from gait.commitgraph import CommitGraph, graph_path
+from gait.objects import store_object
+from gait.repo import GaitRepo
+from gait.schema import Turn
+
+
+def _commit(parents: List[str], n: int) -> Dict:
+    return {"schema": "gait.commit.v0", "parents": parents, "created_at": f"2024-01-01T00:00:{n:02d}", "message": f"c{n}"}
+
+
+def _history(objects_dir: Path, n: int) -> List[str]:
+    """
+    A linear chain of n commits, oldest first.
+    """
+    oids: List[str] = []
+    for i in range(n):
+        oids.append(store_object(objects_dir, _commit(oids[-1:], i)))
+    return oids
+
+
+def test_generations_parents_and_first_parent_walk(tmp_path):
+    objects_dir = tmp_path / "objects"
+    chain = _history(objects_dir, 5)
+    side = store_object(objects_dir, _commit([chain[1]], 50))
+    merge = store_object(objects_dir, _commit([chain[-1], side], 51))
+
+    g = CommitGraph(objects_dir)
+    assert [g.generation(c) for c in chain] == [1, 2, 3, 4, 5]
+    assert g.generation(side) == 3 and g.generation(merge) == 6
+    assert g.parents(merge) == [chain[-1], side] and g.parents(chain[0]) == []
+    assert g.first_parent_ids(merge, 10) == [merge] + chain[::-1]
+    assert g.first_parent_ids(merge, 2) == [merge, chain[-1]]
+
+    assert g.is_ancestor(chain[0], merge) and g.is_ancestor(side, merge)
+    assert not g.is_ancestor(side, chain[-1]) and not g.is_ancestor(merge, chain[0])
+    assert g.is_ancestor(merge, merge)
+
+
+def test_records_persist_and_are_shared_between_readers(tmp_path):
+    objects_dir = tmp_path / "objects"
+    chain = _history(objects_dir, 3)
+    CommitGraph(objects_dir).add(chain[-1])
+    size = graph_path(objects_dir).stat().st_size
+
+    other = CommitGraph(objects_dir)
+    assert all(c in other for c in chain)
+    assert other.generation(chain[-1]) == 3
+    assert graph_path(objects_dir).stat().st_size == size  # nothing re-appended
+
+    # a commit appended by one reader is seen by the other
+    more = store_object(objects_dir, _commit([chain[-1]], 9))
+    other.add(more)
+    reader = CommitGraph(objects_dir)
+    assert reader.first_parent_ids(more, 10) == [more] + chain[::-1]
+
+
+def test_missing_parents_heal_once_they_arrive(tmp_path):
+    full = tmp_path / "full"
+    chain = _history(full, 6)
+    objects_dir = tmp_path / "objects"
+    g = CommitGraph(objects_dir)
+
+    # a shallow copy of the top three commits
+    for i, oid in enumerate(chain[3:], start=3):
+        assert store_object(objects_dir, _commit([chain[i - 1]], i)) == oid
+    assert g.generation(chain[-1]) == 3
+    assert g.parents(chain[3]) == []
+    assert g.first_parent_ids(chain[-1], 10) == chain[3:][::-1]
+
+    # the rest of history arrives later (unshallow, or objects fetched tip-first)
+    for i, oid in enumerate(chain[:3]):
+        store_object(objects_dir, _commit(chain[i - 1:i] if i else [], i))
+
+    assert g.generation(chain[-1]) == 6
+    assert g.parents(chain[3]) == [chain[2]]
+    assert g.is_ancestor(chain[0], chain[-1])
+    assert g.first_parent_ids(chain[-1], 10) == chain[::-1]
+    assert CommitGraph(objects_dir).generation(chain[-1]) == 6
+
+
+def test_a_lost_graph_is_rebuilt_from_the_objects(tmp_path):
+    root = tmp_path / "r"
+    root.mkdir()
+    repo = GaitRepo(root=root)
+    repo.init()
+    for i in range(5):
+        repo.record_turn(Turn.v0(user_text=f"q{i}", assistant_text=f"a{i}"))
+    log = repo.iter_commit_ids_from_head_first_parent(limit_commits=10)
+
+    graph_path(repo.objects_dir).unlink()
+    repo = GaitRepo(root=root)
+    assert repo.iter_commit_ids_from_head_first_parent(limit_commits=10) == log
+    assert repo.commit_graph.generation(repo.head_commit_id()) == len(log)
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import zlib
+from pathlib import Path
+
+import pytest
+
+from gait.objects import fanout_path, iter_object_ids, read_object_bytes
+from gait.pack import load_packs
+from gait.repo import GaitRepo
+from gait.schema import Turn
+from gait.verify import verify_repo
+
+
+def _repo(root: Path, *, compression=None) -> GaitRepo:
+    repo = GaitRepo(root=root)
+    root.mkdir()
+    repo.init(compression=compression)
+    for i in range(10):
+        repo.record_turn(Turn.v0(user_text=f"question {i} " * 20, assistant_text=f"answer {i} " * 40))
+    return repo
+
+
+def _payloads(repo: GaitRepo) -> list:
+    return [data for pk in load_packs(repo.objects_dir) for _, data in pk.iter_payloads()]
+
+
+def test_compressed_objects_read_back_identically(tmp_path):
+    plain = _repo(tmp_path / "plain")
+    packed = _repo(tmp_path / "zlib", compression="zlib")
+
+    head = packed.head_commit_id()
+    assert fanout_path(packed.objects_dir, head).read_bytes()[:1] == b"x"
+    assert packed.get_commit(head)["schema"] == "gait.commit.v0"
+    for oid in iter_object_ids(plain.objects_dir):
+        canon = read_object_bytes(plain.objects_dir, oid)
+        assert not canon.endswith(b"\n")
+    assert verify_repo(packed)["ok"]
+
+
+@pytest.mark.parametrize("first, then", [("none", "zlib"), ("zlib", "none")])
+def test_repack_after_changing_compression_reencodes_the_pack(tmp_path, first, then):
+    repo = _repo(tmp_path / "r", compression=None if first == "none" else first)
+    repo.repack()
+    before = {p.pack_path.name for p in load_packs(repo.objects_dir)}
+    objects = sorted(iter_object_ids(repo.objects_dir))
+
+    repo.set_compression(then)
+    stats = repo.repack()
+
+    packs = load_packs(repo.objects_dir)
+    assert len(packs) == 1 and packs[0].pack_path.name not in before
+    assert stats["packs_replaced"] == 1
+    compressed = [data[:1] == b"x" for data in _payloads(repo)]
+    assert all(compressed) if then == "zlib" else not any(compressed)
+    assert sorted(iter_object_ids(repo.objects_dir)) == objects
+    assert verify_repo(repo)["ok"]
+
+
+def test_repack_with_unchanged_encoding_keeps_the_pack(tmp_path):
+    repo = _repo(tmp_path / "r", compression="zlib")
+    repo.repack()
+    name = load_packs(repo.objects_dir)[0].pack_path.name
+
+    stats = repo.repack()
+    assert [p.pack_path.name for p in load_packs(repo.objects_dir)] == [name]
+    assert stats["packs_replaced"] == 0
+    for data in _payloads(repo):
+        zlib.decompress(data)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from typing import Dict, List
+
+import pytest
+
+from gait.context import (
+    DEFAULT_REPLY_RESERVE,
+    TRUNCATED_MARK,
+    assemble_context,
+    context_budget,
+    context_window_for,
+    message_tokens,
+    pin_tokens,
+)
+
+
+def _history(n: int) -> List[Dict[str, str]]:
+    out = []
+    for i in range(n):
+        out.append({"role": "user", "content": f"question {i} " + "word " * 20})
+        out.append({"role": "assistant", "content": f"answer {i} " + "word " * 20})
+    out.append({"role": "user", "content": "the new question"})
+    return out
+
+
+def _pin(i: int, words: int) -> Dict[str, object]:
+    return {"index": i, "note": "", "user_text": f"pin {i}", "assistant_text": "word " * words}
+
+
+@pytest.mark.parametrize(
+    "model, window",
+    [
+        ("gpt-5.1", 400000),
+        ("gemini-3-pro-preview", 1000000),
+        ("models/gemini-2.5-flash", 1000000),
+        ("claude-sonnet-4-5", 200000),
+        ("gpt-4", 8192),
+    ],
+)
+def test_known_models_get_their_window(model, window):
+    assert context_window_for(model) == window
+    assert context_budget(model) == window - DEFAULT_REPLY_RESERVE
+    assert context_budget(model, reply_tokens=100) == window - 100
+
+
+def test_unknown_models_are_not_limited():
+    assert context_window_for("some-local-finetune") is None
+    assert context_budget("some-local-finetune") == 0
+    assert context_budget("some-local-finetune", override=5000) == 5000 - DEFAULT_REPLY_RESERVE
+    assert context_budget("gpt-5.1", override=0) == 0
+
+
+def test_no_budget_sends_everything():
+    history = _history(50)
+    pins = [_pin(i, 200) for i in range(1, 6)]
+    ctx = assemble_context(history=history, pins=pins, system="be brief", budget=0)
+
+    assert ctx.messages[-1] == history[-1]
+    assert ctx.turns_kept == ctx.turns_total == 100
+    assert ctx.pins_kept == ctx.pins_total == 5
+    assert not ctx.trimmed and not ctx.over_budget
+
+
+def test_history_is_trimmed_oldest_first_and_never_opens_on_a_reply():
+    history = _history(50)
+    per_pair = message_tokens(history[0]) + message_tokens(history[1])
+    fixed = message_tokens(history[-1])
+    # room for three pairs and half of a fourth
+    budget = fixed + 3 * per_pair + per_pair // 2
+
+    ctx = assemble_context(history=history, budget=budget)
+
+    assert ctx.trimmed and not ctx.over_budget
+    assert ctx.tokens <= budget
+    assert ctx.messages[0]["role"] == "user"
+    assert ctx.messages == history[-7:]  # the newest three pairs, whole
+    assert ctx.turns_kept == 6
+
+
+def test_pins_fill_in_order_then_truncate_then_omit():
+    history = _history(0)
+    pins = [_pin(i, 300) for i in range(1, 5)]
+    one = pin_tokens(pins[0]) + 1
+    budget = message_tokens(history[-1]) + 2 * one + one // 2 + 50
+
+    ctx = assemble_context(history=history, pins=pins, budget=budget)
+    content = ctx.messages[0]["content"]
+
+    assert ctx.messages[0]["role"] == "system"
+    assert ctx.pins_kept == 3 and ctx.truncated == 1 and ctx.trimmed
+    assert "PIN 1" in content and "PIN 2" in content and "PIN 3" in content
+    assert "PIN 4" not in content
+    assert TRUNCATED_MARK in content
+    assert ctx.tokens <= budget
+
+
+def test_pins_with_token_counts_are_costed_without_encoding():
+    pin = dict(_pin(1, 3), token_counts={"input_total": 5000, "output_total": 7000})
+    assert pin_tokens(pin) > 12000
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import os
+import socket
+import stat
+import time
+from pathlib import Path
+
+import pytest
+
+from gait import daemon
+from gait.repo import GaitRepo
+from gait.schema import Turn
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> GaitRepo:
+    root = tmp_path / "r"
+    root.mkdir()
+    r = GaitRepo(root=root)
+    r.init()
+    r.record_turn(Turn.v0(user_text="hello", assistant_text="hi"))
+    return r
+
+
+def _stop(d: daemon.GaitDaemon) -> None:
+    # serve_forever closes the socket (and removes the file) once it sees the stop
+    d.shutdown()
+    deadline = time.monotonic() + 5
+    while d.path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not d.path.exists()
+
+
+@pytest.fixture
+def running(repo: GaitRepo, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("GAIT_NO_DAEMON", raising=False)
+    d = daemon.serve_in_thread(repo)
+    yield d
+    if d.path.exists():
+        _stop(d)
+
+
+def test_ops_answer_like_in_process(repo, running, monkeypatch):
+    r = daemon.run(repo, "record_turn", user="q", assistant="a", message="via daemon")
+    assert running.requests == 1
+    assert repo.head_commit_id() == r["commit_id"]
+
+    remote = {op: daemon.run(repo, op, **args) for op, args in
+              [("status", {}), ("log", {"limit": 5}), ("show", {"oid": r["commit_id"][:8]})]}
+    assert running.requests == 4
+    assert daemon.run(repo, "ping")["pid"] == os.getpid()
+
+    monkeypatch.setenv("GAIT_NO_DAEMON", "1")
+    assert daemon.connect(repo.gait_dir) is None
+    for op, args in [("status", {}), ("log", {"limit": 5}), ("show", {"oid": r["commit_id"][:8]})]:
+        assert daemon.run(repo, op, **args) == remote[op]
+    assert running.requests == 5  # the ping; nothing else reached the daemon
+
+
+def test_errors_keep_their_type(repo, running):
+    with daemon.connect(repo.gait_dir) as c:
+        with pytest.raises(FileNotFoundError):
+            c.call("show", oid="ffffffff")
+        with pytest.raises(ValueError, match="Unknown op"):
+            c.call("rm_rf")
+        with pytest.raises(ValueError, match="record_turn needs"):
+            c.call("record_turn", user=1)
+        # the connection is still usable after errors
+        assert c.call("status")["head"] == repo.head_commit_id()
+
+
+def test_socket_is_private_from_the_moment_it_exists(repo, monkeypatch):
+    modes = []
+    bind = socket.socket.bind
+
+    def recording_bind(self, address):
+        bind(self, address)
+        if isinstance(address, str):
+            modes.append(stat.S_IMODE(os.stat(address).st_mode))
+
+    monkeypatch.setattr(socket.socket, "bind", recording_bind)
+    d = daemon.GaitDaemon(repo)
+    d.bind()
+    try:
+        assert modes and modes[0] & 0o077 == 0
+    finally:
+        d.close()
+    assert not d.path.exists()
+
+
+def test_one_daemon_per_repo_and_stale_sockets_are_replaced(repo, running):
+    with pytest.raises(RuntimeError, match="already running"):
+        daemon.GaitDaemon(repo).bind()
+
+    _stop(running)
+    # a socket file left behind by a daemon that died
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    s.bind(str(daemon.socket_path(repo.gait_dir)))
+    s.close()
+    assert daemon.connect(repo.gait_dir) is None
+
+    d = daemon.serve_in_thread(repo)
+    try:
+        assert daemon.run(repo, "status")["head"] == repo.head_commit_id()
+    finally:
+        _stop(d)
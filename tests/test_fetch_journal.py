@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from gait import remote as gait_remote
+from gait import server as gait_server
+from gait.objects import has_object, iter_object_ids
+from gait.remote import RemoteSpec, TransferStats, clone_into, create_repo, fetch, push
+from gait.repo import GaitRepo
+from gait.schema import Turn
+from gait.verify import verify_repo
+
+
+@pytest.fixture(params=[True, False], ids=["batch", "per-object"])
+def remote(request, tmp_path):
+    srv = gait_server.serve_in_thread(tmp_path / "srv", port=0, batch=request.param)
+    spec = RemoteSpec(base_url=srv.url, owner="o", repo="r")
+    create_repo(spec, token="")
+    src = GaitRepo(root=tmp_path / "src")
+    src.root.mkdir()
+    src.init()
+    for i in range(30):
+        src.record_turn(Turn.v0(user_text=f"q{i}", assistant_text=f"a{i}"))
+    push(src, spec, token="")
+    yield src, spec
+    srv.shutdown()
+    srv.server_close()
+
+
+def _empty_repo(root) -> GaitRepo:
+    repo = GaitRepo(root=root)
+    root.mkdir()
+    repo.init()
+    return repo
+
+
+def _interrupt_after(monkeypatch: pytest.MonkeyPatch, n: int) -> None:
+    """
+    Drop the connection after n objects have been journaled.
+    """
+    record = gait_remote._FetchJournal.record
+    count = [0]
+
+    def flaky(self, oid, obj):
+        record(self, oid, obj)
+        count[0] += 1
+        if count[0] == n:
+            raise ConnectionResetError("peer went away")
+
+    monkeypatch.setattr(gait_remote._FetchJournal, "record", flaky)
+
+
+def test_an_interrupted_fetch_resumes_where_it_stopped(tmp_path, remote, monkeypatch):
+    src, spec = remote
+    repo = _empty_repo(tmp_path / "dst")
+    total = len(set(iter_object_ids(src.objects_dir)))
+
+    with monkeypatch.context() as m:
+        _interrupt_after(m, 25)
+        with pytest.raises((RuntimeError, ConnectionResetError)):
+            fetch(repo, spec, token="")
+    journal = repo.gait_dir / "fetch-journal"
+    assert json.loads(journal.read_text(encoding="utf-8").splitlines()[0])["remote"] == "origin"
+    # nothing points at the partial download yet
+    assert not (repo.refs_dir / "remotes" / "origin" / "main").exists()
+    kept = len(set(iter_object_ids(repo.objects_dir)))
+    assert kept >= 24
+
+    stats = TransferStats()
+    heads, _ = fetch(repo, spec, token="", stats=stats)
+    assert not journal.exists()
+    assert stats.objects <= total - kept + 1  # the object in flight is fetched again
+    assert repo.read_ref("remotes/origin/main") == heads["main"] == src.head_commit_id()
+    assert set(iter_object_ids(src.objects_dir)) <= set(iter_object_ids(repo.objects_dir))
+    assert verify_repo(repo)["ok"]
+
+
+def test_an_interrupted_clone_can_be_fetched_to_completion(tmp_path, remote, monkeypatch):
+    src, spec = remote
+    with monkeypatch.context() as m:
+        _interrupt_after(m, 10)
+        with pytest.raises((RuntimeError, ConnectionResetError)):
+            clone_into(tmp_path / "clone", spec, token="")
+
+    clone = GaitRepo(root=tmp_path / "clone")
+    fetch(clone, spec, token="")
+    tip = clone.read_ref("remotes/origin/main")
+    assert tip == src.head_commit_id()
+    assert all(has_object(clone.objects_dir, t) for t in clone.get_commit(tip)["turn_ids"])
+
+
+def test_a_journal_from_another_remote_is_ignored(tmp_path, remote):
+    src, spec = remote
+    repo = _empty_repo(tmp_path / "dst")
+    journal = repo.gait_dir / "fetch-journal"
+    journal.write_text(json.dumps({"remote": "elsewhere"}) + "\nq " + "ab" * 32 + "\n", encoding="utf-8")
+
+    fetch(repo, spec, token="")
+    assert not journal.exists()
+    assert not has_object(repo.objects_dir, "ab" * 32)
+    assert repo.read_ref("remotes/origin/main") == src.head_commit_id()
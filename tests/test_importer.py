@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import pytest
+
+from gait.importer import iter_file_turns, iter_turns
+from gait.repo import GaitRepo
+from gait.verify import verify_repo
+
+
+def _lines(*objs: Dict[str, Any]) -> List[str]:
+    return [json.dumps(o) for o in objs]
+
+
+def _pairs(turns) -> List[tuple]:
+    return [(t.user["text"], t.assistant["text"]) for t in turns]
+
+
+def test_each_line_format_becomes_turns():
+    lines = _lines(
+        {"user": "gait q", "assistant": "gait a", "model": {"provider": "x"}},
+        {"messages": [
+            {"role": "system", "content": "sys"},
+            {"role": "user", "content": [{"type": "text", "text": "conv q"}]},
+            {"role": "assistant", "content": "conv a"},
+        ], "model": "m1"},
+        {"role": "user", "content": "line q"},
+        {"role": "assistant", "content": "line a"},
+        {"role": "user", "content": "unanswered"},
+    )
+    turns = list(iter_turns(lines, source="t.jsonl"))
+
+    assert _pairs(turns) == [("gait q", "gait a"), ("conv q", "conv a"), ("line q", "line a"), ("unanswered", "")]
+    assert turns[0].model == {"provider": "x"}
+    assert turns[1].context["system"] == "sys" and turns[1].model == {"model": "m1"}
+    assert turns[2].context["import"] == {"source": "t.jsonl", "line": 3}
+
+
+def test_system_prompts_stay_with_their_conversation():
+    lines = _lines(
+        {"messages": [{"role": "system", "content": "first doc"}, {"role": "user", "content": "a"}, {"role": "assistant", "content": "b"}]},
+        {"messages": [{"role": "user", "content": "c"}, {"role": "assistant", "content": "d"}]},
+        # one message per line: a system message after a reply starts a new conversation
+        {"role": "system", "content": "stream one"},
+        {"role": "user", "content": "e"},
+        {"role": "assistant", "content": "f"},
+        {"role": "user", "content": "g"},
+        {"role": "assistant", "content": "h"},
+        {"role": "system", "content": "stream two"},
+        {"role": "user", "content": "i"},
+        {"role": "assistant", "content": "j"},
+        # ... and so does a new conversation id, system prompt or not
+        {"role": "user", "content": "k", "conversation_id": "c2"},
+        {"role": "assistant", "content": "l", "conversation_id": "c2"},
+    )
+    systems = [t.context.get("system") for t in iter_turns(lines)]
+    assert systems == ["first doc", None, "stream one", "stream one", "stream two", None]
+
+
+def test_a_new_conversation_id_flushes_an_unanswered_question():
+    lines = _lines(
+        {"role": "user", "content": "q1", "conversation_id": "a"},
+        {"role": "user", "content": "q2", "conversation_id": "b"},
+        {"role": "assistant", "content": "a2", "conversation_id": "b"},
+    )
+    turns = list(iter_turns(lines))
+    assert _pairs(turns) == [("q1", ""), ("q2", "a2")]
+    assert turns[1].context["import"]["conversation"] == "b"
+
+
+def test_created_at_is_normalized_to_local_time():
+    moment = datetime(2024, 5, 6, 7, 8, 9, tzinfo=timezone.utc)
+    local = moment.astimezone().strftime("%Y-%m-%dT%H:%M:%S")
+    lines = _lines(
+        {"user": "a", "assistant": "b", "created_at": "2024-05-06T07:08:09Z"},
+        {"user": "a", "assistant": "b", "created_at": moment.timestamp()},
+        {"user": "a", "assistant": "b", "created_at": int(moment.timestamp() * 1000)},
+        {"user": "a", "assistant": "b", "created_at": str(int(moment.timestamp()))},
+        {"user": "a", "assistant": "b", "created_at": "2024-05-06 07:08:09"},
+    )
+    stamps = [t.created_at for t in iter_turns(lines)]
+    assert stamps[:4] == [local] * 4
+    assert stamps[4] == "2024-05-06T07:08:09"
+
+
+@pytest.mark.parametrize("bad", ["yesterday", "2024-13-01", True])
+def test_bad_created_at_names_the_line(bad):
+    lines = _lines({"user": "a", "assistant": "b"}, {"user": "a", "assistant": "b", "created_at": bad})
+    with pytest.raises(ValueError, match=r"t\.jsonl:2: unrecognized created_at"):
+        list(iter_turns(lines, source="t.jsonl"))
+
+
+def test_bad_lines_are_rejected():
+    with pytest.raises(ValueError, match="invalid JSON"):
+        list(iter_turns(["{"]))
+    with pytest.raises(ValueError, match="unrecognized transcript line"):
+        list(iter_turns(_lines({"foo": 1})))
+    with pytest.raises(ValueError, match="expected user/assistant"):
+        list(iter_turns(_lines({"role": "user", "content": "x"}), fmt="gait"))
+
+
+def test_import_records_one_commit_per_turn(tmp_path):
+    src = tmp_path / "chat.jsonl"
+    src.write_text("\n".join(_lines(*({"user": f"q{i}", "assistant": f"a{i}"} for i in range(50)))) + "\n")
+    repo = GaitRepo(root=tmp_path / "r")
+    (tmp_path / "r").mkdir()
+    repo.init()
+
+    r = repo.record_turns(iter_file_turns(str(src)), message="import")
+
+    assert r["turns"] == 50 and r["new_head"] == repo.head_commit_id()
+    commits = repo.iter_commit_ids_from_head_first_parent(limit_commits=100)
+    assert len(commits) == 50
+    assert repo.get_turn(repo.get_commit(commits[0])["turn_ids"][0])["user"]["text"] == "q49"
+    assert repo.commits_for_turn(repo.get_commit(commits[-1])["turn_ids"][0]) == [commits[-1]]
+    assert verify_repo(repo)["ok"]
+
+    # an import that fails part way leaves the branch where it was
+    src.write_text("\n".join(_lines({"user": "x", "assistant": "y"})) + "\n{broken\n")
+    with pytest.raises(ValueError):
+        repo.record_turns(iter_file_turns(str(src)))
+    assert repo.head_commit_id() == r["new_head"]
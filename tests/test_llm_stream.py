@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator, List
+
+import pytest
+
+from gait.llm import (
+    ChatStream,
+    anthropic_chat_stream,
+    gemini_chat_stream,
+    ollama_chat_stream,
+    openai_compat_chat_stream,
+)
+from gait.respcache import ResponseCache
+
+# ---------------------------------------------------------------------
+# A local fake provider serving canned streams in each provider's wire
+# format. The model name picks the script:
+#   ok     five text chunks, then the provider's usage/done event
+#   error  two chunks, then the provider's in-band error event
+#   drop   two chunks, then the connection closes mid-body
+# ---------------------------------------------------------------------
+
+WORDS = ["Hello", " there", ",", " friend", "."]
+FIRST_DELAY = 0.05
+DELAY = 0.01
+
+
+def _ndjson(obj: dict) -> bytes:
+    return json.dumps(obj).encode("utf-8") + b"\n"
+
+
+def _sse(obj: dict, event: str = "") -> bytes:
+    head = f"event: {event}\n".encode("utf-8") if event else b""
+    return head + b"data: " + json.dumps(obj).encode("utf-8") + b"\n\n"
+
+
+def _ollama(words: List[str], error: bool) -> Iterator[bytes]:
+    for w in words:
+        yield _ndjson({"message": {"content": w}, "done": False})
+    if error:
+        yield _ndjson({"error": "model crashed"})
+    else:
+        yield _ndjson({"message": {"content": ""}, "done": True, "eval_count": len(words)})
+
+
+def _openai(words: List[str], error: bool) -> Iterator[bytes]:
+    for w in words:
+        yield _sse({"choices": [{"delta": {"content": w}}]})
+    if error:
+        yield _sse({"error": {"message": "overloaded"}})
+        return
+    yield _sse({"choices": [], "usage": {"completion_tokens": len(words)}})
+    yield b"data: [DONE]\n\n"
+
+
+def _gemini(words: List[str], error: bool) -> Iterator[bytes]:
+    for i, w in enumerate(words):
+        yield _sse({"candidates": [{"content": {"parts": [{"text": w}]}}], "usageMetadata": {"candidatesTokenCount": i + 1}})
+    if error:
+        yield _sse({"error": {"code": 500, "message": "internal"}})
+
+
+def _anthropic(words: List[str], error: bool) -> Iterator[bytes]:
+    yield _sse({"type": "message_start"}, "message_start")
+    for w in words:
+        yield _sse({"type": "content_block_delta", "delta": {"type": "text_delta", "text": w}}, "content_block_delta")
+    if error:
+        yield _sse({"type": "error", "error": {"type": "overloaded_error"}}, "error")
+        return
+    yield _sse({"type": "message_delta", "usage": {"output_tokens": len(words)}}, "message_delta")
+    yield _sse({"type": "message_stop"}, "message_stop")
+
+
+class _FakeProvider(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests: List[str] = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def _chunk(self, data: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_POST(self) -> None:
+        n = int(self.headers.get("Content-Length") or 0)
+        req = json.loads(self.rfile.read(n) or b"{}")
+        _FakeProvider.requests.append(self.path)
+
+        if self.path.startswith("/api/chat"):
+            script, model = _ollama, req.get("model")
+        elif self.path.endswith("/chat/completions"):
+            script, model = _openai, req.get("model")
+        elif ":streamGenerateContent" in self.path:
+            script, model = _gemini, self.path.split("/models/", 1)[1].split(":", 1)[0]
+        elif self.path.endswith("/v1/messages"):
+            script, model = _anthropic, req.get("model")
+        else:
+            self.send_error(404)
+            return
+
+        words = WORDS if model == "ok" else WORDS[:2]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        time.sleep(FIRST_DELAY)
+        for piece in script(words, model == "error"):
+            self._chunk(piece)
+            time.sleep(DELAY)
+        if model == "drop":
+            self.close_connection = True
+            return
+        self.wfile.write(b"0\r\n\r\n")
+
+
+@pytest.fixture(scope="module")
+def provider_url() -> Iterator[str]:
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _FakeProvider)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def _open(provider: str, url: str, model: str, **kwargs) -> ChatStream:
+    messages = [{"role": "system", "content": "be brief"}, {"role": "user", "content": "hi"}]
+    if provider == "ollama":
+        return ollama_chat_stream(url, model, messages, **kwargs)
+    if provider == "openai_compat":
+        return openai_compat_chat_stream(url, model, messages, **kwargs)
+    if provider == "gemini":
+        return gemini_chat_stream(model, messages, api_key="k", base_url=url, **kwargs)
+    return anthropic_chat_stream(model, messages, api_key="k", base_url=url, **kwargs)
+
+
+PROVIDERS = ["ollama", "openai_compat", "gemini", "anthropic"]
+
+
+@pytest.mark.parametrize("provider", PROVIDERS)
+def test_stream_assembles_text_and_metrics(provider_url, provider):
+    stream = _open(provider, provider_url, "ok")
+    chunks = list(stream)
+
+    assert chunks == WORDS
+    assert stream.text == "Hello there, friend."
+    assert stream.output_tokens == len(WORDS)
+    assert stream.ttft is not None and stream.ttft >= FIRST_DELAY * 0.8
+    assert stream.latency is not None and stream.latency > stream.ttft
+
+    m = stream.metrics()
+    assert m["stream"] is True and "cache" not in m
+    assert m["output_tokens"] == len(WORDS)
+    assert m["tokens_per_sec"] > 0
+    assert m["ttft_ms"] <= m["latency_ms"]
+
+
+@pytest.mark.parametrize("provider", PROVIDERS)
+@pytest.mark.parametrize("failure", ["error", "drop"])
+def test_mid_stream_failure_raises_after_partial_text(provider_url, provider, failure):
+    stream = _open(provider, provider_url, failure)
+    received: List[str] = []
+    with pytest.raises(RuntimeError):
+        for chunk in stream:
+            received.append(chunk)
+
+    assert received == WORDS[:2]
+    # what arrived before the failure is still reported
+    assert stream.text == "Hello there"
+    assert stream.ttft is not None
+
+
+@pytest.mark.parametrize("provider", PROVIDERS)
+def test_cache_hit_replays_without_a_request(provider_url, provider, tmp_path):
+    cache = ResponseCache(tmp_path)
+    first = _open(provider, provider_url, "ok", cache=cache)
+    assert "".join(first) == "Hello there, friend."
+    assert first.cached is False and first.metrics()["cache"] == "miss"
+
+    sent = len(_FakeProvider.requests)
+    second = _open(provider, provider_url, "ok", cache=cache)
+    assert "".join(second) == "Hello there, friend."
+    assert len(_FakeProvider.requests) == sent
+    assert second.cached is True and cache.hits == 1
+
+    m = second.metrics(output_tokens=len(WORDS))
+    assert m["cache"] == "hit"
+    assert "tokens_per_sec" not in m
+
+
+@pytest.mark.parametrize("provider", PROVIDERS)
+def test_failed_stream_is_not_cached(provider_url, provider, tmp_path):
+    cache = ResponseCache(tmp_path)
+    with pytest.raises(RuntimeError):
+        list(_open(provider, provider_url, "error", cache=cache))
+
+    sent = len(_FakeProvider.requests)
+    with pytest.raises(RuntimeError):
+        list(_open(provider, provider_url, "error", cache=cache))
+    assert len(_FakeProvider.requests) == sent + 1
+    assert cache.hits == 0
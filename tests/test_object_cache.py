@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from gait.cache import LRUCache, object_cache_from_env
+from gait.repo import GaitRepo
+from gait.schema import Turn
+
+
+def _repo(root: Path, n: int = 3) -> GaitRepo:
+    repo = GaitRepo(root=root)
+    root.mkdir()
+    repo.init()
+    for i in range(n):
+        repo.record_turn(Turn.v0(user_text=f"q{i}", assistant_text=f"a{i}", model={"provider": "p", "model": "m"}))
+    return repo
+
+
+def test_edits_to_returned_objects_do_not_reach_the_cache(tmp_path):
+    repo = _repo(tmp_path / "r")
+    head = repo.head_commit_id()
+    commit = repo.get_commit(head)
+    turn_id = commit["turn_ids"][0]
+
+    turn = repo.get_turn(turn_id)
+    turn["model"]["model"] = "edited"
+    turn["context"].setdefault("note", "edited")
+    turn["user"]["text"] = "edited"
+    commit["parents"].append("0" * 64)
+
+    again = repo.get_turn(turn_id)
+    assert again["model"] == {"provider": "p", "model": "m"}
+    assert "note" not in again["context"] and again["user"]["text"] == "q2"
+    assert "0" * 64 not in repo.get_commit(head)["parents"]
+    assert repo.cache_stats()["hits"] >= 2
+
+
+def test_repeated_reads_are_served_from_the_cache(tmp_path):
+    repo = _repo(tmp_path / "r")
+    head = repo.head_commit_id()
+    repo.get_commit(head)
+    before = repo.cache_stats()
+    for _ in range(10):
+        repo.get_commit(head[:8])
+    after = repo.cache_stats()
+    assert after["hits"] - before["hits"] == 10
+    assert after["misses"] == before["misses"]
+
+
+def test_lru_is_bounded_by_entries_and_bytes():
+    c: LRUCache[bytes] = LRUCache(max_entries=3, max_bytes=100)
+    for k in "abc":
+        c.put(k, k.encode(), 10)
+    c.get("a")  # most recent now
+    c.put("d", b"d", 10)
+    assert c.get("b") is None and c.get("a") == b"a"
+    assert c.stats()["evictions"] == 1
+
+    c.put("big", b"x", 80)
+    assert c.stats()["bytes"] <= 100 and c.get("big") == b"x"
+    c.put("huge", b"y", 101)  # larger than the whole cache: not kept
+    assert c.get("huge") is None
+
+
+def test_cache_limits_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("GAIT_OBJECT_CACHE_ENTRIES", "0")
+    c = object_cache_from_env()
+    c.put("a", b"a", 1)
+    assert len(c) == 0
+
+    monkeypatch.setenv("GAIT_OBJECT_CACHE_ENTRIES", "10")
+    monkeypatch.setenv("GAIT_OBJECT_CACHE_MB", "0.5")
+    c = object_cache_from_env()
+    assert c.max_entries == 10 and c.max_bytes == 512 * 1024
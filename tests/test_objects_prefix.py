@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from gait.objects import (
+    canonical_json_bytes,
+    encode_payload,
+    fanout_path,
+    repack_objects,
+    resolve_prefix,
+    sha256_hex,
+    store_object,
+)
+
+
+def _store(objects_dir: Path, n: int) -> List[str]:
+    return [store_object(objects_dir, {"schema": "test", "i": i}) for i in range(n)]
+
+
+def _unique_prefix(oid: str, others: List[str]) -> str:
+    for k in range(1, 64):
+        p = oid[:k]
+        if not any(o != oid and o.startswith(p) for o in others):
+            return p
+    return oid
+
+
+def _shared_prefix(oids: List[str]) -> str:
+    firsts = [o[0] for o in oids]
+    return next(c for c in firsts if firsts.count(c) > 1)
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_short_prefixes_resolve_from_the_index(tmp_path, packed):
+    objects_dir = tmp_path / "objects"
+    oids = _store(objects_dir, 40)
+    if packed:
+        repack_objects(objects_dir)
+        assert not any(fanout_path(objects_dir, o).exists() for o in oids)
+
+    for oid in oids:
+        p = _unique_prefix(oid, oids)
+        assert resolve_prefix(objects_dir, p) == oid
+        assert resolve_prefix(objects_dir, oid[:12].upper()) == oid
+    # 40 objects over 16 first characters: some 1-char prefix is ambiguous
+    with pytest.raises(ValueError, match="Ambiguous"):
+        resolve_prefix(objects_dir, _shared_prefix(oids))
+    with pytest.raises(FileNotFoundError):
+        resolve_prefix(objects_dir, "zz")
+
+
+def test_files_missing_from_the_index_are_found_by_scanning(tmp_path):
+    objects_dir = tmp_path / "objects"
+    first = _store(objects_dir, 1)[0]
+    assert resolve_prefix(objects_dir, first[:8]) == first  # builds the index
+
+    # written by an older version: on disk, not in the index
+    canon = canonical_json_bytes({"schema": "test", "written": "directly"})
+    oid = sha256_hex(canon)
+    path = fanout_path(objects_dir, oid)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(encode_payload(canon))
+
+    assert resolve_prefix(objects_dir, _unique_prefix(oid, [first]).upper()) == oid
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from gait.objects import (
+    canonical_json_bytes,
+    fanout_path,
+    has_object,
+    iter_loose_oids,
+    iter_object_ids,
+    read_object_bytes,
+    repack_objects,
+    sha256_hex,
+    store_object,
+)
+from gait.pack import PackIndex, PackWriter, load_packs, pack_dir, write_pack
+from gait.repo import GaitRepo
+from gait.schema import Turn
+from gait.verify import verify_repo
+
+
+def _objects(n: int):
+    for i in range(n):
+        canon = canonical_json_bytes({"schema": "test", "i": i})
+        yield sha256_hex(canon), canon
+
+
+def test_pack_index_finds_every_entry(tmp_path):
+    objects_dir = tmp_path / "objects"
+    items = dict(_objects(500))
+    path = write_pack(objects_dir, items.items())
+
+    idx = PackIndex(path.with_suffix(".idx"))
+    assert len(idx) == 500
+    assert list(idx.iter_oids()) == sorted(items)
+    for oid, canon in items.items():
+        assert idx.read(oid) == canon
+    assert idx.find("0" * 64) is None and idx.find("not hex") is None
+    assert dict(idx.iter_payloads()) == items
+    idx.close()
+
+
+def test_pack_name_is_stable_and_nothing_shows_before_commit(tmp_path):
+    objects_dir = tmp_path / "objects"
+    items = list(_objects(20))
+
+    w = PackWriter(objects_dir)
+    for oid, canon in items:
+        w.add(oid, canon)
+        w.add(oid, canon)  # duplicates are written once
+    assert len(w) == 20
+    assert load_packs(objects_dir) == []
+    first = w.commit()
+
+    # same objects, same bytes, another order: same pack
+    assert write_pack(objects_dir, reversed(items)) is not None
+    assert [p.pack_path for p in load_packs(objects_dir)] == [first]
+    assert sorted(pack_dir(objects_dir).iterdir()) == [first.with_suffix(".idx"), first]
+
+    w = PackWriter(objects_dir)
+    w.add(*items[0])
+    w.abort()
+    assert PackWriter(objects_dir).commit() is None
+    assert sorted(pack_dir(objects_dir).iterdir()) == [first.with_suffix(".idx"), first]
+
+
+def test_repack_moves_loose_objects_into_one_pack(tmp_path):
+    objects_dir = tmp_path / "objects"
+    loose = [store_object(objects_dir, {"schema": "test", "i": i}) for i in range(30)]
+    write_pack(objects_dir, list(_objects(40))[20:])  # overlaps the loose set, plus ten more
+    before = set(iter_object_ids(objects_dir))
+    assert len(before) == 40
+
+    stats = repack_objects(objects_dir)
+
+    assert stats["objects"] == 40 and stats["loose_pruned"] == 30 and stats["packs_replaced"] == 1
+    assert len(load_packs(objects_dir)) == 1
+    assert list(iter_loose_oids(objects_dir)) == []
+    assert not any(fanout_path(objects_dir, o).parent.exists() for o in loose)
+    assert set(iter_object_ids(objects_dir)) == before
+    for oid in before:
+        assert has_object(objects_dir, oid)
+        assert sha256_hex(read_object_bytes(objects_dir, oid)) == oid
+
+
+def test_repack_can_keep_loose_objects(tmp_path):
+    objects_dir = tmp_path / "objects"
+    loose = [store_object(objects_dir, {"schema": "test", "i": i}) for i in range(5)]
+    stats = repack_objects(objects_dir, prune_loose=False)
+    assert stats["loose_pruned"] == 0
+    assert sorted(iter_loose_oids(objects_dir)) == sorted(loose)
+    assert all(load_packs(objects_dir)[0].find(o) for o in loose)
+
+
+def test_unreadable_indexes_are_skipped(tmp_path):
+    objects_dir = tmp_path / "objects"
+    good = write_pack(objects_dir, _objects(3))
+    bad = pack_dir(objects_dir) / "pack-bad.idx"
+    bad.write_bytes(b"junk")
+    bad.with_suffix(".pack").write_bytes(b"junk")
+    assert [p.pack_path for p in load_packs(objects_dir)] == [good]
+
+
+def test_repo_reads_through_packs(tmp_path):
+    root = tmp_path / "r"
+    root.mkdir()
+    repo = GaitRepo(root=root)
+    repo.init()
+    for i in range(10):
+        repo.record_turn(Turn.v0(user_text=f"q{i}", assistant_text=f"a{i}"))
+    head = repo.head_commit_id()
+
+    assert repo.repack()["objects"] > 0
+    repo = GaitRepo(root=root)  # nothing cached
+    commit = repo.get_commit(head[:10])
+    assert repo.get_turn(commit["turn_ids"][0])["user"]["text"] == "q9"
+    assert verify_repo(repo)["ok"]
+
+    # new turns go loose next to the pack and are still found
+    repo.record_turn(Turn.v0(user_text="after", assistant_text="repack"))
+    assert fanout_path(repo.objects_dir, repo.head_commit_id()).exists()
+    assert repo.get_commit(repo.head_commit_id())["parents"] == [head]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import pytest
+
+from gait import server as gait_server
+from gait.objects import has_object
+from gait.remote import RemoteSpec, clone_into, create_repo, pull, push
+from gait.repo import GaitRepo
+from gait.schema import Turn
+from gait.verify import verify_repo
+
+
+@pytest.fixture
+def requests_log(monkeypatch: pytest.MonkeyPatch) -> List[Tuple[str, str, int]]:
+    log: List[Tuple[str, str, int]] = []
+    orig = gait_server._Handler.send_response
+
+    def send_response(self, code, message=None):
+        log.append((self.command, self.path, code))
+        return orig(self, code, message)
+
+    monkeypatch.setattr(gait_server._Handler, "send_response", send_response)
+    return log
+
+
+@pytest.fixture(params=[True, False], ids=["batch", "per-object"])
+def remote(request, tmp_path):
+    srv = gait_server.serve_in_thread(tmp_path / "srv", port=0, batch=request.param)
+    spec = RemoteSpec(base_url=srv.url, owner="o", repo="r")
+    create_repo(spec, token="")
+    src = GaitRepo(root=tmp_path / "src")
+    src.root.mkdir()
+    src.init()
+    for i in range(8):
+        src.record_turn(Turn.v0(user_text=f"q{i}", assistant_text=f"a{i}"))
+    push(src, spec, token="")
+    yield src, spec, request.param
+    srv.shutdown()
+    srv.server_close()
+
+
+def _turn_ids(repo: GaitRepo) -> List[str]:
+    return [t for c in repo.iter_commit_ids_from_head_first_parent(limit_commits=100)
+            for t in repo.get_commit(c)["turn_ids"]]
+
+
+def test_partial_clone_leaves_turns_on_the_remote_until_read(tmp_path, remote, requests_log):
+    src, spec, _ = remote
+    clone_into(tmp_path / "clone", spec, token="", partial=True)
+    clone = GaitRepo(root=tmp_path / "clone")
+
+    assert clone.promisor() == {"remote": "origin", "owner": "o", "repo": "r"}
+    assert clone.head_commit_id() == src.head_commit_id()
+    turn_ids = _turn_ids(clone)
+    assert len(turn_ids) == 8
+    assert not any(has_object(clone.objects_dir, t) for t in turn_ids)
+    assert verify_repo(clone)["ok"]
+
+    # one turn on demand
+    requests_log.clear()
+    assert clone.get_turn(turn_ids[0])["user"]["text"] == "q7"
+    assert has_object(clone.objects_dir, turn_ids[0])
+    assert requests_log
+
+    # a history read fetches what it is missing up front, then stays local
+    requests_log.clear()
+    turns = clone.iter_turns_from_head(limit_turns=8)
+    assert [t["assistant"]["text"] for t in turns] == [f"a{i}" for i in range(8)]
+    assert all(has_object(clone.objects_dir, t) for t in turn_ids)
+
+    requests_log.clear()
+    clone.iter_turns_from_head(limit_turns=8)
+    assert requests_log == []
+
+
+def test_prefetch_batches_when_the_server_can(tmp_path, remote, requests_log):
+    src, spec, batch = remote
+    clone_into(tmp_path / "clone", spec, token="", partial=True)
+    clone = GaitRepo(root=tmp_path / "clone")
+    requests_log.clear()
+    clone.iter_turns_from_head(limit_turns=8)
+    paths = [path for _, path, _ in requests_log]
+    if batch:
+        assert len(paths) == 1 and paths[0].endswith("/objects/fetch-pack")
+    else:
+        # an older server: the fetch-pack probe, then one GET per turn
+        assert len([p for p in paths if "/objects/" in p and not p.endswith("/fetch-pack")]) == 8
+
+
+def test_later_fetches_stay_partial(tmp_path, remote):
+    src, spec, _ = remote
+    clone_into(tmp_path / "clone", spec, token="", partial=True)
+    clone = GaitRepo(root=tmp_path / "clone")
+
+    src.record_turn(Turn.v0(user_text="new", assistant_text="turn"))
+    push(src, spec, token="")
+    pull(clone, spec, token="")
+
+    assert clone.head_commit_id() == src.head_commit_id()
+    new_turn = clone.get_commit(clone.head_commit_id())["turn_ids"][0]
+    assert not has_object(clone.objects_dir, new_turn)
+    assert clone.get_turn(new_turn)["user"]["text"] == "new"
+
+
+def test_a_full_clone_is_not_a_promisor(tmp_path, remote):
+    src, spec, _ = remote
+    clone_into(tmp_path / "clone", spec, token="")
+    clone = GaitRepo(root=tmp_path / "clone")
+    assert clone.promisor() is None
+    assert all(has_object(clone.objects_dir, t) for t in _turn_ids(clone))
+    assert clone.prefetch(["0" * 64]) == 0
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from gait import remote as gait_remote
+from gait import server as gait_server
+from gait.remote import HTTPStatusError, RemoteClient, RemoteSpec, clone_into, create_repo, fetch, push
+from gait.repo import GaitRepo
+from gait.schema import Turn
+
+
+def _repo_with_turns(root: Path, n: int) -> GaitRepo:
+    repo = GaitRepo(root=root)
+    root.mkdir()
+    repo.init()
+    for i in range(n):
+        repo.record_turn(Turn.v0(user_text=f"question {i}", assistant_text=f"answer {i}"))
+    return repo
+
+
+@pytest.fixture
+def requests_log(monkeypatch: pytest.MonkeyPatch) -> List[Tuple[str, str, int]]:
+    log: List[Tuple[str, str, int]] = []
+    orig = gait_server._Handler.send_response
+
+    def send_response(self, code, message=None):
+        log.append((self.command, self.path, code))
+        return orig(self, code, message)
+
+    monkeypatch.setattr(gait_server._Handler, "send_response", send_response)
+    return log
+
+
+@pytest.fixture
+def remote(tmp_path):
+    srv = gait_server.serve_in_thread(tmp_path / "srv", port=0)
+    spec = RemoteSpec(base_url=srv.url, owner="o", repo="r")
+    create_repo(spec, token="")
+    src = _repo_with_turns(tmp_path / "src", 8)
+    push(src, spec, token="")
+    yield src, spec
+    srv.shutdown()
+    srv.server_close()
+
+
+def _remote_head(spec: RemoteSpec, branch: str = "main") -> str:
+    refs, _ = RemoteClient(spec, token="").get_refs()
+    return refs["heads"].get(branch, "")
+
+
+def test_ref_update_only_applies_to_the_expected_value(remote):
+    src, spec = remote
+    client = RemoteClient(spec, token="")
+    log = src.iter_commit_ids_from_head_first_parent(limit_commits=10)
+
+    with pytest.raises(HTTPStatusError) as e:
+        client.put_head_ref("main", log[1], expected_old=log[2])
+    assert e.value.code == 409
+    assert _remote_head(spec) == log[0]
+
+    client.put_head_ref("main", log[1], expected_old=log[0])
+    assert _remote_head(spec) == log[1]
+    # no If-Match: unconditional
+    client.put_head_ref("main", log[0], expected_old=None)
+    assert _remote_head(spec) == log[0]
+
+    with pytest.raises(HTTPStatusError) as e:
+        client.put_head_ref("main", "f" * 64, expected_old=log[0])
+    assert e.value.code == 400
+
+
+def test_one_of_many_racing_updates_wins(remote):
+    src, spec = remote
+    log = src.iter_commit_ids_from_head_first_parent(limit_commits=10)
+    codes: List[int] = []
+    lock = threading.Lock()
+    start = threading.Barrier(len(log))
+
+    def update(oid: str) -> None:
+        client = RemoteClient(spec, token="")
+        start.wait()
+        try:
+            client.put_head_ref("race", oid, expected_old="")
+            code = 200
+        except HTTPStatusError as e:
+            code = e.code
+        with lock:
+            codes.append(code)
+
+    threads = [threading.Thread(target=update, args=(oid,)) for oid in log]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(codes) == [200] + [409] * (len(log) - 1)
+    assert _remote_head(spec, "race") in log
+
+
+def test_push_does_not_overwrite_a_concurrent_push(tmp_path, remote, monkeypatch):
+    src, spec = remote
+    clone_into(tmp_path / "other", spec, token="")
+    other = GaitRepo(root=tmp_path / "other")
+    other.record_turn(Turn.v0(user_text="from the clone", assistant_text="ok"))
+    src.record_turn(Turn.v0(user_text="from the source", assistant_text="ok"))
+
+    # the clone's push lands while the source is still uploading
+    upload = gait_remote._upload_objects
+
+    def racing_upload(*args, **kwargs):
+        upload(*args, **kwargs)
+        monkeypatch.setattr(gait_remote, "_upload_objects", upload)
+        push(other, spec, token="")
+
+    monkeypatch.setattr(gait_remote, "_upload_objects", racing_upload)
+    with pytest.raises(HTTPStatusError) as e:
+        push(src, spec, token="")
+    assert e.value.code == 409
+    assert _remote_head(spec) == other.head_commit_id()
+
+
+def test_unchanged_refs_are_answered_with_304(remote):
+    src, spec = remote
+    client = RemoteClient(spec, token="")
+    refs, etag = client.get_refs()
+    assert refs["heads"]["main"] == src.head_commit_id() and etag
+
+    assert client.get_refs(etag=etag) == (None, etag)
+    assert client.get_refs(etag='"stale"') == (refs, etag)
+
+    client.put_head_ref("other", src.head_commit_id(), expected_old="")
+    changed, new_etag = client.get_refs(etag=etag)
+    assert new_etag != etag and changed["heads"]["other"] == src.head_commit_id()
+
+
+def test_fetch_with_nothing_new_is_one_conditional_request(tmp_path, remote, requests_log):
+    src, spec = remote
+    clone_into(tmp_path / "clone", spec, token="")
+    clone = GaitRepo(root=tmp_path / "clone")
+    assert (clone.gait_dir / "remote-refs.json").exists()
+
+    requests_log.clear()
+    heads, _ = fetch(clone, spec, token="")
+    assert heads["main"] == src.head_commit_id()
+    assert [(m, code) for m, _, code in requests_log] == [("GET", 304)]
+
+    # a push moves the refs: the next fetch sees them
+    src.record_turn(Turn.v0(user_text="one more", assistant_text="ok"))
+    push(src, spec, token="")
+    requests_log.clear()
+    heads, _ = fetch(clone, spec, token="")
+    assert heads["main"] == src.head_commit_id()
+    assert requests_log[0][0] == "GET" and requests_log[0][2] == 200
+    assert clone.read_ref("remotes/origin/main") == src.head_commit_id()
+
+    # a damaged cache only costs a full /refs
+    (clone.gait_dir / "remote-refs.json").write_text("{", encoding="utf-8")
+    requests_log.clear()
+    assert fetch(clone, spec, token="")[0] == heads
+    assert [(m, code) for m, _, code in requests_log] == [("GET", 200)]
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from gait import server as gait_server
+from gait.objects import has_object
+from gait.remote import RemoteSpec, clone_into, create_repo, fetch, pull, push
+from gait.repo import GaitRepo
+from gait.schema import Turn
+from gait.verify import verify_repo
+
+
+def _dated_repo(root: Path, days: int) -> GaitRepo:
+    """
+    One commit per day, 2024-01-01 onwards.
+    """
+    repo = GaitRepo(root=root)
+    root.mkdir()
+    repo.init()
+    repo.record_turns(
+        Turn.v0(user_text=f"q{d}", assistant_text=f"a{d}", created_at=f"2024-01-{d + 1:02d}T12:00:00")
+        for d in range(days)
+    )
+    return repo
+
+
+@pytest.fixture(params=[True, False], ids=["batch", "per-object"])
+def remote(request, tmp_path):
+    srv = gait_server.serve_in_thread(tmp_path / "srv", port=0, batch=request.param)
+    spec = RemoteSpec(base_url=srv.url, owner="o", repo="r")
+    create_repo(spec, token="")
+    src = _dated_repo(tmp_path / "src", 10)
+    push(src, spec, token="")
+    yield src, spec
+    srv.shutdown()
+    srv.server_close()
+
+
+def _log(repo: GaitRepo):
+    return repo.iter_commit_ids_from_head_first_parent(limit_commits=100)
+
+
+def test_depth_clone_stops_at_the_boundary_and_unshallow_fills_in(tmp_path, remote):
+    src, spec = remote
+    clone_into(tmp_path / "clone", spec, token="", depth=3)
+    clone = GaitRepo(root=tmp_path / "clone")
+
+    full = _log(src)
+    assert _log(clone) == full[:3]
+    assert clone.read_shallow() == {full[2]}
+    assert not has_object(clone.objects_dir, full[3])
+    assert [t["user"]["text"] for t in clone.iter_turns_from_head(limit_turns=10)] == ["q7", "q8", "q9"]
+    assert verify_repo(clone)["ok"]
+
+    fetch(clone, spec, token="", unshallow=True)
+    assert not clone.is_shallow()
+    assert _log(clone) == full
+    assert clone.commit_graph.generation(full[0]) == len(full)
+    assert clone.commit_graph.is_ancestor(full[-1], full[0])
+    assert verify_repo(clone)["ok"]
+
+
+def test_since_clone_keeps_commits_from_that_date(tmp_path, remote):
+    src, spec = remote
+    clone_into(tmp_path / "clone", spec, token="", since="2024-01-08")
+    clone = GaitRepo(root=tmp_path / "clone")
+    full = _log(src)
+    assert _log(clone) == full[:3]
+    assert clone.read_shallow() == {full[2]}
+
+
+def test_shallow_clone_keeps_up_with_new_history(tmp_path, remote):
+    src, spec = remote
+    clone_into(tmp_path / "clone", spec, token="", depth=1)
+    clone = GaitRepo(root=tmp_path / "clone")
+    boundary = clone.read_shallow()
+
+    for i in range(3):
+        src.record_turn(Turn.v0(user_text=f"new{i}", assistant_text="ok"))
+    push(src, spec, token="")
+    pull(clone, spec, token="")
+
+    # new commits connect to what the clone has; the boundary does not move
+    assert clone.head_commit_id() == src.head_commit_id()
+    assert clone.read_shallow() == boundary
+    assert len(_log(clone)) == 4
+
+    with pytest.raises(ValueError):
+        fetch(clone, spec, token="", depth=0)
+    with pytest.raises(ValueError):
+        fetch(clone, spec, token="", depth=2, unshallow=True)
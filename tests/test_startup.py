@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from gait.bench import DEFAULT_STARTUP_BUDGET_MS, _parse_importtime, run_startup_bench
+
+_SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 | encodings
+import time:       200 |        300 | site
+import time:        50 |         50 |     gait.objects
+import time:       400 |        450 |   gait.repo
+import time:       500 |       1000 | gait.cli
+import time:       250 |        250 | json
+"""
+
+
+def test_importtime_counts_from_the_first_gait_module():
+    ms, modules = _parse_importtime(_SAMPLE)
+    assert ms == 1.25
+    assert modules == ["encodings", "site", "gait.objects", "gait.repo", "gait.cli", "json"]
+
+
+def test_status_starts_within_budget():
+    st = run_startup_bench()
+    assert st["forbidden_modules"] == []
+    assert st["import_ms"] <= DEFAULT_STARTUP_BUDGET_MS, st["import_ms_all"]
+    assert st["ok"]
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from gait import repo as gait_repo
+from gait.objects import fanout_path
+from gait.repo import GaitRepo
+from gait.schema import Turn
+from gait.tokenindex import TokenIndex, token_index_path
+from gait.tokens import DEFAULT_ENCODING, count_tokens
+
+
+def _repo(root: Path) -> GaitRepo:
+    repo = GaitRepo(root=root)
+    root.mkdir()
+    repo.init()
+    return repo
+
+
+def _turn_ids(repo: GaitRepo):
+    return [t for c in repo.iter_commit_ids_from_head_first_parent(limit_commits=1000)
+            for t in repo.get_commit(c)["turn_ids"]]
+
+
+def _no_counting(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(*args, **kwargs):
+        raise AssertionError("counted again")
+
+    monkeypatch.setattr(gait_repo, "count_tokens_batch", fail)
+
+
+def test_counts_are_computed_once_then_read_from_the_index(tmp_path, monkeypatch):
+    repo = _repo(tmp_path / "r")
+    repo.record_turn(Turn.v0(user_text="the user says hello", assistant_text="hi"))
+    repo.record_turn(Turn.v0(
+        user_text="recorded", assistant_text="counts",
+        tokens={"input_total": 7, "output_total": 9, "encoding": DEFAULT_ENCODING},
+    ))
+    counted, recorded = _turn_ids(repo)[::-1]
+
+    counts = repo.turn_token_counts([counted, recorded])
+    assert counts[counted] == {"input_total": count_tokens("the user says hello"), "output_total": count_tokens("hi")}
+    # counts the turn carries are trusted when their encoding matches
+    assert counts[recorded] == {"input_total": 7, "output_total": 9}
+    assert repo.token_index.count(DEFAULT_ENCODING) == 2
+
+    _no_counting(monkeypatch)
+    assert GaitRepo(root=repo.root).turn_token_counts([recorded, counted]) == counts
+
+
+def test_encodings_are_indexed_separately(tmp_path):
+    repo = _repo(tmp_path / "r")
+    repo.record_turn(Turn.v0(
+        user_text="one two three", assistant_text="four",
+        tokens={"input_total": 100, "output_total": 100, "encoding": DEFAULT_ENCODING},
+    ))
+    tid = _turn_ids(repo)[0]
+    other = repo.turn_token_counts([tid], encoding="o200k_base")
+    assert other[tid] == {
+        "input_total": count_tokens("one two three", encoding="o200k_base"),
+        "output_total": count_tokens("four", encoding="o200k_base"),
+    }
+    assert repo.turn_token_counts([tid])[tid] == {"input_total": 100, "output_total": 100}
+    assert repo.token_index.count() == 2 and repo.token_index.count("o200k_base") == 1
+
+
+def test_backfill_covers_the_log_and_skips_what_it_cannot_read(tmp_path, monkeypatch):
+    repo = _repo(tmp_path / "r")
+    for i in range(30):
+        repo.record_turn(Turn.v0(user_text=f"question number {i}", assistant_text=f"answer {i}"))
+    ids = _turn_ids(repo)
+    fanout_path(repo.objects_dir, ids[0]).unlink()
+
+    r = repo.backfill_token_index()
+    assert r == {"turns": 30, "already_indexed": 0, "counted": 29, "unavailable": 1}
+    assert ids[0] not in repo.turn_token_counts(ids)
+
+    _no_counting(monkeypatch)
+    again = repo.backfill_token_index()
+    assert again["already_indexed"] == 29 and again["counted"] == 0
+
+
+def test_lookups_span_query_batches(tmp_path):
+    idx = TokenIndex(tmp_path)
+    counts = {f"t{i:04d}": (i, 2 * i) for i in range(1200)}
+    idx.store(counts, "enc")
+    assert idx.lookup(list(counts) + ["nope"], "enc") == counts
+    assert idx.missing(["t0001", "nope", "t1199"], "enc") == ["nope"]
+    assert idx.lookup(["t0001"], "other") == {}
+    idx.close()
+    assert token_index_path(tmp_path).exists()
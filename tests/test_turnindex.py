@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from gait.repo import GaitRepo
+from gait.schema import Turn
+from gait.turnindex import TurnIndex, index_path
+
+
+def _line(turn_id: str, commit_id: str) -> str:
+    return json.dumps({"turn_id": turn_id, "commit_id": commit_id}) + "\n"
+
+
+def _index(tmp_path: Path, text: str = "") -> TurnIndex:
+    log = tmp_path / "turns.jsonl"
+    log.write_text(text, encoding="utf-8")
+    return TurnIndex(tmp_path, log)
+
+
+def test_lookups_go_both_ways_in_log_order(tmp_path):
+    idx = _index(tmp_path, _line("t1", "c1") + _line("t2", "c1") + _line("t1", "c2") + "not json\n[]\n")
+    assert idx.commits_for_turn("t1") == ["c1", "c2"]
+    assert idx.turns_for_commit("c1") == ["t1", "t2"]
+    assert idx.turn_ids() == ["t1", "t2"]
+    assert idx.commits_for_turn("nope") == [] and idx.turns_for_commit("nope") == []
+    idx.close()
+
+
+def test_appends_are_picked_up_and_torn_lines_wait_for_their_newline(tmp_path):
+    idx = _index(tmp_path, _line("t1", "c1"))
+    assert idx.sync() == 1
+    assert idx.sync() == 0
+
+    with idx.turns_log.open("a", encoding="utf-8") as f:
+        f.write(_line("t2", "c2")[:-10])
+    assert idx.commits_for_turn("t2") == []
+    with idx.turns_log.open("a", encoding="utf-8") as f:
+        f.write(_line("t2", "c2")[-10:])
+    assert idx.commits_for_turn("t2") == ["c2"]
+    idx.close()
+
+    # a fresh reader starts from the stored offset instead of the top
+    again = TurnIndex(tmp_path, idx.turns_log)
+    assert again.sync() == 0 and again.turn_ids() == ["t1", "t2"]
+    again.close()
+
+
+def test_a_shrunk_log_is_reindexed(tmp_path):
+    idx = _index(tmp_path, _line("t1", "c1") + _line("t2", "c2"))
+    assert idx.turn_ids() == ["t1", "t2"]
+    idx.turns_log.write_text(_line("t3", "c3"), encoding="utf-8")
+    assert idx.turn_ids() == ["t3"]
+    assert idx.rebuild() == 1
+    idx.close()
+
+
+def test_repo_lookups_accept_prefixes_and_survive_a_lost_index(tmp_path):
+    root = tmp_path / "r"
+    root.mkdir()
+    repo = GaitRepo(root=root)
+    repo.init()
+    for i in range(3):
+        repo.record_turn(Turn.v0(user_text=f"q{i}", assistant_text=f"a{i}"))
+    head = repo.head_commit_id()
+    turn_id = repo.get_commit(head)["turn_ids"][0]
+
+    assert repo.turns_for_commit(head[:10]) == [turn_id]
+    assert repo.commits_for_turn(turn_id[:10]) == [head]
+
+    repo.turn_index.close()
+    index_path(repo.gait_dir).unlink()
+    repo = GaitRepo(root=root)
+    assert repo.commits_for_turn(turn_id) == [head]
+    assert len(repo.turn_index.turn_ids()) == 3
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from gait import verify
+from gait.objects import fanout_path, iter_loose_oids, iter_object_ids
+from gait.pack import load_packs
+from gait.repo import GaitRepo
+from gait.schema import Turn
+from gait.verify import verify_repo, watermark_path
+
+
+def _repo(root: Path, n: int = 10) -> GaitRepo:
+    repo = GaitRepo(root=root)
+    root.mkdir()
+    repo.init()
+    for i in range(n):
+        repo.record_turn(Turn.v0(user_text=f"q{i}", assistant_text=f"a{i}"))
+    return repo
+
+
+def _flip_byte(path: Path, offset: int) -> None:
+    data = bytearray(path.read_bytes())
+    data[offset] ^= 0x01
+    path.write_bytes(bytes(data))
+
+
+def test_every_object_is_checked_and_corruption_is_named(tmp_path):
+    repo = _repo(tmp_path / "r")
+    repo.repack()
+    repo.record_turn(Turn.v0(user_text="loose", assistant_text="one"))
+    total = len(set(iter_object_ids(repo.objects_dir)))
+
+    r = verify_repo(repo)
+    assert r["ok"] and r["checked_objects"] == total and r["skipped_objects"] == 0
+
+    loose = next(iter_loose_oids(repo.objects_dir))
+    _flip_byte(fanout_path(repo.objects_dir, loose), 5)
+    pk = load_packs(repo.objects_dir)[0]
+    oid, off, _ = next(iter(pk.iter_entries()))
+    _flip_byte(pk.pack_path, off + 5)
+
+    r = verify_repo(repo)
+    assert not r["ok"]
+    assert any("Bad object on disk" in p and loose in p for p in r["problems"])
+    assert any(f"Bad object in {pk.pack_path.name}: {oid}" == p for p in r["problems"])
+
+
+def test_parallel_matches_serial(tmp_path, monkeypatch):
+    monkeypatch.setattr(verify, "LOOSE_BATCH", 4)
+    repo = _repo(tmp_path / "r", 20)
+    seen = []
+
+    serial = verify_repo(repo)
+    parallel = verify_repo(repo, jobs=2, progress=lambda done, total: seen.append((done, total)))
+    assert parallel["ok"] and parallel["jobs"] == 2
+    assert parallel["checked_objects"] == serial["checked_objects"]
+    assert parallel["bytes"] == serial["bytes"]
+    assert seen[0] == (0, serial["checked_objects"]) and seen[-1] == (serial["checked_objects"],) * 2
+
+    oid = sorted(iter_loose_oids(repo.objects_dir))[-1]
+    _flip_byte(fanout_path(repo.objects_dir, oid), 5)
+    problems = verify_repo(repo, jobs=2)["problems"]
+    assert len(problems) == 1 and oid in problems[0]
+
+
+def test_incremental_skips_what_a_clean_run_verified(tmp_path):
+    repo = _repo(tmp_path / "r")
+    repo.repack()
+    first = verify_repo(repo, incremental=True)
+    assert first["ok"] and first["skipped_objects"] == 0
+    assert watermark_path(repo).exists()
+
+    again = verify_repo(repo, incremental=True)
+    assert again["checked_objects"] == 0 and again["skipped_objects"] == first["checked_objects"]
+
+    # new loose objects, and loose objects rewritten since, are checked
+    repo.record_turn(Turn.v0(user_text="new", assistant_text="turn"))
+    after = verify_repo(repo, incremental=True)
+    assert after["ok"] and 0 < after["checked_objects"] < first["checked_objects"]
+
+    oid = next(iter_loose_oids(repo.objects_dir))
+    _flip_byte(fanout_path(repo.objects_dir, oid), 5)
+    bad = verify_repo(repo, incremental=True)
+    assert not bad["ok"] and oid in bad["problems"][0]
+
+    # a failed run leaves the watermark alone; a full run still sees everything
+    assert verify_repo(repo)["checked_objects"] == first["checked_objects"] + after["checked_objects"]
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_missing_ref_targets_are_reported(tmp_path, incremental):
+    repo = _repo(tmp_path / "r", 1)
+    head = repo.head_commit_id()
+    fanout_path(repo.objects_dir, head).unlink()
+    r = verify_repo(repo, incremental=incremental)
+    assert not r["ok"] and any("Missing object for ref" in p and head in p for p in r["problems"])
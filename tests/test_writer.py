@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import threading
+from pathlib import Path
+
+import pytest
+
+from gait.repo import GaitRepo
+from gait.schema import Turn
+from gait.verify import verify_repo
+from gait.writer import TurnWriter
+
+
+def _repo(root: Path) -> GaitRepo:
+    repo = GaitRepo(root=root)
+    root.mkdir()
+    repo.init()
+    return repo
+
+
+def _turn(i: int) -> Turn:
+    return Turn.v0(user_text=f"q{i}", assistant_text=f"a{i}")
+
+
+def _history(repo: GaitRepo) -> list:
+    commits = repo.iter_commit_ids_from_head_first_parent(limit_commits=1000)
+    return [repo.get_turn(repo.get_commit(c)["turn_ids"][0])["user"]["text"] for c in reversed(commits)]
+
+
+@pytest.mark.parametrize("max_pending", [0, 4, 64])
+def test_queued_turns_land_in_order(tmp_path, max_pending):
+    repo = _repo(tmp_path / "r")
+    with TurnWriter(repo, max_pending=max_pending) as w:
+        ids = [w.record_turn(_turn(i)) for i in range(30)]
+        # the chat's view of HEAD moves before the disk does
+        assert w.head(repo.current_branch()) == ids[-1][1]
+    assert repo.head_commit_id() == ids[-1][1]
+    assert _history(repo) == [f"q{i}" for i in range(30)]
+    assert len(repo.turns_log.read_text().splitlines()) == 30
+    assert verify_repo(repo)["ok"]
+
+
+def test_a_moved_branch_is_not_overwritten(tmp_path):
+    repo = _repo(tmp_path / "r")
+    w = TurnWriter(repo, max_pending=8)
+    w.record_turn(_turn(0))
+    w.flush()
+
+    gate = threading.Event()
+    write = w._write
+    w._write = lambda job: (gate.wait(10), write(job))
+    _, lost = w.record_turn(_turn(1))
+    other = repo.record_turn(_turn(99))[1]  # another process commits while it is queued
+    gate.set()
+    with pytest.raises(RuntimeError, match=f"commit {lost} was stored but not attached"):
+        w.close()
+    assert repo.head_commit_id() == other
+    assert repo.get_commit(lost)["turn_ids"]
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGTERM") or os.name == "nt", reason="POSIX signals")
+def test_sigterm_drains_queued_turns(tmp_path):
+    repo = _repo(tmp_path / "r")
+    script = textwrap.dedent(
+        f"""
+        import sys, time
+        from pathlib import Path
+        from gait.repo import GaitRepo
+        from gait.schema import Turn
+        from gait.writer import TurnWriter
+
+        w = TurnWriter(GaitRepo(root=Path({str(repo.root)!r})), max_pending=64)
+        write = w._write
+        def slow(job):
+            time.sleep(0.05)
+            write(job)
+        w._write = slow
+        for i in range(20):
+            w.record_turn(Turn.v0(user_text=f"q{{i}}", assistant_text="a"))
+        print("queued", flush=True)
+        time.sleep(60)
+        """
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    p = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, env=env, text=True)
+    try:
+        assert p.stdout.readline().strip() == "queued"
+        p.send_signal(signal.SIGTERM)
+        assert p.wait(timeout=30) == 128 + signal.SIGTERM
+    finally:
+        p.kill()
+
+    assert _history(GaitRepo(root=repo.root)) == [f"q{i}" for i in range(20)]